@@ -0,0 +1,156 @@
+# batch_generation.py
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from openai import OpenAI
+
+from config import (
+    LLM_BATCH_DIR, LLM_BATCH_POLL_SECONDS, LLM_BATCH_TIMEOUT_MINUTES,
+    OPENAI_API_KEY, OPENAI_BASE_URL, OPENAI_BATCH_BASE_URL
+)
+from generate_blog_post import PostDraft, build_completion_request, parse_completion_content, request_cache_key
+from llm_backend import Completion
+from llm_cache import llm_cache
+from llm_telemetry import llm_telemetry
+from mlb_models import GameRecord
+from retry_policy import retry_policy
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchGenerator:
+    """Generates a whole slate through the OpenAI Batch API.
+    
+    Requests go out as one JSONL file; results come back through the same
+    parsing and caching as interactive completions, as drafts still to be
+    reviewed (validated, and repaired if needed) like any other. Games missing
+    from the result (failed, unparseable, batch timed out) are simply left out
+    so the caller can generate them interactively.
+    """
+    
+    def __init__(self, client: Optional[OpenAI] = None, batch_directory: str = LLM_BATCH_DIR,
+                 poll_seconds: int = LLM_BATCH_POLL_SECONDS, timeout_minutes: int = LLM_BATCH_TIMEOUT_MINUTES):
+        self.client = client or OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BATCH_BASE_URL or OPENAI_BASE_URL)
+        self.batch_directory = batch_directory
+        self.poll_seconds = poll_seconds
+        self.timeout_seconds = timeout_minutes * 60
+    
+    def write_batch_file(self, bodies: Dict[str, dict]) -> str:
+        """Write {custom_id: request body} as a batch input JSONL file and return its path"""
+        os.makedirs(self.batch_directory, exist_ok=True)
+        path = os.path.join(self.batch_directory, f"{datetime.now().strftime('%Y-%m-%d')}-{uuid.uuid4().hex[:8]}.jsonl")
+        with open(path, 'w', encoding='utf-8') as f:
+            for custom_id, body in bodies.items():
+                f.write(json.dumps({"custom_id": custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": body}) + "\n")
+        return path
+    
+    def submit(self, path: str):
+        with open(path, 'rb') as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window="24h",
+            metadata={"source": os.path.basename(path)}
+        )
+        logger.info(f"Submitted batch {batch.id} ({path})")
+        return batch
+    
+    def wait(self, batch_id: str):
+        """Poll until the batch reaches a terminal status; returns None on timeout"""
+        deadline = time.monotonic() + self.timeout_seconds
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            if batch.status in TERMINAL_STATUSES:
+                return batch
+            if time.monotonic() >= deadline:
+                logger.warning(f"Batch {batch_id} still {batch.status} after {self.timeout_seconds}s, cancelling")
+                try:
+                    self.client.batches.cancel(batch_id)
+                except Exception as e:
+                    logger.warning(f"Could not cancel batch {batch_id}: {e}")
+                return None
+            counts = getattr(batch, 'request_counts', None)
+            if counts:
+                logger.info(f"Batch {batch_id} {batch.status}: {counts.completed}/{counts.total} done")
+            time.sleep(self.poll_seconds)
+    
+    def collect(self, batch) -> Dict[str, Completion]:
+        """Read the output file into {custom_id: completion}"""
+        completions = {}
+        if not batch.output_file_id:
+            return completions
+        for line in self.client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            response = item.get("response") or {}
+            if item.get("error") or response.get("status_code") != 200:
+                logger.warning(f"Batch request {item.get('custom_id')} failed: {item.get('error') or response.get('status_code')}")
+                continue
+            try:
+                body = response["body"]
+                completions[item["custom_id"]] = Completion(
+                    content=body["choices"][0]["message"]["content"],
+                    response_id=body.get("id", "unknown"),
+                    usage=body.get("usage")
+                )
+            except (KeyError, IndexError, TypeError):
+                logger.warning(f"Batch request {item.get('custom_id')} returned no message")
+        return completions
+    
+    def generate_all(self, jobs: List[Tuple[str, str, List[str], GameRecord]]) -> Dict[str, PostDraft]:
+        """Generate (key, topic, keywords, game_data) jobs in one batch and return {key: draft awaiting review_post}"""
+        bodies, topics, contents, pending = {}, {}, {}, {}
+        for key, topic, keywords, game_data in jobs:
+            body = build_completion_request(topic, keywords, game_data)
+            bodies[key] = body
+            topics[key] = topic
+            cached = llm_cache.get(request_cache_key(body))
+            if cached is not None:
+                contents[key] = cached
+            else:
+                pending[key] = body
+        
+        start = time.perf_counter()
+        fresh = {}
+        if pending:
+            try:
+                batch = self.wait(self.submit(self.write_batch_file(pending)).id)
+                if batch is not None:
+                    if batch.status != "completed":
+                        logger.error(f"Batch {batch.id} ended {batch.status}")
+                    fresh = {key: completion for key, completion in self.collect(batch).items() if key in pending}
+                    contents.update((key, completion.content) for key, completion in fresh.items())
+            except Exception as e:
+                logger.error(f"Batch generation failed: {e}")
+        
+        drafts = {}
+        for key, topic, keywords, game_data in jobs:
+            if key not in contents:
+                continue
+            content = contents[key]
+            with llm_telemetry.post(topic) as trace:
+                if key in fresh:
+                    llm_telemetry.record('batch', bodies[key], 0, 'ok', content, fresh[key].usage)
+                else:
+                    llm_telemetry.record('batch', bodies[key], 0, 'cache_hit')
+            result, complete = parse_completion_content(content, topic)
+            if not complete:
+                continue
+            if key in fresh:
+                llm_cache.put(request_cache_key(bodies[key]), bodies[key]["model"], content)
+            # Validation, section repair and the one-shot regeneration happen in review_post, as for interactive posts
+            drafts[key] = PostDraft(topic, keywords, game_data, trace, retry_budget=retry_policy.game_budget(),
+                                    body=bodies[key], result=result)
+        
+        logger.info(f"Batch produced {len(drafts)}/{len(jobs)} posts in {time.perf_counter() - start:.1f}s")
+        return drafts
@@ -3,3 +3,97 @@ import os
 
 # Use environment variable in production, fallback for local development
 OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY', 'your-openai-api-key-here')
+
+# Raw upstream responses are cached on disk so reruns don't hit the network
+SNAPSHOT_DIR = os.environ.get('MLB_SNAPSHOT_DIR', 'mlb_data_snapshots')
+SNAPSHOT_TTL_SECONDS = int(os.environ.get('MLB_SNAPSHOT_TTL_SECONDS', '900'))
+
+# Set to a YYYY-MM-DD date to build blog topics purely from stored snapshots
+REPLAY_DATE = os.environ.get('MLB_REPLAY_DATE') or None
+
+# Upstream resilience: hedge a second request once the first exceeds this
+# latency percentile, and stop calling a source after repeated failures
+UPSTREAM_HEDGE_PERCENTILE = float(os.environ.get('UPSTREAM_HEDGE_PERCENTILE', '95'))
+UPSTREAM_HEDGE_DEFAULT_DELAY = float(os.environ.get('UPSTREAM_HEDGE_DEFAULT_DELAY', '10'))
+UPSTREAM_BREAKER_FAILURES = int(os.environ.get('UPSTREAM_BREAKER_FAILURES', '3'))
+UPSTREAM_BREAKER_RESET_SECONDS = int(os.environ.get('UPSTREAM_BREAKER_RESET_SECONDS', '300'))
+UPSTREAM_PREWARM_LEAD_MINUTES = int(os.environ.get('UPSTREAM_PREWARM_LEAD_MINUTES', '15'))
+
+# Intraday line tracking: poll DraftKings every N seconds (0 disables) and only
+# regenerate a post once its line moves past these thresholds
+LINE_HISTORY_DIR = os.environ.get('LINE_HISTORY_DIR', 'mlb_line_history')
+LINE_POLL_INTERVAL_SECONDS = int(os.environ.get('LINE_POLL_INTERVAL_SECONDS', '1800'))
+LINE_MOVE_THRESHOLD_PROB = float(os.environ.get('LINE_MOVE_THRESHOLD_PROB', '0.03'))
+LINE_MOVE_THRESHOLD_HANDLE = float(os.environ.get('LINE_MOVE_THRESHOLD_HANDLE', '10'))
+
+# LLM generation: parallel completions, throttled to the account's OpenAI quotas
+# (limits are raised/lowered automatically from x-ratelimit-* response headers)
+LLM_MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY', '4'))
+OPENAI_RPM_LIMIT = int(os.environ.get('OPENAI_RPM_LIMIT', '500'))
+OPENAI_TPM_LIMIT = int(os.environ.get('OPENAI_TPM_LIMIT', '30000'))
+
+# LLM response cache: identical completion requests are served from local SQLite
+LLM_CACHE_ENABLED = os.environ.get('LLM_CACHE_ENABLED', '1') == '1'
+LLM_CACHE_PATH = os.environ.get('LLM_CACHE_PATH', 'mlb_llm_cache.sqlite3')
+LLM_CACHE_MAX_MB = int(os.environ.get('LLM_CACHE_MAX_MB', '50'))
+
+# Batch API runs (/generate?batch=1): one JSONL batch job instead of per-game completions
+# (set OPENAI_BATCH_BASE_URL=http://127.0.0.1:8765/v1 to use mock_openai_server.py offline)
+OPENAI_BATCH_BASE_URL = os.environ.get('OPENAI_BATCH_BASE_URL')
+LLM_BATCH_DIR = os.environ.get('LLM_BATCH_DIR', 'mlb_llm_batches')
+LLM_BATCH_POLL_SECONDS = int(os.environ.get('LLM_BATCH_POLL_SECONDS', '30'))
+LLM_BATCH_TIMEOUT_MINUTES = int(os.environ.get('LLM_BATCH_TIMEOUT_MINUTES', '180'))
+
+# Stream completions and abort as soon as the post breaks a hard structural rule
+LLM_STREAMING = os.environ.get('LLM_STREAMING', '0') == '1'
+
+# Constrain completions to the blog post JSON schema (response_format=json_schema)
+LLM_STRUCTURED_OUTPUT = os.environ.get('LLM_STRUCTURED_OUTPUT', '1') == '1'
+
+# Input token budget per blog completion (system + user prompt); lower-priority prompt sections are compacted to fit
+LLM_INPUT_TOKEN_BUDGET = int(os.environ.get('LLM_INPUT_TOKEN_BUDGET', '3500'))
+
+# LLM backend: "openai" (OPENAI_BASE_URL may point at mock_openai_server.py) or "fake" for offline load tests
+LLM_BACKEND = os.environ.get('LLM_BACKEND', 'openai')
+LLM_MODEL = os.environ.get('LLM_MODEL', 'gpt-4o')
+LLM_MAX_OUTPUT_TOKENS = int(os.environ.get('LLM_MAX_OUTPUT_TOKENS', '4096'))
+LLM_TEMPERATURE = float(os.environ.get('LLM_TEMPERATURE', '0.7'))
+OPENAI_BASE_URL = os.environ.get('OPENAI_BASE_URL')
+FAKE_LLM_LATENCY_SECONDS = float(os.environ.get('FAKE_LLM_LATENCY_SECONDS', '0.5'))
+FAKE_LLM_ERROR_RATE = float(os.environ.get('FAKE_LLM_ERROR_RATE', '0'))
+FAKE_LLM_RATE_LIMIT_RATE = float(os.environ.get('FAKE_LLM_RATE_LIMIT_RATE', '0'))
+
+# LLM retry policy: jittered backoff for transient errors, Retry-After for 429s, no retries for fatal errors
+LLM_RETRY_MAX_ATTEMPTS = int(os.environ.get('LLM_RETRY_MAX_ATTEMPTS', '3'))
+LLM_RETRY_BASE_SECONDS = float(os.environ.get('LLM_RETRY_BASE_SECONDS', '1'))
+LLM_RETRY_MAX_SECONDS = float(os.environ.get('LLM_RETRY_MAX_SECONDS', '30'))
+LLM_RETRY_BUDGET_PER_GAME = int(os.environ.get('LLM_RETRY_BUDGET_PER_GAME', '3'))
+LLM_RETRY_BUDGET_PER_RUN = int(os.environ.get('LLM_RETRY_BUDGET_PER_RUN', '25'))
+
+# LLM telemetry: USD per million tokens, used to estimate the cost of each call (Batch API calls get the discount)
+LLM_PRICE_INPUT_PER_MTOK = float(os.environ.get('LLM_PRICE_INPUT_PER_MTOK', '2.50'))
+LLM_PRICE_OUTPUT_PER_MTOK = float(os.environ.get('LLM_PRICE_OUTPUT_PER_MTOK', '10.00'))
+LLM_BATCH_PRICE_DISCOUNT = float(os.environ.get('LLM_BATCH_PRICE_DISCOUNT', '0.5'))
+
+# Deadline-aware generation: games are generated earliest first pitch first, assuming about this long per post
+LLM_EXPECTED_GENERATION_SECONDS = float(os.environ.get('LLM_EXPECTED_GENERATION_SECONDS', '45'))
+
+# Game-relative triggers: draft each post DRAFT_LEAD_MINUTES before first pitch, then refresh it REFRESH_LEAD_MINUTES
+# out once the umpire is confirmed (re-checked every UMPIRE_RECHECK_MINUTES, giving up TRIGGER_MIN_LEAD_MINUTES out).
+# Triggers within TRIGGER_COALESCE_MINUTES run together; the slate is re-read at least every SLATE_REFRESH_MINUTES
+DRAFT_LEAD_MINUTES = int(os.environ.get('DRAFT_LEAD_MINUTES', '180'))
+REFRESH_LEAD_MINUTES = int(os.environ.get('REFRESH_LEAD_MINUTES', '75'))
+UMPIRE_RECHECK_MINUTES = int(os.environ.get('UMPIRE_RECHECK_MINUTES', '15'))
+TRIGGER_MIN_LEAD_MINUTES = int(os.environ.get('TRIGGER_MIN_LEAD_MINUTES', '30'))
+TRIGGER_COALESCE_MINUTES = int(os.environ.get('TRIGGER_COALESCE_MINUTES', '5'))
+SLATE_REFRESH_MINUTES = int(os.environ.get('SLATE_REFRESH_MINUTES', '60'))
+
+# Internal links: phrase -> URL JSON, reloaded when the file changes (built-in map when it doesn't exist)
+INTERLINK_MAP_PATH = os.environ.get('INTERLINK_MAP_PATH', 'interlink_map.json')
+
+# Daily run pipeline: fetch -> prompt -> generate -> validate -> enrich -> persist, each stage fed by a queue of
+# at most PIPELINE_QUEUE_SIZE posts (generate runs LLM_MAX_CONCURRENCY workers)
+PIPELINE_QUEUE_SIZE = int(os.environ.get('PIPELINE_QUEUE_SIZE', '4'))
+PIPELINE_VALIDATE_WORKERS = int(os.environ.get('PIPELINE_VALIDATE_WORKERS', '2'))
+PIPELINE_ENRICH_WORKERS = int(os.environ.get('PIPELINE_ENRICH_WORKERS', '2'))
+PIPELINE_PERSIST_WORKERS = int(os.environ.get('PIPELINE_PERSIST_WORKERS', '1'))
@@ -0,0 +1,94 @@
+# deadline_scheduler.py
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from config import LLM_EXPECTED_GENERATION_SECONDS, LLM_MAX_CONCURRENCY
+from game_time import GAME_TIMEZONE, game_time_sort_key
+from llm_telemetry import percentile
+
+logger = logging.getLogger(__name__)
+
+@dataclass(slots=True)
+class DeadlineJob:
+    key: str
+    deadline: Optional[datetime]  # First pitch; None while the game time is TBD
+    slack_seconds: Optional[float] = None
+
+
+def has_started(start_time: Optional[datetime], now: Optional[datetime] = None) -> bool:
+    return start_time is not None and start_time <= (now or datetime.now(GAME_TIMEZONE))
+
+
+def plan_by_slack(jobs: Iterable[DeadlineJob], concurrency: int, expected_seconds: float,
+                  now: Optional[datetime] = None) -> List[DeadlineJob]:
+    """Order jobs earliest deadline first and estimate each one's slack.
+    
+    With every job taking about expected_seconds on `concurrency` workers, the
+    nth job finishes around (n // concurrency + 1) * expected_seconds from now;
+    slack is what is left of its deadline after that. TBD games go last.
+    """
+    now = now or datetime.now(GAME_TIMEZONE)
+    ordered = sorted(jobs, key=lambda job: game_time_sort_key(job.deadline))
+    for position, job in enumerate(ordered):
+        if job.deadline is not None:
+            finish = (position // max(1, concurrency) + 1) * expected_seconds
+            job.slack_seconds = (job.deadline - now).total_seconds() - finish
+    return ordered
+
+
+class DeadlineScheduler:
+    """Orders a run's posts earliest-first-pitch-first for the generation pipeline's `concurrency` LLM workers"""
+    
+    def __init__(self, concurrency: int = LLM_MAX_CONCURRENCY, expected_seconds: float = LLM_EXPECTED_GENERATION_SECONDS):
+        self.concurrency = max(1, concurrency)
+        self.expected_seconds = expected_seconds
+    
+    def plan(self, jobs: Iterable[DeadlineJob], now: Optional[datetime] = None) -> List[DeadlineJob]:
+        """Jobs in start order, warning about games unlikely to be published before first pitch"""
+        ordered = plan_by_slack(jobs, self.concurrency, self.expected_seconds, now)
+        at_risk = [job.key for job in ordered if job.slack_seconds is not None and job.slack_seconds < 0]
+        if at_risk:
+            logger.warning(f"{len(at_risk)} game(s) may not be published before first pitch: {', '.join(at_risk)}")
+        return ordered
+
+
+class DeadlineStats:
+    """Per-run publish lead time: minutes between a post being written and its game's first pitch"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        with self._lock:
+            self.leads: Dict[str, float] = {}
+            self.tbd = 0
+    
+    def record(self, key: str, start_time: Optional[datetime], published_at: Optional[datetime] = None) -> Optional[float]:
+        """Record one published post; returns its lead in minutes (negative once the game has started)"""
+        with self._lock:
+            if start_time is None:
+                self.tbd += 1
+                return None
+            lead = round((start_time - (published_at or datetime.now(GAME_TIMEZONE))).total_seconds() / 60, 1)
+            self.leads[key] = lead
+            return lead
+    
+    def stats(self) -> dict:
+        with self._lock:
+            leads = dict(self.leads)
+            tbd = self.tbd
+        return {
+            'published': len(leads) + tbd,
+            'before_first_pitch': sum(1 for lead in leads.values() if lead > 0),
+            'missed': sorted(key for key, lead in leads.items() if lead <= 0),
+            'tbd': tbd,
+            'lead_minutes_min': min(leads.values()) if leads else None,
+            'lead_minutes_p50': percentile(list(leads.values()), 50),
+        }
+
+
+deadline_stats = DeadlineStats()
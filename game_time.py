@@ -0,0 +1,68 @@
+# game_time.py
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+
+import pytz
+
+# Upstream times (DraftKings "7/8, 06:40PM") are US Eastern
+GAME_TIMEZONE = pytz.timezone('US/Eastern')
+
+# Optional "M/D," prefix, then H:MM with an optional AM/PM suffix
+_GAME_TIME_PATTERN = re.compile(
+    r'(?:(?P<month>\d{1,2})/(?P<day>\d{1,2}),?\s*)?'
+    r'(?P<hour>\d{1,2}):(?P<minute>\d{2})\s*(?P<meridiem>[AaPp]\.?[Mm]\.?)?'
+)
+
+
+@lru_cache(maxsize=256)
+def parse_game_time(time_str: Optional[str], slate_date: str) -> Optional[datetime]:
+    """Parse an upstream game time into a timezone-aware datetime, or None for TBD.
+    
+    Handles "7/8, 06:40PM", "06:40PM", "6:40 PM" and "18:40"; times without a
+    month/day fall on slate_date (YYYY-MM-DD). Memoized since a slate only has
+    a handful of distinct start times.
+    """
+    if not time_str or time_str.strip().upper() == 'TBD':
+        return None
+    
+    match = _GAME_TIME_PATTERN.search(time_str)
+    if not match:
+        return None
+    
+    try:
+        slate_day = datetime.strptime(slate_date, "%Y-%m-%d")
+        hour = int(match.group('hour'))
+        minute = int(match.group('minute'))
+        meridiem = (match.group('meridiem') or '').replace('.', '').upper()
+        if meridiem == 'PM' and hour != 12:
+            hour += 12
+        elif meridiem == 'AM' and hour == 12:
+            hour = 0
+        
+        if match.group('month'):
+            month, day = int(match.group('month')), int(match.group('day'))
+        else:
+            month, day = slate_day.month, slate_day.day
+        
+        return GAME_TIMEZONE.localize(datetime(slate_day.year, month, day, hour, minute))
+    except ValueError:
+        return None
+
+
+def current_slate_date(now: Optional[datetime] = None) -> str:
+    """The slate date (YYYY-MM-DD) in US Eastern; late games run past midnight on the (UTC) server clock"""
+    return (now or datetime.now(GAME_TIMEZONE)).astimezone(GAME_TIMEZONE).strftime("%Y-%m-%d")
+
+
+def game_time_sort_key(start_time: Optional[datetime]) -> float:
+    """Chronological sort key; TBD / unparseable games sort to the end"""
+    return start_time.timestamp() if start_time else float('inf')
+
+
+def format_game_time(start_time: Optional[datetime], fallback: str = 'TBD') -> str:
+    """Display form used in the post header and index pages, e.g. "7:05 PM ET" """
+    if not start_time:
+        return fallback
+    return start_time.strftime('%I:%M %p ET').lstrip('0')
@@ -1,21 +1,29 @@
 # generate_blog_post.py
-from config import OPENAI_API_KEY
+from config import LLM_MAX_OUTPUT_TOKENS, LLM_MODEL, LLM_STREAMING, LLM_STRUCTURED_OUTPUT, LLM_TEMPERATURE
+from html_document import PostDocument, parse_post
+from llm_backend import get_backend
+from llm_cache import cache_key, llm_cache
+from llm_telemetry import FAILED, INVALID, REGENERATED, REPAIRED, VALID, CallTimer, PostRecord, llm_telemetry
+from mlb_models import GameRecord
 from mlb_prompts import get_mlb_blog_post_prompt
-from openai import OpenAI
+from post_repair import PostRepairer
+from prompt_budget import token_counter
+from rate_limiter import rate_limiter
+from retry_policy import RATE_LIMITED, RetryBudget, classify_error, retry_policy
+from stream_guard import StreamingStructureGuard, StructureViolation
 import json
 import time
 import hashlib
 import logging
-import re
+import threading
+from dataclasses import dataclass
 from urllib.parse import urlparse
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Union
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-client = OpenAI(api_key=OPENAI_API_KEY)
-
 ALLOWED_CITATION_DOMAINS = {
     "mlb.com", "baseballsavant.mlb.com", "fangraphs.com",
     "baseball-reference.com", "espn.com"
@@ -24,28 +32,24 @@ ALLOWED_CITATION_DOMAINS = {
 def _hostname_ok(netloc, allowed):
     return any(netloc == d or netloc.endswith("." + d) for d in allowed)
 
-def validate_blog_post(html: str, result: dict) -> dict:
+def validate_blog_post(html: str, result: dict, document: Optional[PostDocument] = None) -> dict:
+    """Check a post against the content rules; pass document if html was already parsed"""
+    document = document or parse_post(html)
     issues = []
     
-    anchors = re.findall(r'<a\s+[^>]*href="([^"]+)"[^>]*>', html, flags=re.IGNORECASE)
-    citation_count = len(anchors)
+    citation_count = len(document.anchors)
     if citation_count < 2:
         issues.append(f"Only {citation_count} inline citations found, need minimum 2.")
     
     # domain + nofollow check
     good_citations = 0
-    for href in anchors:
-        netloc = urlparse(href).netloc.lower()
+    for anchor in document.anchors:
+        netloc = urlparse(anchor.href).netloc.lower()
         if _hostname_ok(netloc, ALLOWED_CITATION_DOMAINS):
-            # check rel="nofollow"
-            # find the full tag containing this href
-            tag_match = re.search(rf'<a[^>]*href="{re.escape(href)}"[^>]*>', html, flags=re.IGNORECASE)
-            if tag_match:
-                tag = tag_match.group(0)
-                if re.search(r'rel\s*=\s*"[^\"]*\bnofollow\b[^\"]*"', tag, flags=re.IGNORECASE):
-                    good_citations += 1
-                else:
-                    issues.append(f'Citation to {netloc} missing rel="nofollow".')
+            if 'nofollow' in anchor.rel.lower().split():
+                good_citations += 1
+            else:
+                issues.append(f'Citation to {netloc} missing rel="nofollow".')
     
     if good_citations < 2:
         issues.append(f"Only {good_citations} qualified citations (allowed domains + nofollow); need ≥2.")
@@ -57,19 +61,16 @@ def validate_blog_post(html: str, result: dict) -> dict:
         issues.append(f"FAQ count is {faq_count}, should be 4–6.")
     
     # Ensure Key Takeaways has exactly 3 sentences (basic parse)
-    kt_match = re.search(r'<h2>\s*Key Takeaways\s*</h2>\s*<p>(.*?)</p>', html, flags=re.IGNORECASE|re.DOTALL)
-    if not kt_match:
+    if document.key_takeaways is None:
         issues.append("Key Takeaways section not found.")
     else:
-        # Count sentences naively by period; ignore ellipses
-        text = re.sub(r'\.{3,}', '', kt_match.group(1))
-        sentences = [s for s in re.split(r'\.\s+', text.strip()) if s]
+        sentences = document.key_takeaway_sentences
         if len(sentences) != 3:
             issues.append(f"Key Takeaways has {len(sentences)} sentences, need exactly 3.")
     
     # Guard "Game Time / Lines" from repeating
-    game_time_mentions = len(re.findall(r'>\s*Game Time:\s*<|Game Time:', html, flags=re.IGNORECASE))
-    lines_mentions = len(re.findall(r'>\s*Lines:\s*<|Lines:', html, flags=re.IGNORECASE))
+    game_time_mentions = document.metadata_counts['Game Time']
+    lines_mentions = document.metadata_counts['Lines']
     if game_time_mentions != 1:
         issues.append(f'"Game Time" appears {game_time_mentions} times; must be exactly once.')
     if lines_mentions != 1:
@@ -82,40 +83,8 @@ def validate_blog_post(html: str, result: dict) -> dict:
         "faq_count": faq_count
     }
 
-def truncate_game_data(game_data: dict, max_tokens: int = 2000) -> dict:
-    """Truncate game_data text blocks to prevent token overflow"""
-    truncated_data = game_data.copy()
-    
-    # Truncate long text fields that might cause token issues
-    text_fields = ['away_pitcher', 'home_pitcher', 'away_key_performers', 'home_key_performers']
-    
-    for field in text_fields:
-        if field in truncated_data and isinstance(truncated_data[field], dict):
-            if 'arsenal' in truncated_data[field]:
-                arsenal_text = truncated_data[field]['arsenal']
-                if len(arsenal_text) > 500:  # Increased from 200 to avoid cutting off usage/mph
-                    truncated_data[field]['arsenal'] = arsenal_text[:500] + "..."
-        elif field in truncated_data and isinstance(truncated_data[field], list):
-            # Limit list size
-            truncated_data[field] = truncated_data[field][:5]
-    
-    return truncated_data
-
-def generate_mlb_blog_post_with_retries(topic: str, keywords: List[str], game_data: dict, max_retries: int = 3) -> Optional[dict]:
-    """Generate MLB blog post with retry logic and robust error handling"""
-    
-    # Truncate game data to prevent token overflow
-    safe_game_data = truncate_game_data(game_data)
-    
-    # Get the formatted prompt
-    prompt = get_mlb_blog_post_prompt(topic, keywords, safe_game_data)
-    
-    # Create prompt hash for logging
-    prompt_hash = hashlib.md5(prompt.encode()).hexdigest()[:8]
-    logger.info(f"Generating blog post with prompt hash: {prompt_hash}")
-    
-    # Enhanced system prompt with strict requirements
-    system_prompt = """You are a professional MLB betting analyst and blog writer who specializes in pitcher-batter matchups and umpire analysis.
+# Enhanced system prompt with strict requirements
+SYSTEM_PROMPT = """You are a professional MLB betting analyst and blog writer who specializes in pitcher-batter matchups and umpire analysis.
 
 CRITICAL: Your response MUST be valid JSON only. Do not include any text before or after the JSON.
 
@@ -131,70 +100,291 @@ STRICT REQUIREMENTS:
 
 Write engaging, data-driven content for baseball fans and bettors."""
 
+JSON_ONLY_SUFFIX = "\n\nRETURN ONLY VALID JSON. Start your response with { and end with }. No explanatory text before or after."
+
+MODEL = LLM_MODEL
+SAMPLING = {"max_tokens": LLM_MAX_OUTPUT_TOKENS, "temperature": LLM_TEMPERATURE}
+REQUIRED_FIELDS = ['html', 'meta_title', 'meta_desc', 'faq', 'citations', 'keywords']
+
+# Strict schema for the response envelope, so the model cannot return malformed or partial JSON
+BLOG_POST_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "mlb_blog_post",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "html": {"type": "string"},
+                "meta_title": {"type": "string"},
+                "meta_desc": {"type": "string"},
+                "faq": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {"question": {"type": "string"}, "answer": {"type": "string"}},
+                        "required": ["question", "answer"],
+                        "additionalProperties": False
+                    }
+                },
+                "citations": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {"source": {"type": "string"}, "url": {"type": "string"}},
+                        "required": ["source", "url"],
+                        "additionalProperties": False
+                    }
+                },
+                "keywords": {"type": "array", "items": {"type": "string"}}
+            },
+            "required": REQUIRED_FIELDS,
+            "additionalProperties": False
+        }
+    }
+}
+
+class GenerationStats:
+    """Per-run counts of generated posts, malformed envelopes and validation retries"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        self.posts = 0
+        self.validation_retries = 0
+        self.envelope_fallbacks = 0
+        self.repaired = 0
+        self.full_retries = 0
+    
+    def record_post(self, valid_first_try: bool):
+        with self._lock:
+            self.posts += 1
+            if not valid_first_try:
+                self.validation_retries += 1
+    
+    def record_envelope_fallback(self):
+        with self._lock:
+            self.envelope_fallbacks += 1
+    
+    def record_repair(self, fixed: bool):
+        """Validation failure handled by PostRepairer (fixed) or by regenerating the whole post"""
+        with self._lock:
+            if fixed:
+                self.repaired += 1
+            else:
+                self.full_retries += 1
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'structured_output': LLM_STRUCTURED_OUTPUT,
+                'posts': self.posts,
+                'validation_retries': self.validation_retries,
+                'validation_retry_rate': round(self.validation_retries / self.posts, 3) if self.posts else 0.0,
+                'envelope_fallbacks': self.envelope_fallbacks,
+                'repaired': self.repaired,
+                'full_retries': self.full_retries,
+            }
+
+generation_stats = GenerationStats()
+
+def build_completion_request(topic: str, keywords: List[str], game_data: GameRecord) -> dict:
+    """Chat completion body for one game (also used verbatim as a batch request body)"""
+    # Get the formatted prompt, fitted to the input token budget alongside the system prompt
+    reserved = {'system': token_counter.count(SYSTEM_PROMPT), 'json_suffix': token_counter.count(JSON_ONLY_SUFFIX)}
+    prompt = get_mlb_blog_post_prompt(topic, keywords, GameRecord.coerce(game_data), reserved=reserved)
+    
+    body = {
+        "model": MODEL,
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt + JSON_ONLY_SUFFIX}
+        ],
+        **SAMPLING
+    }
+    if LLM_STRUCTURED_OUTPUT:
+        body["response_format"] = BLOG_POST_RESPONSE_FORMAT
+    return body
+
+def request_cache_key(body: dict) -> str:
+    messages = {message["role"]: message["content"] for message in body["messages"]}
+    params = {name: body[name] for name in SAMPLING}
+    if "response_format" in body:
+        params["response_format"] = body["response_format"]
+    return cache_key(body["model"], messages["system"], messages["user"], **params)
+
+def parse_completion_content(content: str, topic: str) -> Tuple[dict, bool]:
+    """Decode a completion into the blog result dict.
+    
+    Returns (result, complete); complete is False when the model ignored the JSON
+    contract and the result was rebuilt by create_fallback_response.
+    """
+    try:
+        # Clean up markdown code blocks if present
+        clean_content = content.strip()
+        if clean_content.startswith('```json'):
+            # Remove ```json from start and ``` from end
+            clean_content = clean_content[7:]  # Remove ```json
+            if clean_content.endswith('```'):
+                clean_content = clean_content[:-3]  # Remove ```
+        elif clean_content.startswith('```'):
+            # Remove ``` from start and end
+            clean_content = clean_content[3:]
+            if clean_content.endswith('```'):
+                clean_content = clean_content[:-3]
+        
+        clean_content = clean_content.strip()
+        
+        # Attempt to parse as JSON
+        parsed_response = json.loads(clean_content)
+        
+        # Validate required fields
+        if isinstance(parsed_response, dict) and all(field in parsed_response for field in REQUIRED_FIELDS):
+            return parsed_response, True
+        logger.warning("JSON response missing required fields, using fallback format")
+        generation_stats.record_envelope_fallback()
+        return create_fallback_response(content, topic), False
+            
+    except json.JSONDecodeError:
+        # If not JSON, create structured response
+        logger.info("Response not in JSON format, creating structured response")
+        generation_stats.record_envelope_fallback()
+        return create_fallback_response(content, topic), False
+
+SECTION_SYSTEM_PROMPT = "You are a professional MLB betting analyst fixing one section of an existing blog post. Follow the format instructions exactly."
+
+def write_section(prompt: str, max_tokens: int) -> str:
+    """Small targeted completion for one section of a post (used by the repair engine)"""
+    sampling = {"max_tokens": max_tokens, "temperature": 0.4}
+    response_key = cache_key(MODEL, SECTION_SYSTEM_PROMPT, prompt, **sampling)
+    body = {
+        "model": MODEL,
+        "messages": [
+            {"role": "system", "content": SECTION_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        **sampling
+    }
+    cached = llm_cache.get(response_key)
+    if cached is not None:
+        llm_telemetry.record('section', body, 0, 'cache_hit')
+        return cached
+    
+    rate_limiter.acquire(token_counter.count(SECTION_SYSTEM_PROMPT) + token_counter.count(prompt) + max_tokens)
+    call = llm_telemetry.start_call('section', body)
+    try:
+        completion = get_backend().complete(body, timeout=30)
+    except Exception as e:
+        call.finish(classify_error(e))
+        raise
+    call.usage = completion.usage
+    call.finish('ok', completion.content)
+    rate_limiter.update_from_headers(completion.headers)
+    content = completion.content
+    if content:
+        llm_cache.put(response_key, MODEL, content)
+    return content
+
+post_repairer = PostRepairer(ALLOWED_CITATION_DOMAINS, write_section)
+
+def stream_completion_content(body: dict, prompt_hash: str, call: Optional[CallTimer] = None) -> str:
+    """Stream a completion through StreamingStructureGuard, closing it on the first hard violation"""
+    guard = StreamingStructureGuard()
+    stream = get_backend().stream(body, timeout=60)
+    rate_limiter.update_from_headers(stream.headers)
+    parts = []
+    try:
+        for delta in stream:
+            if call and not parts:
+                call.first_token()
+            parts.append(delta)
+            guard.feed(delta)
+    except StructureViolation as e:
+        logger.warning(f"Aborted stream for prompt hash {prompt_hash} after {sum(map(len, parts))} chars: {e}")
+        raise
+    finally:
+        stream.close()
+        if call:
+            call.usage = stream.usage
+            call.partial = ''.join(parts)
+    return ''.join(parts)
+
+def generate_mlb_blog_post_with_retries(topic: str, keywords: List[str], game_data: GameRecord, max_retries: Optional[int] = None,
+                                        use_cache: bool = True, stream: bool = LLM_STREAMING,
+                                        retry_budget: Optional[RetryBudget] = None, body: Optional[dict] = None) -> Optional[dict]:
+    """Generate MLB blog post with retry logic and robust error handling.
+    
+    Identical requests are answered from llm_cache; use_cache=False forces a
+    fresh completion (which then replaces the cached one). With stream=True the
+    completion is checked as it arrives and a structurally doomed post is
+    abandoned and retried without waiting for the rest of it. Retries follow
+    retry_policy and are charged to retry_budget (the game's) and the run budget.
+    body is the prebuilt completion request, if the caller already has one.
+    """
+    max_retries = max_retries or retry_policy.max_attempts
+    retry_budget = retry_budget or retry_policy.game_budget()
+    body = body or build_completion_request(topic, keywords, game_data)
+    
+    # Create prompt hash for logging
+    prompt_hash = hashlib.md5(body["messages"][1]["content"].encode()).hexdigest()[:8]
+    logger.info(f"Generating blog post with prompt hash: {prompt_hash}")
+    
+    response_key = request_cache_key(body)
+    
     for attempt in range(max_retries):
+        call = None
         try:
-            logger.info(f"Attempt {attempt + 1}/{max_retries} for prompt hash: {prompt_hash}")
+            content = llm_cache.get(response_key) if use_cache and attempt == 0 else None
+            if content is not None:
+                logger.info(f"Cache hit for prompt hash: {prompt_hash}")
+                llm_telemetry.record('post', body, attempt, 'cache_hit')
+                return parse_completion_content(content, topic)[0]
             
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt + "\n\nRETURN ONLY VALID JSON. Start your response with { and end with }. No explanatory text before or after."}
-                ],
-                max_tokens=4096,
-                temperature=0.7,
-                timeout=60
-            )
+            logger.info(f"Attempt {attempt + 1}/{max_retries} for prompt hash: {prompt_hash}")
             
-            # Log response ID for debugging
-            response_id = getattr(response, 'id', 'unknown')
-            logger.info(f"Success! Response ID: {response_id}, Prompt hash: {prompt_hash}")
+            # Prompt tokens plus the completion budget
+            rate_limiter.acquire(sum(token_counter.count(message["content"]) for message in body["messages"]) + body["max_tokens"])
+            call = llm_telemetry.start_call('post', body, attempt)
+            if stream:
+                content = stream_completion_content(body, prompt_hash, call)
+                logger.info(f"Success! Streamed response, Prompt hash: {prompt_hash}")
+            else:
+                completion = get_backend().complete(body, timeout=60)
+                call.usage = completion.usage
+                call.partial = completion.content
+                rate_limiter.update_from_headers(completion.headers)
+                
+                # Log response ID for debugging
+                logger.info(f"Success! Response ID: {completion.response_id}, Prompt hash: {prompt_hash}")
+                if completion.refusal:
+                    raise ValueError(f"Model refused the structured output request: {completion.refusal}")
+                content = completion.content
+            call.finish('ok', content)
+            call = None
             
             # Try to parse as JSON first, fallback to plain text
-            content = response.choices[0].message.content
-            
-            try:
-                # Clean up markdown code blocks if present
-                clean_content = content.strip()
-                if clean_content.startswith('```json'):
-                    # Remove ```json from start and ``` from end
-                    clean_content = clean_content[7:]  # Remove ```json
-                    if clean_content.endswith('```'):
-                        clean_content = clean_content[:-3]  # Remove ```
-                elif clean_content.startswith('```'):
-                    # Remove ``` from start and end
-                    clean_content = clean_content[3:]
-                    if clean_content.endswith('```'):
-                        clean_content = clean_content[:-3]
-                
-                clean_content = clean_content.strip()
-                
-                # Attempt to parse as JSON
-                parsed_response = json.loads(clean_content)
-                
-                # Validate required fields
-                required_fields = ['html', 'meta_title', 'meta_desc', 'faq', 'citations', 'keywords']
-                if all(field in parsed_response for field in required_fields):
-                    return parsed_response
-                else:
-                    logger.warning("JSON response missing required fields, using fallback format")
-                    return create_fallback_response(content, topic)
-                    
-            except json.JSONDecodeError:
-                # If not JSON, create structured response
-                logger.info("Response not in JSON format, creating structured response")
-                return create_fallback_response(content, topic)
+            result, complete = parse_completion_content(content, topic)
+            if complete:
+                # Only complete responses are worth replaying
+                llm_cache.put(response_key, body["model"], content)
+            return result
             
         except Exception as e:
             logger.error(f"Attempt {attempt + 1} failed: {str(e)}")
-            if attempt < max_retries - 1:
-                # Exponential backoff
-                wait_time = 2 ** attempt
-                logger.info(f"Retrying in {wait_time} seconds...")
-                time.sleep(wait_time)
-            else:
-                logger.error(f"All retry attempts failed for prompt hash: {prompt_hash}")
-                raise e
+            if call is not None:
+                call.finish(classify_error(e))
+            decision = retry_policy.decide(e, attempt, retry_budget, max_retries)
+            if decision is None:
+                logger.error(f"Not retrying prompt hash {prompt_hash} after attempt {attempt + 1}")
+                raise
+            logger.info(f"Retrying {decision.error_class} failure in {decision.delay:.1f} seconds...")
+            if decision.error_class == RATE_LIMITED:
+                # Pause every worker until the quota resets; acquire() waits it out
+                rate_limiter.pause(decision.delay)
+            elif decision.delay:
+                time.sleep(decision.delay)
     
     return None
 
@@ -239,40 +429,112 @@ def create_fallback_response(content: str, topic: str) -> dict:
         "keywords": []
     }
 
-def generate_mlb_blog_post(topic: str, keywords: List[str], game_data: dict) -> dict:
-    """Main function to generate MLB-specific blog post using game data"""
-    try:
-        result = generate_mlb_blog_post_with_retries(topic, keywords, game_data)
-        if result is None:
-            raise Exception("Failed to generate blog post after all retries")
-        
-        # VALIDATION CHECKPOINT - Check quality before returning
-        html = result.get("html", "")
-        check = validate_blog_post(html, result)
-        if not check["valid"]:
-            logger.warning(f"Validation failed: {check['issues']}")
-            # Optional one-shot retry
-            retry = generate_mlb_blog_post_with_retries(topic, keywords, game_data, max_retries=1)
-            if isinstance(retry, dict):
-                retry_html = retry.get("html", "")
-                if validate_blog_post(retry_html, retry)["valid"]:
-                    return retry
-            # Attach issues for debugging
-            result["validation_issues"] = check["issues"]
+@dataclass(slots=True)
+class PostDraft:
+    """One post between generation steps: prompt (start_post), completion (draft_post), then validation (review_post)"""
+    topic: str
+    keywords: List[str]
+    game_data: Union[GameRecord, dict]
+    trace: PostRecord
+    retry_budget: Optional[RetryBudget] = None
+    body: Optional[dict] = None
+    result: Optional[dict] = None
+    done: bool = False  # result is final: reviewed, or the error fallback
+
+def error_blog_post(topic: str) -> dict:
+    """Minimal fallback response when generation fails"""
+    return {
+        "html": f"<h1>Error Generating Content</h1><p>Unable to generate blog post for: {topic}</p>",
+        "meta_title": f"Error - {topic}",
+        "meta_desc": "Content generation temporarily unavailable.",
+        "faq": [],
+        "citations": [],
+        "keywords": []
+    }
+
+def _fail_post(draft: PostDraft, error: Exception) -> PostDraft:
+    logger.error(f"Blog post generation failed: {str(error)}")
+    draft.trace.validation = FAILED
+    draft.result = error_blog_post(draft.topic)
+    draft.done = True
+    return draft
+
+def start_post(topic: str, keywords: List[str], game_data: Union[GameRecord, dict]) -> PostDraft:
+    """Build the completion request for one post"""
+    with llm_telemetry.post(topic) as trace:
+        draft = PostDraft(topic, keywords, game_data, trace)
+        try:
+            draft.game_data = GameRecord.coerce(game_data)
+            draft.retry_budget = retry_policy.game_budget()
+            draft.body = build_completion_request(topic, keywords, draft.game_data)
+        except Exception as e:
+            _fail_post(draft, e)
+    return draft
+
+def draft_post(draft: PostDraft) -> PostDraft:
+    """Run the completion, retrying per retry_policy (skipped when the result came from a batch)"""
+    if draft.done or draft.result is not None:
+        return draft
+    with llm_telemetry.post(draft.topic, draft.trace):
+        try:
+            draft.result = generate_mlb_blog_post_with_retries(draft.topic, draft.keywords, draft.game_data,
+                                                               retry_budget=draft.retry_budget, body=draft.body)
+            if draft.result is None:
+                raise Exception("Failed to generate blog post after all retries")
+        except Exception as e:
+            _fail_post(draft, e)
+    return draft
+
+def review_post(draft: PostDraft) -> PostDraft:
+    """Validate the completion, repairing or regenerating it once if it fails"""
+    if draft.done:
+        return draft
+    with llm_telemetry.post(draft.topic, draft.trace) as trace:
+        try:
+            draft.result = _review_result(draft.result, draft.topic, draft.keywords, draft.game_data, draft.retry_budget, trace)
+            draft.done = True
+        except Exception as e:
+            _fail_post(draft, e)
+    return draft
+
+def _review_result(result: dict, topic: str, keywords: List[str], game_data: GameRecord, retry_budget: RetryBudget,
+                   trace: PostRecord) -> dict:
+    # VALIDATION CHECKPOINT - Check quality before returning
+    html = result.get("html", "")
+    check = validate_blog_post(html, result)
+    generation_stats.record_post(valid_first_try=check["valid"])
+    trace.validation = VALID
+    if not check["valid"]:
+        logger.warning(f"Validation failed: {check['issues']}")
         
-        return result
+        # Fix the offending sections in place before paying for a whole new post
+        repaired, fixes = post_repairer.repair(result, game_data)
+        if fixes and validate_blog_post(repaired.get("html", ""), repaired)["valid"]:
+            logger.info(f"Repaired post without regenerating: {', '.join(fixes)}")
+            generation_stats.record_repair(fixed=True)
+            trace.validation = REPAIRED
+            return repaired
+        generation_stats.record_repair(fixed=False)
         
-    except Exception as e:
-        logger.error(f"Blog post generation failed: {str(e)}")
-        # Return minimal fallback response
-        return {
-            "html": f"<h1>Error Generating Content</h1><p>Unable to generate blog post for: {topic}</p>",
-            "meta_title": f"Error - {topic}",
-            "meta_desc": "Content generation temporarily unavailable.",
-            "faq": [],
-            "citations": [],
-            "keywords": []
-        }
+        # Optional one-shot retry, if the game and run still have retry budget
+        retry = None
+        if retry_policy.spend(retry_budget):
+            retry = generate_mlb_blog_post_with_retries(topic, keywords, game_data, max_retries=1, use_cache=False,
+                                                        retry_budget=retry_budget)
+        if isinstance(retry, dict):
+            retry_html = retry.get("html", "")
+            if validate_blog_post(retry_html, retry)["valid"]:
+                trace.validation = REGENERATED
+                return retry
+        # Attach issues for debugging
+        result["validation_issues"] = check["issues"]
+        trace.validation = INVALID
+    
+    return result
+
+def generate_mlb_blog_post(topic: str, keywords: List[str], game_data: Union[GameRecord, dict]) -> dict:
+    """Main function to generate MLB-specific blog post using game data"""
+    return review_post(draft_post(start_post(topic, keywords, game_data))).result
 
 # Keep the original function for backward compatibility
 def generate_blog_post(topic: str, keywords: List[str]) -> str:
@@ -3,104 +3,24 @@ from config import OPENAI_API_KEY
 from openai import OpenAI
 import random
 
+from team_registry import DEFAULT_LOGO_URL, MLB_TEAMS, team_registry
+
 client = OpenAI(api_key=OPENAI_API_KEY)
 
-# MLB team code mapping for ESPN logo URLs
-TEAM_LOGOS = {
-    'NYY': 'nyy', 'Yankees': 'nyy',
-    'TOR': 'tor', 'Blue Jays': 'tor',
-    'BOS': 'bos', 'Red Sox': 'bos', 
-    'LAD': 'lad', 'Dodgers': 'lad',
-    'SF': 'sf', 'Giants': 'sf',
-    'HOU': 'hou', 'Astros': 'hou',
-    'ATL': 'atl', 'Braves': 'atl',
-    'NYM': 'nym', 'Mets': 'nym',
-    'PHI': 'phi', 'Phillies': 'phi',
-    'WSN': 'wsh', 'Nationals': 'wsh',
-    'MIA': 'mia', 'Marlins': 'mia',
-    'CHC': 'chc', 'Cubs': 'chc',
-    'MIL': 'mil', 'Brewers': 'mil',
-    'STL': 'stl', 'Cardinals': 'stl',
-    'CIN': 'cin', 'Reds': 'cin',
-    'PIT': 'pit', 'Pirates': 'pit',
-    'LAA': 'laa', 'Angels': 'laa',
-    'SEA': 'sea', 'Mariners': 'sea',
-    'TEX': 'tex', 'Rangers': 'tex',
-    'OAK': 'oak', 'Athletics': 'oak',
-    'MIN': 'min', 'Twins': 'min',
-    'CWS': 'chw', 'White Sox': 'chw',
-    'CLE': 'cle', 'Guardians': 'cle',
-    'DET': 'det', 'Tigers': 'det',
-    'KC': 'kc', 'Royals': 'kc',
-    'TB': 'tb', 'Rays': 'tb',
-    'BAL': 'bal', 'Orioles': 'bal',
-    'COL': 'col', 'Rockies': 'col',
-    'ARI': 'ari', 'Diamondbacks': 'ari',
-    'SD': 'sd', 'Padres': 'sd'
-}
+# MLB team code/nickname -> ESPN logo code, derived from the shared registry
+TEAM_LOGOS = {}
+for _team in MLB_TEAMS:
+    TEAM_LOGOS[_team.code] = _team.espn_code
+    TEAM_LOGOS[_team.nickname] = _team.espn_code
 
 def get_team_logo_url(team_name):
     """Get official team logo URL from ESPN"""
-    # Clean up team name and try to match
-    team_clean = team_name.strip().upper()
-    
-    # Direct mapping for common variations
-    team_mappings = {
-        'YANKEES': 'nyy', 'NEW YORK YANKEES': 'nyy',
-        'BLUE JAYS': 'tor', 'TORONTO BLUE JAYS': 'tor', 'TORONTO': 'tor',
-        'RED SOX': 'bos', 'BOSTON RED SOX': 'bos', 'BOSTON': 'bos',
-        'DODGERS': 'lad', 'LOS ANGELES DODGERS': 'lad',
-        'GIANTS': 'sf', 'SAN FRANCISCO GIANTS': 'sf',
-        'ASTROS': 'hou', 'HOUSTON ASTROS': 'hou',
-        'BRAVES': 'atl', 'ATLANTA BRAVES': 'atl',
-        'METS': 'nym', 'NEW YORK METS': 'nym',
-        'PHILLIES': 'phi', 'PHILADELPHIA PHILLIES': 'phi',
-        'NATIONALS': 'wsh', 'WASHINGTON NATIONALS': 'wsh',
-        'MARLINS': 'mia', 'MIAMI MARLINS': 'mia',
-        'CUBS': 'chc', 'CHICAGO CUBS': 'chc',
-        'BREWERS': 'mil', 'MILWAUKEE BREWERS': 'mil',
-        'CARDINALS': 'stl', 'ST LOUIS CARDINALS': 'stl',
-        'REDS': 'cin', 'CINCINNATI REDS': 'cin',
-        'PIRATES': 'pit', 'PITTSBURGH PIRATES': 'pit',
-        'ANGELS': 'laa', 'LOS ANGELES ANGELS': 'laa',
-        'MARINERS': 'sea', 'SEATTLE MARINERS': 'sea',
-        'RANGERS': 'tex', 'TEXAS RANGERS': 'tex',
-        'ATHLETICS': 'oak', 'OAKLAND ATHLETICS': 'oak',
-        'TWINS': 'min', 'MINNESOTA TWINS': 'min',
-        'WHITE SOX': 'chw', 'CHICAGO WHITE SOX': 'chw',
-        'GUARDIANS': 'cle', 'CLEVELAND GUARDIANS': 'cle',
-        'TIGERS': 'det', 'DETROIT TIGERS': 'det',
-        'ROYALS': 'kc', 'KANSAS CITY ROYALS': 'kc',
-        'RAYS': 'tb', 'TAMPA BAY RAYS': 'tb',
-        'ORIOLES': 'bal', 'BALTIMORE ORIOLES': 'bal',
-        'ROCKIES': 'col', 'COLORADO ROCKIES': 'col',
-        'DIAMONDBACKS': 'ari', 'ARIZONA DIAMONDBACKS': 'ari',
-        'PADRES': 'sd', 'SAN DIEGO PADRES': 'sd'
-    }
-    
-    # Try exact match first
-    if team_clean in TEAM_LOGOS:
-        team_code = TEAM_LOGOS[team_clean]
-        return f"https://a.espncdn.com/i/teamlogos/mlb/500/{team_code}.png"
-    
-    # Try team name mappings
-    if team_clean in team_mappings:
-        team_code = team_mappings[team_clean]
-        return f"https://a.espncdn.com/i/teamlogos/mlb/500/{team_code}.png"
-    
-    # Try partial matches
-    for key, code in TEAM_LOGOS.items():
-        if key in team_clean or team_clean in key:
-            return f"https://a.espncdn.com/i/teamlogos/mlb/500/{code}.png"
-    
-    # Try partial matches with team name mappings
-    for name, code in team_mappings.items():
-        if name in team_clean or team_clean in name:
-            return f"https://a.espncdn.com/i/teamlogos/mlb/500/{code}.png"
+    if team_name and team_registry.get(team_name):
+        return team_registry.logo_url(team_name)
     
     print(f"⚠️  No logo match found for: {team_name}")
     # Default to MLB logo if no match
-    return "https://a.espncdn.com/i/teamlogos/mlb/500/mlb.png"
+    return DEFAULT_LOGO_URL
 
 def extract_teams_from_topic(topic):
     """Extract team names from blog topic"""
@@ -144,7 +64,7 @@ def generate_image(image_description):
             return get_team_logo_url(team_name)
     
     # Return MLB logo as fallback
-    return "https://a.espncdn.com/i/teamlogos/mlb/500/mlb.png"
+    return DEFAULT_LOGO_URL
 
 def generate_team_logos_for_matchup(away_team, home_team):
     """Generate both team logos for a matchup"""
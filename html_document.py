@@ -0,0 +1,232 @@
+# html_document.py
+import html as html_lib
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# One pass over the post: comments, or start/end tags (attribute values may contain '>')
+TOKEN = re.compile(r'<!--.*?-->|<(/?)([a-zA-Z][a-zA-Z0-9]*)((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>', re.DOTALL)
+ATTRIBUTE = re.compile(r'([a-zA-Z_:][-\w:.]*)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'=<>`]+)))?')
+ELLIPSIS = re.compile(r'\.{3,}')
+SENTENCE_BREAK = re.compile(r'\.\s+')
+
+VOID_TAGS = frozenset({'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'})
+HEADING_TAGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+# Text inside these is never auto-linked
+UNLINKABLE_TAGS = frozenset({'a', 'script', 'style', *HEADING_TAGS})
+# Label -> lowercase needle counted in the text
+METADATA_LABELS = {'Game Time': 'game time:', 'Lines': 'lines:'}
+KEY_TAKEAWAYS_HEADING = 'key takeaways'
+
+
+def split_sentences(text: str) -> List[str]:
+    """Naive sentence split (periods, ignoring ellipses) shared by validation and repair"""
+    text = ELLIPSIS.sub('', text)
+    return [s for s in SENTENCE_BREAK.split(text.strip()) if s]
+
+
+@dataclass(slots=True)
+class Anchor:
+    href: str
+    rel: str
+    start: int  # Offset of the <a> tag in the source
+    text: str = ''
+
+
+@dataclass(slots=True)
+class Heading:
+    level: int
+    text: str
+    start: int
+
+
+@dataclass(slots=True)
+class TextNode:
+    start: int  # Source span, so callers can splice markup in without re-parsing
+    end: int
+    text: str   # Entity-decoded
+    linkable: bool  # Not inside a link, heading, script or style
+
+
+@dataclass(slots=True)
+class PostDocument:
+    """Everything validation and post-processing need from a post, collected in one tokenizer pass"""
+    html: str
+    anchors: List[Anchor] = field(default_factory=list)
+    headings: List[Heading] = field(default_factory=list)
+    text_nodes: List[TextNode] = field(default_factory=list)
+    key_takeaways: Optional[str] = None  # Text of the paragraph after the Key Takeaways heading
+    metadata_counts: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(METADATA_LABELS, 0))
+
+    @property
+    def key_takeaway_sentences(self) -> List[str]:
+        return split_sentences(self.key_takeaways) if self.key_takeaways is not None else []
+
+    @property
+    def word_count(self) -> int:
+        return sum(len(node.text.split()) for node in self.text_nodes)
+
+
+def _attributes(source: str) -> Dict[str, str]:
+    attributes = {}
+    for match in ATTRIBUTE.finditer(source):
+        value = next((v for v in match.group(2, 3, 4) if v is not None), '')
+        attributes[match.group(1).lower()] = html_lib.unescape(value) if '&' in value else value
+    return attributes
+
+
+def parse_post(html: str) -> PostDocument:
+    """Tokenize html once into a PostDocument"""
+    document = PostDocument(html)
+    stack: List[str] = []
+    unlinkable = 0
+    heading: Optional[list] = None   # [level, start, text parts]
+    anchor: Optional[list] = None    # [Anchor, text parts]
+    takeaways: Optional[list] = None  # Text parts while inside the Key Takeaways paragraph
+    awaiting_takeaways = False       # Just closed the Key Takeaways heading; its <p> must come next
+    position = 0
+
+    def add_text(start: int, end: int):
+        nonlocal awaiting_takeaways
+        raw = html[start:end]
+        text = html_lib.unescape(raw) if '&' in raw else raw
+        document.text_nodes.append(TextNode(start, end, text, unlinkable == 0))
+        lowered = text.lower()
+        for label, needle in METADATA_LABELS.items():
+            if needle in lowered:
+                document.metadata_counts[label] += lowered.count(needle)
+        if heading is not None:
+            heading[2].append(text)
+        if anchor is not None:
+            anchor[1].append(text)
+        if takeaways is not None:
+            takeaways.append(text)
+        elif awaiting_takeaways and text.strip():
+            awaiting_takeaways = False
+
+    for match in TOKEN.finditer(html):
+        if match.start() > position:
+            add_text(position, match.start())
+        position = match.end()
+        name = match.group(2)
+        if name is None:  # Comment
+            continue
+        name = name.lower()
+        source = match.group(3)
+
+        if match.group(1):  # End tag
+            if name in stack:
+                while stack:
+                    popped = stack.pop()
+                    if popped in UNLINKABLE_TAGS:
+                        unlinkable -= 1
+                    if popped == name:
+                        break
+            if heading is not None and HEADING_TAGS.get(name) == heading[0]:
+                text = ''.join(heading[2]).strip()
+                document.headings.append(Heading(heading[0], text, heading[1]))
+                if heading[0] == 2 and text.lower() == KEY_TAKEAWAYS_HEADING and document.key_takeaways is None:
+                    awaiting_takeaways = True
+                heading = None
+            elif name == 'a' and anchor is not None:
+                anchor[0].text = ''.join(anchor[1]).strip()
+                anchor = None
+            elif name == 'p' and takeaways is not None:
+                document.key_takeaways = ''.join(takeaways)
+                takeaways = None
+            continue
+
+        # Start tag
+        if awaiting_takeaways:
+            awaiting_takeaways = False
+            if name == 'p':
+                takeaways = []
+        if name in HEADING_TAGS:
+            heading = [HEADING_TAGS[name], match.start(), []]
+        elif name == 'a':
+            attributes = _attributes(source)
+            if attributes.get('href'):
+                anchor = [Anchor(attributes['href'], attributes.get('rel', ''), match.start()), []]
+                document.anchors.append(anchor[0])
+        if name in VOID_TAGS or source.rstrip().endswith('/'):
+            continue
+        stack.append(name)
+        if name in UNLINKABLE_TAGS:
+            unlinkable += 1
+
+    if position < len(html):
+        add_text(position, len(html))
+    if takeaways is not None:  # Unclosed paragraph
+        document.key_takeaways = ''.join(takeaways)
+    return document
+
+
+if __name__ == '__main__':
+    # Microbenchmark: single-pass validation vs the previous regex validator
+    #   python html_document.py
+    # On a typical ~600-char post the regex validator is faster (about 0.7x here; both are
+    # well under a millisecond). The single pass only wins as links grow, since the regex
+    # validator re-searches the whole post once per link.
+    import timeit
+    from urllib.parse import urlparse
+
+    from generate_blog_post import ALLOWED_CITATION_DOMAINS, _hostname_ok, validate_blog_post
+    from llm_backend import fake_blog_post
+    import json
+
+    def regex_validate_blog_post(html: str, result: dict) -> dict:
+        """validate_blog_post before the single-pass parser"""
+        issues = []
+        anchors = re.findall(r'<a\s+[^>]*href="([^"]+)"[^>]*>', html, flags=re.IGNORECASE)
+        citation_count = len(anchors)
+        if citation_count < 2:
+            issues.append(f"Only {citation_count} inline citations found, need minimum 2.")
+        good_citations = 0
+        for href in anchors:
+            netloc = urlparse(href).netloc.lower()
+            if _hostname_ok(netloc, ALLOWED_CITATION_DOMAINS):
+                tag_match = re.search(rf'<a[^>]*href="{re.escape(href)}"[^>]*>', html, flags=re.IGNORECASE)
+                if tag_match:
+                    if re.search(r'rel\s*=\s*"[^\"]*\bnofollow\b[^\"]*"', tag_match.group(0), flags=re.IGNORECASE):
+                        good_citations += 1
+                    else:
+                        issues.append(f'Citation to {netloc} missing rel="nofollow".')
+        if good_citations < 2:
+            issues.append(f"Only {good_citations} qualified citations (allowed domains + nofollow); need ≥2.")
+        faq_count = len(result.get("faq", []) or [])
+        if faq_count < 4 or faq_count > 6:
+            issues.append(f"FAQ count is {faq_count}, should be 4–6.")
+        kt_match = re.search(r'<h2>\s*Key Takeaways\s*</h2>\s*<p>(.*?)</p>', html, flags=re.IGNORECASE | re.DOTALL)
+        if not kt_match:
+            issues.append("Key Takeaways section not found.")
+        else:
+            sentences = split_sentences(kt_match.group(1))
+            if len(sentences) != 3:
+                issues.append(f"Key Takeaways has {len(sentences)} sentences, need exactly 3.")
+        game_time_mentions = len(re.findall(r'>\s*Game Time:\s*<|Game Time:', html, flags=re.IGNORECASE))
+        lines_mentions = len(re.findall(r'>\s*Lines:\s*<|Lines:', html, flags=re.IGNORECASE))
+        if game_time_mentions != 1:
+            issues.append(f'"Game Time" appears {game_time_mentions} times; must be exactly once.')
+        if lines_mentions != 1:
+            issues.append(f'"Lines" appears {lines_mentions} times; must be exactly once.')
+        return {"valid": not issues, "issues": issues, "citation_count": citation_count, "faq_count": faq_count}
+
+    post = json.loads(fake_blog_post("<h1>Yankees at Red Sox MLB Betting Preview</h1>"))
+    paragraph = ('<p>Cole leans on the four-seamer, per <a href="https://baseballsavant.mlb.com/player/{n}" rel="nofollow">'
+                 'Baseball Savant</a>, and the Red Sox lineup has a <strong>.310 xBA</strong> against it '
+                 '(<a href="https://www.fangraphs.com/players/{n}" rel="nofollow">FanGraphs</a>).</p>')
+    cases = {
+        'typical post': post["html"],
+        '40 paragraphs / 82 links': post["html"] + ''.join(paragraph.format(n=n) for n in range(40)),
+        '200 paragraphs / 402 links': post["html"] + ''.join(paragraph.format(n=n) for n in range(200)),
+        'invalid (no nofollow)': post["html"].replace(' rel="nofollow"', ''),
+    }
+    for name, html in cases.items():
+        # Same verdict and issues as the validator it replaced
+        assert regex_validate_blog_post(html, post) == validate_blog_post(html, post), name
+        runs = 2000 if len(html) < 5000 else 50
+        # Best of several repeats, so one noisy repeat doesn't flip the comparison
+        old = min(timeit.repeat(lambda: regex_validate_blog_post(html, post), number=runs, repeat=5)) / runs
+        new = min(timeit.repeat(lambda: validate_blog_post(html, post), number=runs, repeat=5)) / runs
+        print(f"{name:28} {len(html):7} chars   regex {old * 1e3:8.3f} ms   single-pass {new * 1e3:8.3f} ms   "
+              f"speedup {old / new:5.2f}x")
@@ -0,0 +1,248 @@
+# line_tracker.py
+import logging
+import os
+import struct
+import threading
+import time
+from array import array
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional, Set
+
+from config import (
+    LINE_HISTORY_DIR, LINE_MOVE_THRESHOLD_HANDLE, LINE_MOVE_THRESHOLD_PROB,
+    LINE_POLL_INTERVAL_SECONDS
+)
+from game_time import GAME_TIMEZONE
+from team_registry import team_registry
+
+logger = logging.getLogger(__name__)
+
+# One on-disk sample: unix time, away/home American odds, away/home handle %
+_RECORD = struct.Struct('<dhhBB')
+# Samples outside what the record (and the in-memory arrays) can hold are malformed upstream data
+_ODDS_RANGE = range(-32768, 32768)
+_HANDLE_RANGE = range(0, 101)
+
+
+def parse_american_odds(odds: str) -> Optional[int]:
+    """'−150' (DraftKings uses a unicode minus), '-150', '+130' -> int"""
+    try:
+        return int(str(odds).replace('−', '-').replace('+', '').strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def implied_probability(odds: int) -> float:
+    """Vig-inclusive win probability implied by American odds"""
+    if odds < 0:
+        return -odds / (-odds + 100)
+    return 100 / (odds + 100)
+
+
+def line_key(away_team: str, home_team: str) -> str:
+    """Canonical "AWAY@HOME" key shared by the tracker and the daily run"""
+    away, home = team_registry.matchup_key(away_team, home_team)
+    return f"{away}@{home}"
+
+
+class LineSeries:
+    """Append-only, array-backed odds/handle time series for one game"""
+    
+    __slots__ = ('timestamps', 'away_odds', 'home_odds', 'away_handle', 'home_handle', 'baseline_index')
+    
+    def __init__(self):
+        self.timestamps = array('d')
+        self.away_odds = array('h')
+        self.home_odds = array('h')
+        self.away_handle = array('B')
+        self.home_handle = array('B')
+        self.baseline_index = 0  # Sample the current post was generated from
+    
+    def __len__(self):
+        return len(self.timestamps)
+    
+    def append(self, timestamp: float, away_odds: int, home_odds: int, away_handle: int, home_handle: int) -> bool:
+        """Add a sample; returns False (and stores nothing) if nothing moved since the last one"""
+        if self.timestamps and (
+            self.away_odds[-1] == away_odds and self.home_odds[-1] == home_odds
+            and self.away_handle[-1] == away_handle and self.home_handle[-1] == home_handle
+        ):
+            return False
+        self.timestamps.append(timestamp)
+        self.away_odds.append(away_odds)
+        self.home_odds.append(home_odds)
+        self.away_handle.append(away_handle)
+        self.home_handle.append(home_handle)
+        return True
+    
+    def _away_probability(self, i: int) -> float:
+        return implied_probability(self.away_odds[i])
+    
+    def movement(self, start: int = 0, end: int = -1) -> dict:
+        """Change between two samples (default: open vs current)"""
+        return {
+            'away_odds': (self.away_odds[start], self.away_odds[end]),
+            'home_odds': (self.home_odds[start], self.home_odds[end]),
+            'away_prob_change': self._away_probability(end) - self._away_probability(start),
+            'away_handle_change': self.away_handle[end] - self.away_handle[start],
+        }
+    
+    def open_vs_current(self) -> dict:
+        return self.movement(0, -1)
+    
+    def max_swing(self) -> dict:
+        """Largest range seen today in implied probability and handle"""
+        probabilities = [implied_probability(odds) for odds in self.away_odds]
+        return {
+            'away_prob_swing': max(probabilities) - min(probabilities),
+            'away_handle_swing': max(self.away_handle) - min(self.away_handle),
+        }
+    
+    def moved_since_baseline(self, prob_threshold: float, handle_threshold: float) -> bool:
+        if len(self) < 2 or self.baseline_index >= len(self) - 1:
+            return False
+        change = self.movement(self.baseline_index, -1)
+        return (abs(change['away_prob_change']) >= prob_threshold
+                or abs(change['away_handle_change']) >= handle_threshold)
+
+
+class LineMovementTracker:
+    """Samples DraftKings moneylines/handle per game and flags posts worth regenerating.
+    
+    Samples are kept in LineSeries arrays and appended to a fixed-width binary
+    file per game per day, so a full day of polling stays a few KB.
+    """
+    
+    def __init__(self, history_directory: str = LINE_HISTORY_DIR,
+                 prob_threshold: float = LINE_MOVE_THRESHOLD_PROB,
+                 handle_threshold: float = LINE_MOVE_THRESHOLD_HANDLE):
+        self.history_directory = history_directory
+        self.prob_threshold = prob_threshold
+        self.handle_threshold = handle_threshold
+        self.series: Dict[str, LineSeries] = {}
+        self.date_str: Optional[str] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+    
+    def _series_path(self, key: str) -> str:
+        return os.path.join(self.history_directory, self.date_str, f"{key}.bin")
+    
+    def _roll_date(self, date_str: str):
+        """Start a new day: drop in-memory series and reload anything already on disk"""
+        if date_str == self.date_str:
+            return
+        self.date_str = date_str
+        self.series = {}
+        day_directory = os.path.join(self.history_directory, date_str)
+        if not os.path.isdir(day_directory):
+            return
+        for filename in os.listdir(day_directory):
+            if not filename.endswith('.bin'):
+                continue
+            series = LineSeries()
+            with open(os.path.join(day_directory, filename), 'rb') as f:
+                for record in _RECORD.iter_unpack(f.read()):
+                    series.append(*record)
+            series.baseline_index = max(0, len(series) - 1)
+            self.series[filename[:-4]] = series
+    
+    def _extract_sample(self, betting_game: dict):
+        moneyline = (betting_game.get('markets') or {}).get('Moneyline') or []
+        away_code = team_registry.resolve(betting_game.get('away_team', ''))
+        away_entry = home_entry = None
+        for entry in moneyline:
+            if team_registry.resolve(entry.get('team', '')) == away_code:
+                away_entry = entry
+            else:
+                home_entry = entry
+        if not away_entry or not home_entry:
+            return None
+        
+        away_odds = parse_american_odds(away_entry.get('odds'))
+        home_odds = parse_american_odds(home_entry.get('odds'))
+        if away_odds is None or home_odds is None:
+            return None
+        try:
+            away_handle = int(str(away_entry.get('handle_pct', '0')).replace('%', ''))
+            home_handle = int(str(home_entry.get('handle_pct', '0')).replace('%', ''))
+        except ValueError:
+            return None
+        if away_odds not in _ODDS_RANGE or home_odds not in _ODDS_RANGE \
+                or away_handle not in _HANDLE_RANGE or home_handle not in _HANDLE_RANGE:
+            logger.warning(f"Skipping out-of-range line for {betting_game.get('away_team')} @ {betting_game.get('home_team')}: "
+                           f"odds {away_odds}/{home_odds}, handle {away_handle}%/{home_handle}%")
+            return None
+        return away_odds, home_odds, away_handle, home_handle
+    
+    def record_snapshot(self, betting_games: Iterable[dict], timestamp: Optional[float] = None) -> Set[str]:
+        """Append one sample per game; returns keys whose line moved past the thresholds"""
+        timestamp = timestamp or time.time()
+        moved = set()
+        with self._lock:
+            # Roll over on the slate's (Eastern) date, not the server's
+            self._roll_date(datetime.fromtimestamp(timestamp, GAME_TIMEZONE).strftime("%Y-%m-%d"))
+            for betting_game in betting_games or []:
+                sample = self._extract_sample(betting_game)
+                if not sample:
+                    continue
+                key = line_key(betting_game.get('away_team', ''), betting_game.get('home_team', ''))
+                series = self.series.setdefault(key, LineSeries())
+                if not series.append(timestamp, *sample):
+                    continue
+                
+                path = self._series_path(key)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'ab') as f:
+                    f.write(_RECORD.pack(timestamp, *sample))
+                
+                if series.moved_since_baseline(self.prob_threshold, self.handle_threshold):
+                    moved.add(key)
+        return moved
+    
+    def mark_published(self, keys: Iterable[str]):
+        """Reset the movement baseline once a post has been regenerated from the current line"""
+        with self._lock:
+            for key in keys:
+                series = self.series.get(key)
+                if series and len(series):
+                    series.baseline_index = len(series) - 1
+    
+    def get_series(self, key: str) -> Optional[LineSeries]:
+        return self.series.get(key)
+    
+    def summary(self) -> Dict[str, dict]:
+        """Open vs current and max swing for every tracked game"""
+        with self._lock:
+            return {
+                key: {**series.open_vs_current(), **series.max_swing(), 'samples': len(series)}
+                for key, series in self.series.items() if len(series)
+            }
+    
+    def poll_once(self, fetcher) -> Set[str]:
+        """Pull a fresh DraftKings snapshot and record it"""
+        return self.record_snapshot(fetcher.get_betting_data(allow_cached=False))
+    
+    def start_poller(self, fetcher_factory: Callable, on_move: Callable[[Set[str]], None],
+                     interval_seconds: int = LINE_POLL_INTERVAL_SECONDS) -> Optional[threading.Thread]:
+        """Poll every interval_seconds in a daemon thread; on_move gets the keys that crossed a threshold"""
+        if interval_seconds <= 0:
+            return None
+        
+        def loop():
+            while not self._stop.is_set():
+                try:
+                    moved = self.poll_once(fetcher_factory())
+                    if moved:
+                        logger.info(f"Line movement past threshold for: {', '.join(sorted(moved))}")
+                        on_move(moved)
+                        self.mark_published(moved)
+                except Exception as e:
+                    logger.error(f"Line poll failed: {e}")
+                self._stop.wait(interval_seconds)
+        
+        thread = threading.Thread(target=loop, daemon=True, name="line-poller")
+        thread.start()
+        return thread
+    
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,303 @@
+# link_engine.py
+import json
+import logging
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config import INTERLINK_MAP_PATH
+from html_document import PostDocument, parse_post
+
+logger = logging.getLogger(__name__)
+
+# Internal linking phrase-to-URL mapping (INTERLINK_MAP_PATH, when present, replaces it)
+DEFAULT_INTERLINK_MAP = {
+    # Stats product
+    "betting splits": "https://www.thebettinginsider.com/stats-about",
+    "public money": "https://www.thebettinginsider.com/stats-about",
+    "betting percentage": "https://www.thebettinginsider.com/stats-about",
+    "sharp money": "https://www.thebettinginsider.com/stats-about",
+    "betting trends": "https://www.thebettinginsider.com/stats-about",
+    "stats dashboard": "https://www.thebettinginsider.com/stats-about",
+    # Pitcher arsenal tool
+    "pitcher arsenal data": "https://www.thebettinginsider.com/daily-mlb-game-stats",
+    "pitch mix": "https://www.thebettinginsider.com/daily-mlb-game-stats",
+    "arsenal-specific performance": "https://www.thebettinginsider.com/daily-mlb-game-stats",
+    "batter vs pitch type stats": "https://www.thebettinginsider.com/daily-mlb-game-stats",
+    "projected xBA": "https://www.thebettinginsider.com/daily-mlb-game-stats",
+    "expected batting average": "https://www.thebettinginsider.com/daily-mlb-game-stats",
+    "contact-adjusted xBA": "https://www.thebettinginsider.com/daily-mlb-game-stats",
+    "xBA vs arsenal": "https://www.thebettinginsider.com/daily-mlb-game-stats",
+    "strikeout percentage": "https://www.thebettinginsider.com/daily-mlb-game-stats",
+    "K-rate": "https://www.thebettinginsider.com/daily-mlb-game-stats",
+    "strikeout rate": "https://www.thebettinginsider.com/daily-mlb-game-stats",
+    "whiff rate": "https://www.thebettinginsider.com/daily-mlb-game-stats",
+    "swing and miss %": "https://www.thebettinginsider.com/daily-mlb-game-stats"
+}
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+def _lower(text: str) -> str:
+    """Lowercase without changing the length, so offsets still line up with the source"""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return ''.join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+
+
+class PhraseAutomaton:
+    """Aho–Corasick automaton over lowercased phrases.
+    
+    Failure links are folded into a full transition table when it is built, so
+    scanning costs one dict lookup per character, however many phrases there are.
+    """
+    
+    def __init__(self, phrases: List[str]):
+        self.phrases = list(phrases)
+        self.lengths = [len(_lower(phrase)) for phrase in self.phrases]
+        goto: List[Dict[str, int]] = [{}]
+        output: List[Tuple[int, ...]] = [()]
+        for index, phrase in enumerate(self.phrases):
+            state = 0
+            for ch in _lower(phrase):
+                if ch not in goto[state]:
+                    goto[state][ch] = len(goto)
+                    goto.append({})
+                    output.append(())
+                state = goto[state][ch]
+            output[state] += (index,)
+        
+        # Breadth-first: each state inherits its failure state's transitions and outputs
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            output[state] += output[fail[state]]
+            for ch, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(ch, 0) if state else 0
+                queue.append(child)
+        self.delta = delta
+        self.output = output
+    
+    def scan(self, text: str, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, int, int]]:
+        """Yield (start, end, phrase index) for every whole-word, case-insensitive occurrence in text[start:end]"""
+        end = len(text) if end is None else end
+        delta, output, lengths = self.delta, self.output, self.lengths
+        state = 0
+        for position, ch in enumerate(_lower(text[start:end]), start):
+            state = delta[state].get(ch, 0)
+            if output[state]:
+                after = position + 1
+                for index in output[state]:
+                    before = after - lengths[index]
+                    # Same rule as regex \b on both sides of the phrase
+                    if (before > 0 and _is_word(text[before - 1]) == _is_word(text[before])) or \
+                            (after < len(text) and _is_word(text[after - 1]) == _is_word(text[after])):
+                        continue
+                    yield before, after, index
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledLinkMap:
+    automaton: PhraseAutomaton
+    urls: Tuple[str, ...]
+    priority: Tuple[int, ...]  # Phrase indices, longest phrase first
+    source: str
+    loaded_at: str
+
+
+def compile_link_map(link_map: Dict[str, str], source: str = 'default') -> CompiledLinkMap:
+    phrases = list(link_map)
+    return CompiledLinkMap(
+        automaton=PhraseAutomaton(phrases),
+        urls=tuple(link_map[phrase] for phrase in phrases),
+        priority=tuple(sorted(range(len(phrases)), key=lambda index: len(phrases[index]), reverse=True)),
+        source=source,
+        loaded_at=datetime.now().isoformat()
+    )
+
+
+class LinkEngine:
+    """Internal-link inserter over a compiled phrase map.
+    
+    The map is compiled once and swapped atomically when the JSON file at path
+    changes (checked on every call by mtime), so edits go live without a restart.
+    Without the file the built-in DEFAULT_INTERLINK_MAP is used.
+    """
+    
+    def __init__(self, path: Optional[str] = INTERLINK_MAP_PATH, default_map: Dict[str, str] = DEFAULT_INTERLINK_MAP):
+        self.path = path
+        self.default_map = default_map
+        self._lock = threading.Lock()
+        self._compiled = compile_link_map(default_map)
+        self._mtime: Optional[float] = None  # Of the file last attempted, valid or not
+    
+    def _file_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime if self.path else None
+        except OSError:
+            return None
+    
+    def current(self) -> CompiledLinkMap:
+        """The compiled map, reloading it first if the file changed"""
+        if self._file_mtime() != self._mtime:
+            self.reload()
+        return self._compiled
+    
+    def reload(self) -> CompiledLinkMap:
+        with self._lock:
+            mtime = self._file_mtime()
+            if mtime == self._mtime:
+                return self._compiled
+            self._mtime = mtime
+            if mtime is None:
+                if self._compiled.source != 'default':
+                    logger.info(f"{self.path} removed; using the built-in interlink map")
+                    self._compiled = compile_link_map(self.default_map)
+                return self._compiled
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    link_map = json.load(f)
+                if not isinstance(link_map, dict) or not all(
+                        isinstance(k, str) and k.strip() and isinstance(v, str) for k, v in link_map.items()):
+                    raise ValueError("expected a JSON object of phrase -> URL strings")
+                self._compiled = compile_link_map(link_map, self.path)
+                logger.info(f"Loaded {len(link_map)} interlink phrases from {self.path}")
+            except (OSError, ValueError) as e:
+                logger.error(f"Could not load {self.path}, keeping the current interlink map: {e}")
+            return self._compiled
+    
+    def find_links(self, html: str, max_links: int, document: Optional[PostDocument] = None) -> List[Tuple[int, int, str]]:
+        """Where links go: (start, end, url), at most one per phrase, longest phrases placed first"""
+        compiled = self.current()
+        document = document or parse_post(html)
+        occurrences: Dict[int, List[Tuple[int, int]]] = {}
+        for node in document.text_nodes:
+            if node.linkable:
+                for start, end, index in compiled.automaton.scan(html, node.start, node.end):
+                    occurrences.setdefault(index, []).append((start, end))
+        
+        links = []
+        for index in compiled.priority:
+            if len(links) >= max_links:
+                break
+            for start, end in occurrences.get(index, ()):
+                if not any(s < end and start < e for s, e, _ in links):
+                    links.append((start, end, compiled.urls[index]))
+                    break
+        return links
+    
+    def insert_links(self, html: str, max_links: int = 5, document: Optional[PostDocument] = None) -> str:
+        """Splice internal links into html at the matched source offsets"""
+        links = self.find_links(html, max_links, document)
+        if not links:
+            return html
+        parts, position = [], 0
+        for start, end, url in sorted(links):
+            matched_text = html[start:end]
+            # Add rel="nofollow" for promotional links
+            rel_attr = ' rel="nofollow"' if 'thebettinginsider.com' in url else ''
+            parts.append(html[position:start])
+            parts.append(f'<a href="{url}"{rel_attr}>{matched_text}</a>')
+            position = end
+            logger.info(f"Added internal link: '{matched_text}' -> {url}")
+        parts.append(html[position:])
+        logger.info(f"Total internal links added: {len(links)}")
+        return ''.join(parts)
+    
+    def status(self) -> dict:
+        compiled = self.current()
+        return {
+            'phrases': len(compiled.urls),
+            'source': compiled.source,
+            'loaded_at': compiled.loaded_at,
+        }
+
+
+link_engine = LinkEngine()
+
+
+if __name__ == '__main__':
+    # Benchmark: automaton vs one regex per phrase (and the old BeautifulSoup version when bs4 is installed)
+    #   python link_engine.py
+    import re
+    import timeit
+    
+    logging.disable(logging.CRITICAL)
+    engine = LinkEngine(path=None)
+    
+    def regex_insert_links(html: str, max_links: int = 5) -> str:
+        """One compiled regex per phrase over every text node"""
+        document = parse_post(html)
+        nodes = [node for node in document.text_nodes if node.linkable]
+        insertions = []
+        for phrase in sorted(DEFAULT_INTERLINK_MAP, key=len, reverse=True):
+            if len(insertions) >= max_links:
+                break
+            pattern = re.compile(r'\b' + re.escape(phrase) + r'\b', re.IGNORECASE)
+            match = next((m for node in nodes for m in pattern.finditer(html, node.start, node.end)
+                          if not any(s < m.end() and m.start() < e for s, e, _ in insertions)), None)
+            if match:
+                url = DEFAULT_INTERLINK_MAP[phrase]
+                insertions.append((match.start(), match.end(), f'<a href="{url}" rel="nofollow">{match.group()}</a>'))
+        parts, position = [], 0
+        for start, end, anchor in sorted(insertions):
+            parts += [html[position:start], anchor]
+            position = end
+        return ''.join(parts) + html[position:]
+    
+    def soup_insert_links(html: str, max_links: int = 5) -> str:
+        """Per phrase, walk every text node and re-parse each replacement"""
+        soup = BeautifulSoup(html, 'html.parser')
+        inserted = 0
+        for phrase in sorted(DEFAULT_INTERLINK_MAP, key=len, reverse=True):
+            if inserted >= max_links:
+                break
+            for element in soup.find_all(string=True):
+                if element.parent.name in ['a', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'script', 'style']:
+                    continue
+                pattern = r'\b' + re.escape(phrase) + r'\b'
+                match = re.search(pattern, str(element), re.IGNORECASE)
+                if match:
+                    url = DEFAULT_INTERLINK_MAP[phrase]
+                    new_text = re.sub(pattern, f'<a href="{url}" rel="nofollow">{match.group()}</a>', str(element),
+                                      count=1, flags=re.IGNORECASE)
+                    element.replace_with(BeautifulSoup(new_text, 'html.parser'))
+                    inserted += 1
+                    break
+        return str(soup)
+    
+    try:
+        from bs4 import BeautifulSoup
+    except ImportError:
+        BeautifulSoup = None
+    
+    filler = ('<p>The Yankees have won six of their last eight, and <strong>Gerrit Cole</strong> carries a 3.12 ERA '
+              'into a park that has played neutral this season. <a href="https://www.fangraphs.com/x" rel="nofollow">'
+              'FanGraphs</a> projects a close game.</p>')
+    linked = ('<p>Boston\'s pitch mix leans on sliders; the whiff rate is up, the Strikeout Rate is steady and '
+              'sharp money has come in on the under. Betting splits show 62% of tickets on New York.</p>')
+    cases = {
+        'typical post (phrases early)': '<h1>Preview</h1>' + linked + filler * 8,
+        '300 paragraphs, phrases at end': '<h1>Preview</h1>' + filler * 300 + linked,
+        '300 paragraphs, no phrases': '<h1>Preview</h1>' + filler * 300,
+        '300 paragraphs, 40 max_links': '<h1>Preview</h1>' + (filler * 5 + linked) * 50,
+    }
+    for name, html in cases.items():
+        max_links = 40 if '40' in name else 5
+        assert engine.insert_links(html, max_links) == regex_insert_links(html, max_links), name
+        runs = 200 if len(html) < 5000 else 10
+        timings = [('automaton', lambda: engine.insert_links(html, max_links)),
+                   ('regex/phrase', lambda: regex_insert_links(html, max_links))]
+        if BeautifulSoup is not None:
+            timings.append(('BeautifulSoup', lambda: soup_insert_links(html, max_links)))
+        results = '   '.join(f"{label} {timeit.timeit(fn, number=runs) / runs * 1e3:8.2f} ms" for label, fn in timings)
+        print(f"{name:32} {len(html):7} chars   {results}")
@@ -0,0 +1,278 @@
+# llm_backend.py
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Mapping, Optional
+
+from config import (
+    FAKE_LLM_ERROR_RATE, FAKE_LLM_LATENCY_SECONDS, FAKE_LLM_RATE_LIMIT_RATE,
+    LLM_BACKEND, OPENAI_API_KEY, OPENAI_BASE_URL
+)
+
+logger = logging.getLogger(__name__)
+
+
+class BackendError(Exception):
+    """A completion request failed; status_code is None for network errors and timeouts"""
+    
+    def __init__(self, message: str, status_code: Optional[int] = None, headers: Optional[Mapping[str, str]] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.headers = dict(headers or {})
+
+
+class BackendRateLimitError(BackendError):
+    """HTTP 429 from the backend; headers carry retry-after / x-ratelimit-reset-*"""
+
+
+@dataclass(slots=True)
+class Completion:
+    content: str
+    response_id: str = 'unknown'
+    headers: Dict[str, str] = field(default_factory=dict)
+    refusal: Optional[str] = None
+    usage: Optional[Dict[str, int]] = None  # prompt_tokens / completion_tokens, when the backend reports them
+
+
+class CompletionStream:
+    """Text deltas of a streamed completion; close() abandons the request.
+    
+    usage is filled in by the backend once the stream has been read to the end.
+    """
+    
+    def __init__(self, deltas: Iterator[str], headers: Optional[Mapping[str, str]] = None, on_close=None):
+        self._deltas = deltas
+        self.headers = dict(headers or {})
+        self.usage: Optional[Dict[str, int]] = None
+        self._on_close = on_close
+    
+    def __iter__(self) -> Iterator[str]:
+        return self._deltas
+    
+    def close(self):
+        if self._on_close:
+            self._on_close()
+
+
+class LLMBackend:
+    """Chat completion transport used by generate_blog_post.
+    
+    body is a Chat Completions request body (model, messages, max_tokens,
+    temperature, optional response_format).
+    """
+    name = 'base'
+    
+    def complete(self, body: dict, timeout: float = 60) -> Completion:
+        raise NotImplementedError
+    
+    def stream(self, body: dict, timeout: float = 60) -> CompletionStream:
+        raise NotImplementedError
+
+
+class OpenAIBackend(LLMBackend):
+    """OpenAI Chat Completions; the client is created on first use, not at import"""
+    name = 'openai'
+    
+    def __init__(self, api_key: Optional[str] = OPENAI_API_KEY, base_url: Optional[str] = OPENAI_BASE_URL):
+        self.api_key = api_key
+        self.base_url = base_url
+        self._client = None
+        self._lock = threading.Lock()
+    
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                from openai import OpenAI
+                self._client = OpenAI(api_key=self.api_key, base_url=self.base_url)
+            return self._client
+    
+    def _translate(self, error: Exception) -> Exception:
+        import openai
+        if isinstance(error, openai.RateLimitError):
+            return BackendRateLimitError(str(error), 429, error.response.headers)
+        if isinstance(error, openai.APIStatusError):
+            return BackendError(str(error), error.status_code, error.response.headers)
+        if isinstance(error, openai.APIConnectionError):  # Includes timeouts
+            return BackendError(str(error))
+        return error
+    
+    @staticmethod
+    def _usage(usage) -> Optional[Dict[str, int]]:
+        if usage is None:
+            return None
+        return {'prompt_tokens': usage.prompt_tokens, 'completion_tokens': usage.completion_tokens}
+    
+    def complete(self, body: dict, timeout: float = 60) -> Completion:
+        try:
+            raw_response = self.client.chat.completions.with_raw_response.create(timeout=timeout, **body)
+        except Exception as e:
+            raise self._translate(e) from e
+        response = raw_response.parse()
+        message = response.choices[0].message
+        return Completion(
+            content=message.content or '',
+            response_id=getattr(response, 'id', 'unknown'),
+            headers=dict(raw_response.headers),
+            refusal=getattr(message, 'refusal', None),
+            usage=self._usage(getattr(response, 'usage', None))
+        )
+    
+    def stream(self, body: dict, timeout: float = 60) -> CompletionStream:
+        try:
+            raw_response = self.client.chat.completions.with_raw_response.create(
+                timeout=timeout, stream=True, stream_options={"include_usage": True}, **body
+            )
+        except Exception as e:
+            raise self._translate(e) from e
+        stream = raw_response.parse()
+        
+        def deltas():
+            try:
+                for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+                    if getattr(chunk, 'usage', None):
+                        # Final chunk (no choices) when include_usage is set
+                        completion_stream.usage = self._usage(chunk.usage)
+            except Exception as e:
+                raise self._translate(e) from e
+        
+        completion_stream = CompletionStream(deltas(), raw_response.headers, on_close=stream.close)
+        return completion_stream
+
+
+def fake_blog_post(user_prompt: str) -> str:
+    """Schema-valid post that passes validate_blog_post, titled from the prompt's <h1>"""
+    title_match = re.search(r'<h1>(.*?)</h1>', user_prompt)
+    title = title_match.group(1) if title_match else "MLB Game Preview"
+    html = (
+        f"<h1>{title}</h1>"
+        "<p><strong>Game Time:</strong> TBD | <strong>Lines:</strong> See sportsbook</p>"
+        "<p>By MLB Analytics Team | Reviewed by Senior Baseball Analysts</p>"
+        "<h2>Matchup Overview</h2>"
+        "<p>Pitch mix data from <a href=\"https://baseballsavant.mlb.com\" rel=\"nofollow\">Baseball Savant</a> "
+        "and splits from <a href=\"https://fangraphs.com\" rel=\"nofollow\">FanGraphs</a> frame this one.</p>"
+        "<h2>Key Takeaways</h2>"
+        "<p>The starters are evenly matched. Neither lineup owns a clear edge. The umpire is neutral.</p>"
+        "<p>Analysis based on xBA models and historical data. Do not bet based solely on this article.</p>"
+    )
+    return json.dumps({
+        "html": html,
+        "meta_title": title[:60],
+        "meta_desc": f"{title} preview with pitcher and lineup analysis.",
+        "faq": [{"question": f"Question {n}?", "answer": f"Answer {n}."} for n in range(1, 5)],
+        "citations": [
+            {"source": "Baseball Savant", "url": "https://baseballsavant.mlb.com"},
+            {"source": "FanGraphs", "url": "https://fangraphs.com"},
+        ],
+        "keywords": ["mlb", "preview"],
+    })
+
+
+def fake_completion_content(body: dict) -> str:
+    """Plausible reply to any request this service sends (full post or a repair section)"""
+    user_prompt = next((m["content"] for m in body.get("messages", []) if m.get("role") == "user"), "")
+    if "Key Takeaways paragraph" in user_prompt:
+        return "The pitching matchup is close. One lineup handles the arsenal better. The total looks fair."
+    faq_request = re.search(r'Write (\d+) more FAQ entries', user_prompt)
+    if faq_request:
+        count = int(faq_request.group(1))
+        return json.dumps({"faq": [{"question": f"Extra question {n}?", "answer": f"Answer {n}."} for n in range(1, count + 1)]})
+    return fake_blog_post(user_prompt)
+
+
+class FakeBackend(LLMBackend):
+    """In-process stand-in with configurable latency, error rate and 429 rate (no network, no cost)"""
+    name = 'fake'
+    
+    def __init__(self, latency_seconds: float = FAKE_LLM_LATENCY_SECONDS, error_rate: float = FAKE_LLM_ERROR_RATE,
+                 rate_limit_rate: float = FAKE_LLM_RATE_LIMIT_RATE, retry_after_seconds: float = 1.0,
+                 seed: Optional[int] = None):
+        self.latency_seconds = latency_seconds
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after_seconds = retry_after_seconds
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    def _admit(self) -> float:
+        """Decide this call's fate up front; returns its simulated latency"""
+        with self._lock:
+            self.calls += 1
+            roll = self._rng.random()
+            latency = self.latency_seconds * self._rng.uniform(0.75, 1.25)
+        if roll < self.rate_limit_rate:
+            raise BackendRateLimitError("Fake rate limit", 429, {'retry-after': str(self.retry_after_seconds)})
+        if roll < self.rate_limit_rate + self.error_rate:
+            time.sleep(latency / 2)
+            raise BackendError("Fake server error", 500)
+        return latency
+    
+    def _headers(self) -> Dict[str, str]:
+        return {'x-request-id': uuid.uuid4().hex}
+    
+    def complete(self, body: dict, timeout: float = 60) -> Completion:
+        latency = self._admit()
+        if latency > timeout:
+            time.sleep(timeout)
+            raise BackendError(f"Fake request timed out after {timeout}s")
+        time.sleep(latency)
+        return Completion(fake_completion_content(body), f"fake-{uuid.uuid4().hex[:12]}", self._headers())
+    
+    def stream(self, body: dict, timeout: float = 60) -> CompletionStream:
+        latency = self._admit()
+        content = fake_completion_content(body)
+        pieces = [content[i:i + 64] for i in range(0, len(content), 64)] or ['']
+        delay = latency / len(pieces)
+        
+        def deltas():
+            for piece in pieces:
+                time.sleep(delay)
+                yield piece
+        
+        return CompletionStream(deltas(), self._headers())
+
+
+_backend: Optional[LLMBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> LLMBackend:
+    """Process-wide backend chosen by LLM_BACKEND"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = FakeBackend() if LLM_BACKEND == 'fake' else OpenAIBackend()
+            logger.info(f"Using {_backend.name} LLM backend")
+        return _backend
+
+
+def set_backend(backend: LLMBackend):
+    """Swap the backend (load tests, offline runs)"""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+if __name__ == '__main__':
+    # Offline end-to-end benchmark of generate_daily_blogs against the fake backend:
+    #   MLB_REPLAY_DATE=2025-07-08 FAKE_LLM_LATENCY_SECONDS=2 python llm_backend.py
+    import llm_backend  # The module the pipeline imports, not this __main__ copy
+    import main
+    from generate_blog_post import generation_stats
+    from llm_cache import llm_cache
+    
+    backend = llm_backend.FakeBackend()
+    llm_backend.set_backend(backend)
+    llm_cache.enabled = False  # Every game should reach the backend
+    start = time.perf_counter()
+    main.generate_daily_blogs(force_full=True)
+    elapsed = time.perf_counter() - start
+    print(f"generate_daily_blogs: {elapsed:.2f}s, {backend.calls} completion calls, {generation_stats.stats()}")
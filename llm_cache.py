@@ -0,0 +1,125 @@
+# llm_cache.py
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from config import LLM_CACHE_ENABLED, LLM_CACHE_MAX_MB, LLM_CACHE_PATH
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_prompt(text: str) -> str:
+    """Ignore whitespace-only differences (line endings, trailing spaces, padding)"""
+    lines = text.replace('\r\n', '\n').split('\n')
+    return '\n'.join(line.rstrip() for line in lines).strip()
+
+
+def cache_key(model: str, system_prompt: str, user_prompt: str, **params) -> str:
+    """sha256 over everything that determines the completion"""
+    payload = json.dumps({
+        'model': model,
+        'system': normalize_prompt(system_prompt),
+        'user': normalize_prompt(user_prompt),
+        'params': params,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """Persistent completion cache in SQLite, evicting least recently used entries past max_bytes"""
+    
+    def __init__(self, path: str = LLM_CACHE_PATH, max_bytes: int = LLM_CACHE_MAX_MB * 1024 * 1024,
+                 enabled: bool = LLM_CACHE_ENABLED):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+    
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, model TEXT, content TEXT, size INTEGER, "
+                "created_at REAL, last_used_at REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses(last_used_at)")
+            self._conn.commit()
+        return self._conn
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return cached completion content, counting the hit or miss"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            try:
+                conn = self._connection()
+                row = conn.execute("SELECT content FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                conn.execute("UPDATE responses SET last_used_at = ? WHERE key = ?", (time.time(), key))
+                conn.commit()
+                self.hits += 1
+                return row[0]
+            except sqlite3.Error as e:
+                logger.warning(f"LLM cache read failed: {e}")
+                self.misses += 1
+                return None
+    
+    def put(self, key: str, model: str, content: str):
+        """Store a completion, then evict the oldest entries beyond max_bytes"""
+        if not self.enabled:
+            return
+        size = len(content.encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, model, content, size, created_at, last_used_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, model, content, size, now, now)
+                )
+                self._evict(conn)
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"LLM cache write failed: {e}")
+    
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_used_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        logger.info(f"LLM cache evicted {evicted} entries ({total} bytes kept)")
+    
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+# Shared by every completion in the process
+llm_cache = LLMResponseCache()
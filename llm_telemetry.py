@@ -0,0 +1,200 @@
+# llm_telemetry.py
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional
+
+from config import LLM_BATCH_PRICE_DISCOUNT, LLM_PRICE_INPUT_PER_MTOK, LLM_PRICE_OUTPUT_PER_MTOK
+from prompt_budget import token_counter
+
+# Validation outcomes of a post
+VALID = 'valid'              # Passed validate_blog_post as generated
+REPAIRED = 'repaired'        # Fixed in place by PostRepairer
+REGENERATED = 'regenerated'  # Passed after a full regeneration
+INVALID = 'invalid'          # Published with validation_issues
+FAILED = 'failed'            # Generation raised; the error placeholder was published
+
+
+@dataclass(slots=True)
+class CallRecord:
+    """One completion request (or cache hit)"""
+    kind: str                  # 'post', 'section' (repair) or 'batch'
+    post: Optional[str]        # Topic of the post the call was made for
+    model: str
+    attempt: int               # 0 for the first try, n for the nth retry
+    outcome: str               # 'ok', 'cache_hit' or a retry_policy error class
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    usage_estimated: bool = False  # Backend reported no usage; counted with token_counter
+    latency_seconds: Optional[float] = None
+    ttft_seconds: Optional[float] = None  # Streamed calls only
+    cost_usd: float = 0.0
+
+
+@dataclass(slots=True)
+class PostRecord:
+    """Totals for every call made while generating one post"""
+    post: str
+    calls: int = 0
+    completions: int = 0  # Full-post calls; every one after the first is a retry
+    retries: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_seconds: float = 0.0
+    cost_usd: float = 0.0
+    validation: Optional[str] = None
+
+
+def call_cost(prompt_tokens: int, completion_tokens: int, batch: bool = False) -> float:
+    cost = (prompt_tokens * LLM_PRICE_INPUT_PER_MTOK + completion_tokens * LLM_PRICE_OUTPUT_PER_MTOK) / 1_000_000
+    return cost * (1 - LLM_BATCH_PRICE_DISCOUNT) if batch else cost
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return round(ordered[int(rank) - 1], 3)
+
+
+class CallTimer:
+    """Times one completion from request to finish(); the caller fills usage/partial as they arrive"""
+    
+    def __init__(self, telemetry: 'LLMTelemetry', kind: str, body: dict, attempt: int):
+        self.telemetry = telemetry
+        self.kind = kind
+        self.body = body
+        self.attempt = attempt
+        self.usage: Optional[Dict[str, int]] = None
+        self.partial = ''  # Text received before a stream was aborted
+        self.ttft: Optional[float] = None
+        self._start = time.perf_counter()
+    
+    def first_token(self):
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self._start
+    
+    def finish(self, outcome: str, content: Optional[str] = None):
+        latency = time.perf_counter() - self._start
+        if content is None:
+            content = self.partial
+        self.telemetry.record(self.kind, self.body, self.attempt, outcome, content, self.usage, latency, self.ttft)
+
+
+class LLMTelemetry:
+    """Per-run record of every LLM call: tokens, latency, TTFT, retries, validation outcome and cost"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+    
+    def reset(self):
+        with self._lock:
+            self.calls: List[CallRecord] = []
+            self.posts: List[PostRecord] = []
+    
+    @contextmanager
+    def post(self, topic: str, record: Optional[PostRecord] = None) -> Iterator[PostRecord]:
+        """Attribute the calls made on this thread to one post (pass record to resume one begun on another thread)"""
+        if record is None:
+            record = PostRecord(topic)
+            with self._lock:
+                self.posts.append(record)
+        previous = getattr(self._local, 'post', None)
+        self._local.post = record
+        try:
+            yield record
+        finally:
+            self._local.post = previous
+    
+    def start_call(self, kind: str, body: dict, attempt: int = 0) -> CallTimer:
+        return CallTimer(self, kind, body, attempt)
+    
+    def record(self, kind: str, body: dict, attempt: int, outcome: str, content: str = '',
+               usage: Optional[Dict[str, int]] = None, latency: Optional[float] = None,
+               ttft: Optional[float] = None, post: Optional[PostRecord] = None):
+        post = post or getattr(self._local, 'post', None)
+        if outcome == 'cache_hit':
+            prompt_tokens = completion_tokens = 0
+        elif usage:
+            prompt_tokens, completion_tokens = usage.get('prompt_tokens', 0), usage.get('completion_tokens', 0)
+        else:
+            prompt_tokens = sum(token_counter.count(message["content"]) for message in body["messages"])
+            # A failed request is only billed for output it actually streamed back
+            completion_tokens = token_counter.count(content) if content else 0
+            if outcome != 'ok' and not content:
+                prompt_tokens = 0
+        call = CallRecord(
+            kind=kind,
+            post=post.post if post else None,
+            model=body["model"],
+            attempt=attempt,
+            outcome=outcome,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            usage_estimated=not usage and outcome != 'cache_hit',
+            latency_seconds=round(latency, 3) if latency is not None else None,
+            ttft_seconds=round(ttft, 3) if ttft is not None else None,
+            cost_usd=round(call_cost(prompt_tokens, completion_tokens, batch=kind == 'batch'), 6),
+        )
+        with self._lock:
+            self.calls.append(call)
+            if post:
+                if kind in ('post', 'batch'):
+                    post.retries += 1 if post.completions else 0
+                    post.completions += 1
+                post.calls += 1
+                post.prompt_tokens += prompt_tokens
+                post.completion_tokens += completion_tokens
+                post.latency_seconds = round(post.latency_seconds + (latency or 0.0), 3)
+                post.cost_usd = round(post.cost_usd + call.cost_usd, 6)
+    
+    def stats(self) -> dict:
+        with self._lock:
+            calls = list(self.calls)
+            posts = [post for post in self.posts if post.validation is not None]
+        requests = [call for call in calls if call.outcome != 'cache_hit']
+        latencies = [call.latency_seconds for call in requests if call.latency_seconds is not None]
+        ttfts = [call.ttft_seconds for call in requests if call.ttft_seconds is not None]
+        errors: Dict[str, int] = {}
+        for call in requests:
+            if call.outcome != 'ok':
+                errors[call.outcome] = errors.get(call.outcome, 0) + 1
+        validation: Dict[str, int] = {}
+        for post in posts:
+            validation[post.validation] = validation.get(post.validation, 0) + 1
+        prompt_tokens = sum(call.prompt_tokens for call in calls)
+        completion_tokens = sum(call.completion_tokens for call in calls)
+        cost = sum(call.cost_usd for call in calls)
+        return {
+            'calls': len(requests),
+            'cache_hits': len(calls) - len(requests),
+            'errors': errors,
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'usage_estimated_calls': sum(1 for call in requests if call.usage_estimated),
+            'latency_p50_seconds': percentile(latencies, 50),
+            'latency_p95_seconds': percentile(latencies, 95),
+            'ttft_p50_seconds': percentile(ttfts, 50),
+            'ttft_p95_seconds': percentile(ttfts, 95),
+            'posts': len(posts),
+            'retries': sum(post.retries for post in posts),
+            'validation': validation,
+            'tokens_per_post': round((prompt_tokens + completion_tokens) / len(posts)) if posts else 0,
+            'cost_per_post_usd': round(cost / len(posts), 4) if posts else 0.0,
+            'slate_cost_usd': round(cost, 4),
+        }
+    
+    def export(self) -> dict:
+        """Summary plus the raw post and call records, for the run's telemetry file"""
+        with self._lock:
+            calls = [asdict(call) for call in self.calls]
+            posts = [asdict(post) for post in self.posts]
+        return {'summary': self.stats(), 'posts': posts, 'calls': calls}
+
+
+llm_telemetry = LLMTelemetry()
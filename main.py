@@ -1,24 +1,41 @@
 # main.py (Enhanced Web Service Version)
 import os
 import threading
-import time
-import schedule
 import logging
 import uuid
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from urllib.parse import quote, urljoin
+from urllib.parse import quote, urljoin, urlparse
 import json
 import re
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
 from flask import Flask, Response, render_template, redirect, url_for, request
 import mistune
-from bs4 import BeautifulSoup
 import pytz
 
-from generate_blog_post import generate_mlb_blog_post
+from generate_blog_post import PostDraft, draft_post, generation_stats, review_post, start_post
 from generate_image import generate_team_logos_for_matchup
 from mlb_data_fetcher import MLBDataFetcher
+from batch_generation import BatchGenerator
+from config import (
+    DRAFT_LEAD_MINUTES, LINE_POLL_INTERVAL_SECONDS, LLM_MAX_CONCURRENCY, PIPELINE_ENRICH_WORKERS,
+    PIPELINE_PERSIST_WORKERS, PIPELINE_VALIDATE_WORKERS, REFRESH_LEAD_MINUTES
+)
+from deadline_scheduler import DeadlineJob, DeadlineScheduler, deadline_stats, has_started
+from game_time import current_slate_date
+from html_document import PostDocument, parse_post
+from line_tracker import LineMovementTracker, line_key
+from link_engine import link_engine
+from llm_cache import llm_cache
+from llm_telemetry import FAILED, INVALID, llm_telemetry
+from prompt_budget import prompt_token_stats
+from retry_policy import retry_policy
+from mlb_models import GameRecord
+from pipeline import Stage, StagePipeline
+from slate_diff import diff_slate, fingerprint_game, load_previous_posts
+from trigger_scheduler import TriggerScheduler
+from upstream_client import upstream_client
 
 # Configure logging
 logging.basicConfig(
@@ -33,6 +50,12 @@ app = Flask(__name__)
 BASE_URL = os.environ.get('BASE_URL', 'https://www.thebettinginsider.com')
 TIMEZONE = pytz.timezone('US/Eastern')
 
+# Intraday odds/handle history; the poller only triggers regeneration on real movement
+line_tracker = LineMovementTracker()
+
+# Scheduled, manual and line-move runs write the same day's folders, so run one at a time
+generation_lock = threading.Lock()
+
 # Request ID middleware
 @app.before_request
 def before_request():
@@ -57,92 +80,24 @@ markdown = mistune.create_markdown(
     plugins=['strikethrough', 'footnotes', 'table']
 )
 
-# Internal linking phrase-to-URL mapping
-INTERLINK_MAP = {
-    # Stats product
-    "betting splits": "https://www.thebettinginsider.com/stats-about",
-    "public money": "https://www.thebettinginsider.com/stats-about",
-    "betting percentage": "https://www.thebettinginsider.com/stats-about",
-    "sharp money": "https://www.thebettinginsider.com/stats-about",
-    "betting trends": "https://www.thebettinginsider.com/stats-about",
-    "stats dashboard": "https://www.thebettinginsider.com/stats-about",
-    # Pitcher arsenal tool
-    "pitcher arsenal data": "https://www.thebettinginsider.com/daily-mlb-game-stats",
-    "pitch mix": "https://www.thebettinginsider.com/daily-mlb-game-stats",
-    "arsenal-specific performance": "https://www.thebettinginsider.com/daily-mlb-game-stats",
-    "batter vs pitch type stats": "https://www.thebettinginsider.com/daily-mlb-game-stats",
-    "projected xBA": "https://www.thebettinginsider.com/daily-mlb-game-stats",
-    "expected batting average": "https://www.thebettinginsider.com/daily-mlb-game-stats",
-    "contact-adjusted xBA": "https://www.thebettinginsider.com/daily-mlb-game-stats",
-    "xBA vs arsenal": "https://www.thebettinginsider.com/daily-mlb-game-stats",
-    "strikeout percentage": "https://www.thebettinginsider.com/daily-mlb-game-stats",
-    "K-rate": "https://www.thebettinginsider.com/daily-mlb-game-stats",
-    "strikeout rate": "https://www.thebettinginsider.com/daily-mlb-game-stats",
-    "whiff rate": "https://www.thebettinginsider.com/daily-mlb-game-stats",
-    "swing and miss %": "https://www.thebettinginsider.com/daily-mlb-game-stats"
-}
-
-def auto_link_blog_content_safe(html_content: str, max_links: int = 5) -> str:
-    """Safely insert internal links using HTML parser to avoid breaking existing links"""
+def auto_link_blog_content_safe(html_content: str, max_links: int = 5, document: Optional[PostDocument] = None) -> str:
+    """Insert internal links into text outside existing links, headings and scripts (see link_engine.py)"""
     if not html_content or max_links <= 0:
         return html_content
     
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        links_inserted = 0
-        
-        # Sort phrases by length (longest first) to avoid partial matching
-        sorted_phrases = sorted(INTERLINK_MAP.keys(), key=len, reverse=True)
-        
-        for phrase in sorted_phrases:
-            if links_inserted >= max_links:
-                break
-                
-            url = INTERLINK_MAP[phrase]
-            
-            # Find all text nodes that aren't inside links, headings, or script tags
-            for element in soup.find_all(string=True):
-                if links_inserted >= max_links:
-                    break
-                    
-                # Skip if parent is a link, heading, script, or style tag
-                if element.parent.name in ['a', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'script', 'style']:
-                    continue
-                
-                # Check if phrase exists in this text node (case-insensitive)
-                text = str(element)
-                pattern = r'\b' + re.escape(phrase) + r'\b'
-                match = re.search(pattern, text, re.IGNORECASE)
-                
-                if match:
-                    # Replace the text with linked version
-                    matched_text = match.group()
-                    # Add rel="nofollow" for promotional links
-                    rel_attr = ' rel="nofollow"' if 'thebettinginsider.com' in url else ''
-                    new_text = re.sub(
-                        pattern, 
-                        f'<a href="{url}"{rel_attr}>{matched_text}</a>', 
-                        text, 
-                        count=1, 
-                        flags=re.IGNORECASE
-                    )
-                    
-                    # Replace the text node with new HTML
-                    new_soup = BeautifulSoup(new_text, 'html.parser')
-                    element.replace_with(new_soup)
-                    links_inserted += 1
-                    logger.info(f"Added internal link: '{matched_text}' -> {url}")
-                    break  # Move to next phrase
-        
-        if links_inserted > 0:
-            logger.info(f"Total internal links added: {links_inserted}")
-        
-        return str(soup)
-        
+        return link_engine.insert_links(html_content, max_links, document)
     except Exception as e:
         logger.error(f"Error in auto_link_blog_content_safe: {e}")
         return html_content
 
+def citation_link(citation) -> Tuple[str, str]:
+    """(url, label) for a citation: a {"source", "url"} object, or a bare URL string from older posts"""
+    if isinstance(citation, dict):
+        return citation.get('url', '#'), citation.get('source', 'Source')
+    url = str(citation)
+    return url, urlparse(url).netloc or url
+
 def save_to_file(directory: str, filename: str, content: str):
     """Save content to file with error handling"""
     try:
@@ -153,16 +108,14 @@ def save_to_file(directory: str, filename: str, content: str):
     except Exception as e:
         logger.error(f"Failed to save {filename}: {e}")
 
-def create_slug(matchup: str, game_time: str, game_id: str = None) -> str:
+def create_slug(matchup: str, start_time: Optional[datetime], game_id: str = None) -> str:
     """Create SEO-friendly slug with game_id fallback to avoid collisions"""
     # Clean the matchup: "Yankees @ Red Sox" -> "yankees-vs-red-sox"
     slug = matchup.lower().replace(' @ ', '-vs-').replace(' ', '-')
     
-    # Normalize time using proper parsing
-    if game_time and game_time != 'TBD':
-        normalized_time = parse_and_normalize_time(game_time)
-        if normalized_time:
-            slug += f"-{normalized_time}"
+    # Append the pre-parsed start time as 24-hour HHMM
+    if start_time:
+        slug += f"-{start_time.strftime('%H%M')}"
     
     # Add game_id fallback to prevent collisions
     if game_id:
@@ -173,43 +126,8 @@ def create_slug(matchup: str, game_time: str, game_id: str = None) -> str:
     slug = re.sub(r'-+', '-', slug)  # Multiple dashes -> single dash
     return slug.strip('-')
 
-def parse_and_normalize_time(time_str: str) -> Optional[str]:
-    """Parse game time string and normalize to HHMM format"""
-    if not time_str or time_str == 'TBD':
-        return None
-    
-    try:
-        # Remove emojis and extra whitespace
-        clean_time = re.sub(r'[🕐⏰]', '', time_str).strip()
-        
-        # Handle format like "7/8, 06:40PM" or just "06:40PM"
-        if ',' in clean_time:
-            time_part = clean_time.split(',')[1].strip()
-        else:
-            time_part = clean_time.strip()
-        
-        # Parse using datetime for robust handling
-        for fmt in ['%I:%M%p', '%I:%M %p', '%H:%M']:
-            try:
-                dt = datetime.strptime(time_part.upper().replace(' ', ''), fmt)
-                # Convert to 24-hour format HHMM
-                return dt.strftime('%H%M')
-            except ValueError:
-                continue
-                
-        logger.warning(f"Could not parse time: '{time_str}'")
-        return None
-        
-    except Exception as e:
-        logger.error(f"Error parsing time '{time_str}': {e}")
-        return None
-
-def parse_game_time_for_sorting(time_str: str) -> int:
-    """Parse game time for proper chronological sorting"""
-    normalized = parse_and_normalize_time(time_str)
-    return int(normalized) if normalized else 9999
-
-def generate_enhanced_schema(game_data: dict, blog_result: dict, slug: str, date_str: str, absolute_url: str) -> List[dict]:
+def generate_enhanced_schema(game_data: GameRecord, blog_result: dict, slug: str, date_str: str, absolute_url: str,
+                             document: Optional[PostDocument] = None) -> List[dict]:
     """Generate comprehensive JSON-LD schema with multiple entities"""
     
     schemas = []
@@ -218,7 +136,7 @@ def generate_enhanced_schema(game_data: dict, blog_result: dict, slug: str, date
     article_schema = {
         "@context": "https://schema.org",
         "@type": "NewsArticle",
-        "headline": blog_result.get('meta_title', f"{game_data['matchup']} Preview"),
+        "headline": blog_result.get('meta_title', f"{game_data.matchup} Preview"),
         "description": blog_result.get('meta_desc', ''),
         "datePublished": f"{date_str}T00:00:00-04:00",  # EDT timezone
         "dateModified": f"{date_str}T00:00:00-04:00",
@@ -242,26 +160,30 @@ def generate_enhanced_schema(game_data: dict, blog_result: dict, slug: str, date
         },
         "url": absolute_url,
         "articleSection": "Sports",
-        "keywords": f"MLB, {game_data.get('away_team', '')}, {game_data.get('home_team', '')}, baseball, preview, betting",
+        "keywords": f"MLB, {game_data.away_team}, {game_data.home_team}, baseball, preview, betting",
         "about": [
             {
                 "@type": "SportsTeam",
-                "name": game_data.get('away_team', ''),
+                "name": game_data.away_team,
                 "sport": "Baseball"
             },
             {
                 "@type": "SportsTeam", 
-                "name": game_data.get('home_team', ''),
+                "name": game_data.home_team,
                 "sport": "Baseball"
             }
         ]
     }
     
+    # Word count from the already-parsed post
+    if document is not None:
+        article_schema["wordCount"] = document.word_count
+    
     # Add image if available
-    if game_data.get('away_logo') or game_data.get('home_logo'):
+    if game_data.away_logo or game_data.home_logo:
         article_schema["image"] = {
             "@type": "ImageObject",
-            "url": game_data.get('away_logo', game_data.get('home_logo', '')),
+            "url": game_data.away_logo or game_data.home_logo,
             "width": 400,
             "height": 300
         }
@@ -269,33 +191,29 @@ def generate_enhanced_schema(game_data: dict, blog_result: dict, slug: str, date
     schemas.append(article_schema)
     
     # 2. SportsEvent Schema
-    if game_data.get('game_time') and game_data['game_time'] != 'TBD':
+    if game_data.start_time:
         try:
-            # Parse game time to create proper startDate
-            game_datetime = datetime.strptime(f"{date_str} {game_data['game_time']}", "%Y-%m-%d %I:%M%p")
-            game_datetime = TIMEZONE.localize(game_datetime)
-            
             sports_event_schema = {
                 "@context": "https://schema.org",
                 "@type": "SportsEvent",
-                "name": game_data['matchup'],
-                "startDate": game_datetime.isoformat(),
+                "name": game_data.matchup,
+                "startDate": game_data.start_time.isoformat(),
                 "sport": "Baseball",
                 "competitor": [
                     {
                         "@type": "SportsTeam",
-                        "name": game_data.get('away_team', ''),
+                        "name": game_data.away_team,
                         "sport": "Baseball"
                     },
                     {
                         "@type": "SportsTeam",
-                        "name": game_data.get('home_team', ''),
+                        "name": game_data.home_team,
                         "sport": "Baseball"
                     }
                 ],
                 "location": {
                     "@type": "Place",
-                    "name": f"{game_data.get('home_team', '')} Stadium"
+                    "name": f"{game_data.home_team} Stadium"
                 }
             }
             schemas.append(sports_event_schema)
@@ -325,131 +243,298 @@ def generate_enhanced_schema(game_data: dict, blog_result: dict, slug: str, date
     
     return schemas
 
-def generate_daily_blogs():
-    """Generate all blogs for today with enhanced SEO and error handling"""
+def generate_daily_blogs(force_full: bool = False, line_moves: Optional[Set[str]] = None, use_batch: bool = False,
+                         game_ids: Optional[Set[str]] = None):
+    """Generate all blogs for today with enhanced SEO and error handling
+    
+    Games whose inputs match the fingerprint stored by an earlier run today keep
+    their existing post; pass force_full=True to regenerate the whole slate.
+    line_moves (line tracker keys) limits regeneration to games whose line moved.
+    use_batch sends the completions as one Batch API job (games it misses fall
+    back to interactive completions). game_ids (generation keys) limits the run
+    to those games, e.g. the ones due in a trigger window; games that have
+    already started are never regenerated.
+    """
+    with generation_lock:
+        _generate_daily_blogs(force_full, line_moves, use_batch, game_ids)
+
+def _generation_key(game_data: GameRecord) -> str:
+    return game_data.game_id or game_data.matchup
+
+@dataclass
+class DailyRun:
+    """Settings for one generation run, and the slate its fetch stage found"""
+    date_str: str
+    daily_directory: str
+    force_full: bool = False
+    line_moves: Optional[Set[str]] = None
+    use_batch: bool = False
+    game_ids: Optional[Set[str]] = None
+    blog_topics: List[dict] = field(default_factory=list)
+    reused: Dict[str, dict] = field(default_factory=dict)  # game_id -> stored meta
+
+@dataclass
+class PostJob:
+    """One game moving through the run's pipeline"""
+    key: str
+    blog_topic: dict
+    draft: Optional[PostDraft] = None
+    game_directory: Optional[str] = None
+    files: Dict[str, str] = field(default_factory=dict)  # filename -> content, written by the persist stage
+    meta: Optional[dict] = None
+    game_json: Optional[str] = None
+
+def _fetch_slate(run: DailyRun) -> Iterator[PostJob]:
+    """Fetch stage: load the slate and yield the games to generate, earliest first pitch first"""
+    # Initialize MLB data fetcher and get today's games as blog topics
+    blog_topics = MLBDataFetcher(slate_date=run.date_str).get_blog_topics_from_games()
+    if not blog_topics:
+        logger.warning("No games available for blog generation")
+        return
+    run.blog_topics = blog_topics
+    
+    # Diff against the posts already generated today so only changed games hit the LLM
+    previous_posts = {} if run.force_full else load_previous_posts(run.daily_directory)
+    regenerate_only = None
+    if run.line_moves is not None:
+        regenerate_only = {
+            topic['game_data'].game_id for topic in blog_topics
+            if line_key(topic['game_data'].away_team, topic['game_data'].home_team) in run.line_moves
+        }
+    slate_diff = diff_slate(blog_topics, previous_posts, regenerate_only)
+    current_posts = {blog_topic['game_data'].game_id: prior for blog_topic, prior in slate_diff.unchanged}
+    for prior in slate_diff.removed:
+        logger.info(f"Game {prior.slug} is no longer on the slate")
+    
+    # Games not due in this run, or already under way, keep whatever post they have
+    pending = []
+    stored_posts = previous_posts if not run.force_full else load_previous_posts(run.daily_directory)
+    for blog_topic in slate_diff.changed:
+        game_data = blog_topic['game_data']
+        if run.game_ids is not None and _generation_key(game_data) not in run.game_ids:
+            reason = "not due in this run"
+        elif has_started(game_data.start_time):
+            reason = "already started"
+        else:
+            pending.append(blog_topic)
+            continue
+        logger.info(f"Not generating {game_data.matchup}: {reason}")
+        if game_data.game_id in stored_posts:
+            current_posts[game_data.game_id] = stored_posts[game_data.game_id]
+    
+    # Reuse stored posts; one whose meta.json can't be read is regenerated if it is due and not yet under way
+    for blog_topic in blog_topics:
+        game_data = blog_topic['game_data']
+        prior = current_posts.get(game_data.game_id)
+        if not prior:
+            continue
+        try:
+            with open(os.path.join(prior.directory, "meta.json"), 'r', encoding='utf-8') as f:
+                run.reused[game_data.game_id] = json.load(f)
+        except (OSError, ValueError) as e:
+            if run.game_ids is not None and _generation_key(game_data) not in run.game_ids:
+                logger.warning(f"Could not reuse stored post for {game_data.matchup} (not due in this run): {e}")
+            elif has_started(game_data.start_time):
+                logger.warning(f"Could not reuse stored post for {game_data.matchup} (already started): {e}")
+            else:
+                logger.warning(f"Could not reuse stored post for {game_data.matchup}, regenerating: {e}")
+                pending.append(blog_topic)
+    
+    logger.info(f"Generating {len(pending)} of {len(blog_topics)} MLB blog posts for {run.date_str} "
+                f"({len(run.reused)} reused from earlier runs)")
+    
+    # Earliest first pitch first: every later stage is FIFO, so a slow or failing game
+    # can't hold up the ones that start before it
+    pending_by_key = {_generation_key(blog_topic['game_data']): blog_topic for blog_topic in pending}
+    jobs = [PostJob(job.key, pending_by_key[job.key]) for job in DeadlineScheduler().plan(
+        DeadlineJob(key, blog_topic['game_data'].start_time) for key, blog_topic in pending_by_key.items())]
+    
+    if run.use_batch and jobs:
+        # A batch needs every request up front; its drafts still go through the validate (repair) stage,
+        # and games it misses go through every interactive stage
+        drafts = BatchGenerator().generate_all([
+            (job.key, job.blog_topic['topic'], job.blog_topic['keywords'], job.blog_topic['game_data']) for job in jobs
+        ])
+        for job in jobs:
+            job.draft = drafts.get(job.key)
+    yield from jobs
+
+def _prompt_stage(job: PostJob) -> PostJob:
+    if job.draft is None:
+        job.draft = start_post(job.blog_topic['topic'], job.blog_topic['keywords'], job.blog_topic['game_data'])
+    return job
+
+def _generate_stage(job: PostJob) -> PostJob:
+    draft_post(job.draft)
+    return job
+
+def _validate_stage(job: PostJob) -> PostJob:
+    review_post(job.draft)
+    return job
+
+def _enrich_post(job: PostJob, run: DailyRun) -> Optional[PostJob]:
+    """Enrich stage: HTML clean-up, internal links, logos, schema and meta for one post, ready to write"""
+    blog_topic, blog_result = job.blog_topic, job.draft.result
+    topic = blog_topic['topic']
+    game_data = blog_topic['game_data']
+    game_id = game_data.game_id or str(uuid.uuid4())[:8]
+    date_str = run.date_str
+    
+    logger.info(f"Publishing {game_data.matchup}")
+    input_fingerprint = fingerprint_game(game_data)
+    
+    # Create SEO-friendly slug with game_id fallback
+    slug = create_slug(game_data.matchup, game_data.start_time, game_id)
+    job.game_directory = os.path.join(run.daily_directory, slug)
+    absolute_url = urljoin(BASE_URL, f"/mlb-blogs/{date_str}/{slug}")
+    
+    if not isinstance(blog_result, dict):
+        logger.error(f"Blog generation returned invalid format for {topic}")
+        return None
+    
+    # Save original structured result
+    job.files["blog_result.json"] = json.dumps(blog_result, indent=2)
+    
+    # Get HTML content for processing
+    html_content = blog_result.get('html', '')
+    if not html_content:
+        logger.error(f"No HTML content generated for {topic}")
+        return None
+    
+    # Convert to proper HTML using markdown parser
+    if html_content.startswith('#') or '\n#' in html_content:
+        # Looks like markdown, convert it
+        html_content = markdown(html_content)
+    
+    # Skip audit step - use content directly
+    logger.info("Processing content...")
+    optimized_post = html_content
+    
+    # Parse once; the link inserter and the schema both work from this
+    document = parse_post(optimized_post)
+    
+    # Add internal links safely
+    logger.info("Adding internal links...")
+    optimized_post = auto_link_blog_content_safe(optimized_post, document=document)
+    
+    job.files["optimized_post.html"] = optimized_post
+    
+    # Generate team logos
+    logger.info("Getting team logos...")
+    away_team = game_data.away_team
+    home_team = game_data.home_team
+    team_logos = generate_team_logos_for_matchup(away_team, home_team)
+    
+    # Update game record with logo info
+    game_data.away_logo = team_logos['away_logo']
+    game_data.home_logo = team_logos['home_logo']
+    
+    job.files["team_logos.json"] = json.dumps(team_logos, indent=2)
+    
+    # Generate comprehensive schema
+    logger.info("Generating comprehensive SEO schema...")
+    schemas = generate_enhanced_schema(game_data, blog_result, slug, date_str, absolute_url, document)
+    job.files["schemas.json"] = json.dumps(schemas, indent=2)
+    
+    # Create metadata for this blog (generated_at and the first-pitch lead are stamped when it is written)
+    job.meta = {
+        "slug": slug,
+        "title": blog_result.get('meta_title', f"{game_data.matchup} Preview"),
+        "description": blog_result.get('meta_desc', ''),
+        "matchup": game_data.matchup,
+        "game_time": game_data.display_time,
+        "away_team": away_team,
+        "home_team": home_team,
+        "away_logo": team_logos['away_logo'],
+        "home_logo": team_logos['home_logo'],
+        "url": f"/mlb-blogs/{date_str}/{slug}",
+        "absolute_url": absolute_url,
+        "generated_at": None,
+        "first_pitch_lead_minutes": None,
+        "faq_count": len(blog_result.get('faq', [])),
+        "citations_count": len(blog_result.get('citations', []))
+    }
+    
+    # Enhanced game data; written last, since its fingerprint marks the post as done for later runs.
+    # The error placeholder or a post that still fails validation gets none, so the next run regenerates it
+    stored_game_data = game_data.to_dict()
+    validation = job.draft.trace.validation
+    if validation in (FAILED, INVALID):
+        logger.warning(f"Post for {game_data.matchup} is {validation}; it will be regenerated on the next run")
+    else:
+        stored_game_data['input_fingerprint'] = input_fingerprint
+    job.game_json = json.dumps(stored_game_data, indent=2)
+    return job
+
+def _persist_post(job: PostJob) -> PostJob:
+    """Persist stage: write one enriched post to its game folder"""
+    game_data = job.blog_topic['game_data']
+    for filename, content in job.files.items():
+        save_to_file(job.game_directory, filename, content)
+    
+    job.meta["generated_at"] = datetime.now().isoformat()
+    job.meta["first_pitch_lead_minutes"] = deadline_stats.record(job.key, game_data.start_time)
+    save_to_file(job.game_directory, "meta.json", json.dumps(job.meta, indent=2))
+    save_to_file(job.game_directory, "game_data.json", job.game_json)
+    
+    # Movement for this game is now measured from the line the post was written against
+    line_tracker.mark_published([line_key(game_data.away_team, game_data.home_team)])
+    
+    logger.info(f"✅ Successfully processed {job.blog_topic['topic']}")
+    return job
+
+def build_daily_pipeline(run: DailyRun) -> StagePipeline:
+    """fetch -> prompt -> generate -> validate/repair -> enrich -> persist; a post is written as soon as it clears validation"""
+    return StagePipeline([
+        Stage('fetch', _fetch_slate, fan_out=True),
+        Stage('prompt', _prompt_stage),
+        Stage('generate', _generate_stage, workers=LLM_MAX_CONCURRENCY),
+        Stage('validate', _validate_stage, workers=PIPELINE_VALIDATE_WORKERS),
+        Stage('enrich', lambda job: _enrich_post(job, run), workers=PIPELINE_ENRICH_WORKERS),
+        Stage('persist', _persist_post, workers=PIPELINE_PERSIST_WORKERS),
+    ], label=lambda item: getattr(item, 'key', 'slate'))
+
+# The current (or last) run's pipeline, for /health
+current_pipeline: Optional[StagePipeline] = None
+
+def _generate_daily_blogs(force_full: bool, line_moves: Optional[Set[str]], use_batch: bool,
+                          game_ids: Optional[Set[str]]):
+    global current_pipeline
     request_id = str(uuid.uuid4())[:8]
     logger.info(f"Starting daily blog generation - Request ID: {request_id}")
+    llm_cache.reset_stats()
+    generation_stats.reset()
+    prompt_token_stats.reset()
+    retry_policy.run_budget.reset()
+    llm_telemetry.reset()
+    deadline_stats.reset()
     
     try:
-        # Initialize MLB data fetcher
-        mlb_fetcher = MLBDataFetcher()
-        
-        # Get today's games as blog topics
-        blog_topics = mlb_fetcher.get_blog_topics_from_games()
-        
-        if not blog_topics:
-            logger.warning("No games available for blog generation")
-            return
-        
-        # Sort by game time
-        logger.info(f"Sorting {len(blog_topics)} games by time...")
-        blog_topics.sort(key=lambda x: parse_game_time_for_sorting(x['game_data'].get('game_time', 'TBD')))
-        
         base_directory = "mlb_blog_posts"
-        date_str = datetime.now().strftime("%Y-%m-%d")
+        date_str = current_slate_date()
         daily_directory = os.path.join(base_directory, date_str)
         
         if not os.path.exists(daily_directory):
             os.makedirs(daily_directory)
         
-        logger.info(f"Generating {len(blog_topics)} MLB blog posts for {date_str}")
-        
-        blog_index = []  # Store metadata for index page
+        run = DailyRun(date_str, daily_directory, force_full, line_moves, use_batch, game_ids)
+        current_pipeline = build_daily_pipeline(run)
+        published = {job.key: job.meta for job in current_pipeline.run([run])}
+        if not run.blog_topics:
+            return
+        pipeline_stats = current_pipeline.stats()
         
-        for i, blog_topic in enumerate(blog_topics, 1):
-            topic = blog_topic['topic']
-            keywords = blog_topic['keywords']
+        # Index in slate order
+        blog_index = []
+        for blog_topic in run.blog_topics:
             game_data = blog_topic['game_data']
-            game_id = game_data.get('game_id', str(uuid.uuid4())[:8])
-            
-            logger.info(f"Processing game {i}/{len(blog_topics)}: {game_data['matchup']}")
-            
-            # Create SEO-friendly slug with game_id fallback
-            slug = create_slug(game_data['matchup'], game_data.get('game_time'), game_id)
-            game_directory = os.path.join(daily_directory, slug)
-            absolute_url = urljoin(BASE_URL, f"/mlb-blogs/{date_str}/{slug}")
-            
-            try:
-                # Generate MLB-specific blog post (now returns structured data)
-                logger.info("Generating blog post with enhanced structure...")
-                blog_result = generate_mlb_blog_post(topic, keywords, game_data)
-                
-                if not isinstance(blog_result, dict):
-                    logger.error(f"Blog generation returned invalid format for {topic}")
-                    continue
-                
-                # Save original structured result
-                save_to_file(game_directory, "blog_result.json", json.dumps(blog_result, indent=2))
-                
-                # Get HTML content for processing
-                html_content = blog_result.get('html', '')
-                if not html_content:
-                    logger.error(f"No HTML content generated for {topic}")
-                    continue
-                
-                # Convert to proper HTML using markdown parser
-                if html_content.startswith('#') or '\n#' in html_content:
-                    # Looks like markdown, convert it
-                    html_content = markdown(html_content)
-                
-                # Skip audit step - use content directly
-                logger.info("Processing content...")
-                optimized_post = html_content
-                
-                # Add internal links safely
-                logger.info("Adding internal links...")
-                optimized_post = auto_link_blog_content_safe(optimized_post)
-                
-                save_to_file(game_directory, "optimized_post.html", optimized_post)
-                
-                # Generate team logos
-                logger.info("Getting team logos...")
-                away_team = game_data.get('away_team', '')
-                home_team = game_data.get('home_team', '')
-                team_logos = generate_team_logos_for_matchup(away_team, home_team)
-                
-                # Update game_data with logo info
-                game_data.update({
-                    'away_logo': team_logos['away_logo'],
-                    'home_logo': team_logos['home_logo']
-                })
-                
-                save_to_file(game_directory, "team_logos.json", json.dumps(team_logos, indent=2))
-                
-                # Generate comprehensive schema
-                logger.info("Generating comprehensive SEO schema...")
-                schemas = generate_enhanced_schema(game_data, blog_result, slug, date_str, absolute_url)
-                save_to_file(game_directory, "schemas.json", json.dumps(schemas, indent=2))
-                
-                # Create metadata for this blog
-                meta = {
-                    "slug": slug,
-                    "title": blog_result.get('meta_title', f"{game_data['matchup']} Preview"),
-                    "description": blog_result.get('meta_desc', ''),
-                    "matchup": game_data['matchup'],
-                    "game_time": game_data.get('game_time', 'TBD'),
-                    "away_team": away_team,
-                    "home_team": home_team,
-                    "away_logo": team_logos['away_logo'],
-                    "home_logo": team_logos['home_logo'],
-                    "url": f"/mlb-blogs/{date_str}/{slug}",
-                    "absolute_url": absolute_url,
-                    "generated_at": datetime.now().isoformat(),
-                    "faq_count": len(blog_result.get('faq', [])),
-                    "citations_count": len(blog_result.get('citations', []))
-                }
-                
-                save_to_file(game_directory, "meta.json", json.dumps(meta, indent=2))
+            meta = published.get(_generation_key(game_data)) or run.reused.get(game_data.game_id)
+            if meta:
                 blog_index.append(meta)
-                
-                # Save enhanced game data
-                save_to_file(game_directory, "game_data.json", json.dumps(game_data, indent=2))
-                
-                logger.info(f"✅ Successfully processed {topic}")
-                
-            except Exception as e:
-                logger.error(f"Error processing {topic}: {e}", exc_info=True)
-                continue
+        
+        # Every LLM call of this run, kept per run so cost and latency can be compared across prompt/model changes
+        telemetry_file = f"{datetime.now().strftime('%H%M%S')}_{request_id}.json"
+        save_to_file(os.path.join(daily_directory, "telemetry"), telemetry_file, json.dumps(llm_telemetry.export(), indent=2))
         
         # Save daily index with enhanced metadata
         daily_meta = {
@@ -457,6 +542,14 @@ def generate_daily_blogs():
             "generated_at": datetime.now().isoformat(),
             "total_blogs": len(blog_index),
             "successful_blogs": len([b for b in blog_index if b]),
+            "reused_blogs": len(run.reused),
+            "llm_cache": llm_cache.stats(),
+            "generation": generation_stats.stats(),
+            "prompt_tokens": prompt_token_stats.stats(),
+            "retries": {"used": retry_policy.run_budget.used, "budget": retry_policy.run_budget.limit},
+            "telemetry": {**llm_telemetry.stats(), "file": f"telemetry/{telemetry_file}"},
+            "deadlines": deadline_stats.stats(),
+            "pipeline": pipeline_stats,
             "blogs": blog_index,
             "archive_url": f"/mlb-blogs/{date_str}",
             "sitemap_urls": [b["absolute_url"] for b in blog_index]
@@ -465,6 +558,21 @@ def generate_daily_blogs():
         save_to_file(daily_directory, "index.json", json.dumps(daily_meta, indent=2))
         
         logger.info(f"✅ Completed! Generated {len(blog_index)} blog posts in {daily_directory}")
+        logger.info(f"LLM cache: {daily_meta['llm_cache']['hits']} hits, {daily_meta['llm_cache']['misses']} misses")
+        logger.info(f"Validation retries: {daily_meta['generation']['validation_retries']}/{daily_meta['generation']['posts']} "
+                    f"posts (structured output {'on' if daily_meta['generation']['structured_output'] else 'off'})")
+        logger.info(f"Prompt input tokens by section: {daily_meta['prompt_tokens']['sections']}")
+        logger.info(f"Pipeline ({pipeline_stats['elapsed_seconds']}s): " + ", ".join(
+            f"{name} {stage['processed']} in {stage['busy_seconds']}s (max queue {stage['max_queue_depth']})"
+            for name, stage in pipeline_stats['stages'].items()))
+        deadlines = daily_meta['deadlines']
+        if deadlines['published']:
+            logger.info(f"Published {deadlines['before_first_pitch']}/{deadlines['published']} posts before first pitch "
+                        f"(min lead {deadlines['lead_minutes_min']} min, missed: {deadlines['missed'] or 'none'})")
+        telemetry = daily_meta['telemetry']
+        if telemetry['calls']:
+            logger.info(f"LLM calls: {telemetry['calls']} (p50 {telemetry['latency_p50_seconds']}s, p95 {telemetry['latency_p95_seconds']}s), "
+                        f"{telemetry['tokens_per_post']} tokens/post, ${telemetry['slate_cost_usd']} this run")
         
     except Exception as e:
         logger.error(f"Daily blog generation failed: {e}", exc_info=True)
@@ -472,7 +580,7 @@ def generate_daily_blogs():
 @app.route('/')
 def home():
     """Redirect to today's blog index"""
-    today = datetime.now().strftime("%Y-%m-%d")
+    today = current_slate_date()
     return redirect(url_for('blog_index', date=today))
 
 @app.route('/mlb-blogs/')
@@ -837,8 +945,9 @@ def show_blog(date, slug):
                 <ul>
         '''
         for citation in blog_result['citations']:
+            url, source = citation_link(citation)
             html += f'''
-                <li><a href="{citation.get('url', '#')}" target="_blank" rel="nofollow">{citation.get('source', 'Source')}</a></li>
+                <li><a href="{url}" target="_blank" rel="nofollow">{source}</a></li>
             '''
         html += '''
                 </ul>
@@ -926,9 +1035,14 @@ def manual_generate():
     """Manual trigger to generate blogs"""
     logger.info("Manual blog generation triggered")
     
+    # ?force=1 regenerates every game instead of only the ones whose inputs changed
+    force_full = request.args.get('force', '').lower() in ('1', 'true', 'yes')
+    # ?batch=1 submits the completions as one Batch API job
+    use_batch = request.args.get('batch', '').lower() in ('1', 'true', 'yes')
+    
     # Run in background thread to avoid timeout
     def background_generate():
-        generate_daily_blogs()
+        generate_daily_blogs(force_full=force_full, use_batch=use_batch)
     
     thread = threading.Thread(target=background_generate, daemon=True)
     thread.start()
@@ -942,40 +1056,43 @@ def health():
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
         'timezone': str(TIMEZONE),
-        'base_url': BASE_URL
+        'base_url': BASE_URL,
+        'upstream': upstream_client.status(),
+        'tracked_lines': len(line_tracker.series),
+        'interlinks': link_engine.status(),
+        'pipeline': current_pipeline.stats() if current_pipeline else None
     }
 
-def run_scheduler():
-    """Run daily blog generation at 7 AM EDT"""
-    schedule.every().day.at("11:00").do(generate_daily_blogs)  # 11:00 UTC = 7:00 AM EDT
-    
-    logger.info("Scheduler started - will generate daily at 7 AM EDT")
-    
-    while True:
-        schedule.run_pending()
-        time.sleep(60)
+def prewarm_upstream_services():
+    """Wake the onrender data services so the scheduled run doesn't pay for cold starts"""
+    logger.info("Pre-warming upstream data services")
+    MLBDataFetcher().prewarm()
+
+def run_scheduler() -> threading.Thread:
+    """Generate each game's post relative to its own first pitch: a draft, then a refresh once the umpire is in"""
+    scheduler = TriggerScheduler(
+        load_slate=lambda: MLBDataFetcher().get_blog_topics_from_games(),
+        run_games=lambda game_ids, label: generate_daily_blogs(game_ids=game_ids),
+        key=_generation_key,
+        # Ping the free-tier upstream hosts ahead of each trigger so they're awake when it fires
+        prewarm=prewarm_upstream_services
+    )
+    logger.info(f"Scheduler started - drafting posts {DRAFT_LEAD_MINUTES} min before first pitch and refreshing "
+                f"them {REFRESH_LEAD_MINUTES} min before once the umpire is confirmed")
+    return scheduler.start()
 
 def initialize_app():
     """Initialize with enhanced error handling and background processes"""
     logger.info("Initializing Enhanced MLB Blog Service")
     
     try:
-        # Start background scheduler
-        scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
-        scheduler_thread.start()
+        # Start background scheduler; its first pass drafts any game whose draft time has already passed
+        run_scheduler()
         logger.info("✅ Background scheduler started")
         
-        # Generate blogs in background after Flask starts
-        def delayed_blog_generation():
-            time.sleep(10)  # Wait for Flask to fully start
-            try:
-                generate_daily_blogs()
-            except Exception as e:
-                logger.error(f"Initial blog generation failed: {e}")
-        
-        blog_thread = threading.Thread(target=delayed_blog_generation, daemon=True)
-        blog_thread.start()
-        logger.info("✅ Initial blog generation started in background")
+        # Poll DraftKings intraday; only games whose line moves past the threshold get regenerated
+        if line_tracker.start_poller(MLBDataFetcher, lambda moved: generate_daily_blogs(line_moves=moved)):
+            logger.info(f"✅ Line movement poller started (every {LINE_POLL_INTERVAL_SECONDS}s)")
         
     except Exception as e:
         logger.error(f"Initialization error: {e}")
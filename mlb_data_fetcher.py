@@ -1,23 +1,108 @@
 # mlb_data_fetcher.py
-import requests
+import hashlib
 import json
-from datetime import datetime
+import logging
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from config import REPLAY_DATE
+from game_time import current_slate_date, game_time_sort_key, parse_game_time
+from snapshot_store import SnapshotStore
+from mlb_models import GameRecord, LineupSplit, PitcherProfile, UmpireInfo
+from team_registry import team_registry
+from upstream_client import upstream_client as shared_upstream_client
+
+logger = logging.getLogger(__name__)
+
+class SourceUnavailableError(RuntimeError):
+    """An upstream source failed and there is no snapshot for today to fall back on"""
 
 class MLBDataFetcher:
-    def __init__(self):
+    def __init__(self, replay_date=REPLAY_DATE, snapshot_store=None, upstream=None, slate_date=None):
         self.mlb_api_url = "https://mlb-matchup-api-savant.onrender.com/latest"
         self.umpire_api_url = "https://umpire-json-api.onrender.com"
         self.betting_api_url = "https://draftkings-splits-scraper-webservice.onrender.com/mlb"
+        
+        # Hedging / circuit-breaking client shared across runs; its keep-alive session
+        # lets the three onrender hosts reuse pooled connections instead of a fresh TLS handshake each
+        self.upstream = upstream or shared_upstream_client
+        self.session = self.upstream.session
+        
+        # Per-source wall-clock seconds from the most recent fetch stage
+        self.last_fetch_timings = {}
+        
+        # Raw responses are snapshotted per source/date; replay_date reads
+        # exclusively from the store and never touches the network
+        self.snapshot_store = snapshot_store or SnapshotStore()
+        self.replay_date = replay_date
+        # The run's slate date (US Eastern), so snapshots, game ids and the output folder agree
+        self.slate_date = slate_date
+    
+    def _slate_date(self):
+        return self.replay_date or self.slate_date or current_slate_date()
+    
+    def _get_source_payload(self, source, url, allow_cached=True):
+        """Return parsed JSON for a source, serving from the snapshot store when possible
+        
+        allow_cached=False skips the TTL shortcut and always revalidates upstream
+        (still cheap when the source honours ETag / Last-Modified).
+        """
+        if self.replay_date:
+            payload = self.snapshot_store.load(source, self.replay_date)
+            if payload is None:
+                raise FileNotFoundError(f"No {source} snapshot stored for {self.replay_date}")
+            print(f"📼 Replaying {source} snapshot from {self.replay_date}")
+            return payload
+        
+        date_str = self._slate_date()
+        ref = self.snapshot_store.get_ref(source, date_str)
+        if allow_cached and self.snapshot_store.is_fresh(ref):
+            payload = self.snapshot_store.load(source, date_str)
+            if payload is not None:
+                print(f"💾 Using cached {source} snapshot ({ref['sha256'][:8]})")
+                return payload
+        
+        try:
+            # Stale or missing: revalidate with ETag / Last-Modified when we have them
+            headers = self.snapshot_store.conditional_headers(ref)
+            response = self.upstream.get(source, url, headers=headers, timeout=30)
+            if response.status_code == 304:
+                payload = self.snapshot_store.load(source, date_str)
+                if payload is not None:
+                    self.snapshot_store.touch(source, date_str)
+                    print(f"💾 {source} snapshot not modified upstream ({ref['sha256'][:8]})")
+                    return payload
+                # Validators matched but the stored body is gone, fetch it in full
+                response = self.upstream.get(source, url, timeout=30)
+            
+            response.raise_for_status()
+        except Exception as e:
+            # Circuit open or every attempt failed: today's last good snapshot is still today's slate,
+            # but an older day's would publish stale matchups and odds, so give up instead
+            payload = self.snapshot_store.load(source, date_str)
+            if payload is None:
+                raise SourceUnavailableError(f"{source} unavailable and no snapshot stored for {date_str}: {e}") from e
+            logger.warning(f"{source} unavailable ({e}); falling back to the last good snapshot from {date_str}")
+            return payload
+        
+        self.snapshot_store.save(
+            source, date_str, response.content, url=url,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified')
+        )
+        return response.json()
     
     def get_mlb_data(self):
         """Fetch MLB matchup data"""
         try:
             print("🌐 Fetching MLB data...")
-            response = requests.get(self.mlb_api_url, timeout=30)
-            response.raise_for_status()
-            data = response.json()
+            data = self._get_source_payload('mlb', self.mlb_api_url)
             print(f"✅ Got {len(data.get('reports', []))} games")
             return data.get('reports', [])
+        except SourceUnavailableError:
+            # Skip the run rather than write posts from partial or stale data
+            raise
         except Exception as e:
             print(f"❌ Error fetching MLB data: {e}")
             return []
@@ -26,114 +111,92 @@ class MLBDataFetcher:
         """Fetch umpire data"""
         try:
             print("🌐 Fetching umpire data...")
-            response = requests.get(self.umpire_api_url, timeout=30)
-            response.raise_for_status()
-            data = response.json()
+            data = self._get_source_payload('umpires', self.umpire_api_url)
             print(f"✅ Got umpire data for {len(data)} umpires")
             return data
+        except SourceUnavailableError:
+            # Skip the run rather than write posts from partial or stale data
+            raise
         except Exception as e:
             print(f"❌ Error fetching umpire data: {e}")
             return []
 
-    def get_betting_data(self):
+    def get_betting_data(self, allow_cached=True):
         """Fetch betting odds and splits data"""
         try:
             print("🌐 Fetching betting data...")
-            response = requests.get(self.betting_api_url, timeout=30)
-            response.raise_for_status()
-            data = response.json()
+            data = self._get_source_payload('betting', self.betting_api_url, allow_cached=allow_cached)
             print(f"✅ Got betting data for {len(data.get('games', []))} games")
             return data.get('games', [])
+        except SourceUnavailableError:
+            # Skip the run rather than write posts from partial or stale data
+            raise
         except Exception as e:
             print(f"❌ Error fetching betting data: {e}")
             return []
 
-    def find_game_umpire(self, umpires, matchup):
-        """Find the umpire for a specific game matchup"""
-        for ump in umpires:
-            if ump.get('matchup', '-') == matchup:
-                return ump
-        
-        if ' @ ' in matchup:
-            away_team, home_team = matchup.split(' @ ')
-            for ump in umpires:
-                ump_matchup = ump.get('matchup', '-')
-                if away_team in ump_matchup and home_team in ump_matchup:
-                    return ump
-        
-        return None
+    def prewarm(self, block=False):
+        """Wake the upstream services ahead of a scheduled run"""
+        return self.upstream.prewarm({
+            'mlb': self.mlb_api_url,
+            'umpires': self.umpire_api_url,
+            'betting': self.betting_api_url,
+        }, block=block)
 
-    def find_game_betting_data(self, betting_games, matchup):
-        """Find betting data for a specific game matchup with better team matching"""
-        if ' @ ' not in matchup:
-            return None
-            
-        away_team, home_team = matchup.split(' @ ')
-        
-        print(f"🔍 Looking for betting data: {away_team} @ {home_team}")
-        
-        # Enhanced team mapping for better matching
-        team_mapping = {
-            # MLB API code -> DraftKings full name patterns
-            'LAA': ['LA Angels', 'LAA Angels', 'Angels'],
-            'LAD': ['LA Dodgers', 'LAD Dodgers', 'Dodgers'],
-            'NYM': ['NY Mets', 'NYM Mets', 'Mets'],
-            'NYY': ['NY Yankees', 'NYY Yankees', 'Yankees'],
-            'CWS': ['CHI White Sox', 'CWS White Sox', 'White Sox'],
-            'CHC': ['CHI Cubs', 'CHC Cubs', 'Cubs'],
-            'TB': ['TB Rays', 'Rays'],
-            'SF': ['SF Giants', 'Giants'],
-            'SD': ['SD Padres', 'Padres'],
-            'KC': ['KC Royals', 'Royals'],
-            'WSH': ['WAS Mystics', 'WSH Nationals', 'Nationals'],  # Handle both
-            'ARI': ['ARI Diamondbacks', 'AZ Diamondbacks', 'Diamondbacks'],
-            'AZ': ['ARI Diamondbacks', 'AZ Diamondbacks', 'Diamondbacks'],
-            'MIA': ['MIA Marlins', 'Marlins'],
-            'CIN': ['CIN Reds', 'Reds'],
-            'COL': ['COL Rockies', 'Rockies'],
-            'BOS': ['BOS Red Sox', 'Red Sox'],
-            'MIL': ['MIL Brewers', 'Brewers'],
-            'PIT': ['PIT Pirates', 'Pirates'],
-            'HOU': ['HOU Astros', 'Astros'],
-            'CLE': ['CLE Guardians', 'Guardians'],
-            'TEX': ['TEX Rangers', 'Rangers'],
-            'DET': ['DET Tigers', 'Tigers'],
-            'MIN': ['MIN Twins', 'Twins'],
-            'TOR': ['TOR Blue Jays', 'Blue Jays'],
-            'ATL': ['ATL Braves', 'Braves'],
-            'BAL': ['BAL Orioles', 'Orioles'],
-            'PHI': ['PHI Phillies', 'Phillies'],
-            'SEA': ['SEA Mariners', 'Mariners'],
-            'STL': ['STL Cardinals', 'Cardinals'],
-            'ATH': ['Athletics'],
+    def _timed_fetch(self, source, fetch_fn):
+        """Run a single source fetch and record how long it took"""
+        start = time.perf_counter()
+        try:
+            return fetch_fn()
+        finally:
+            self.last_fetch_timings[source] = time.perf_counter() - start
+
+    def fetch_all_sources(self):
+        """Fetch matchup, umpire and betting data concurrently over the shared session.
+        
+        Wall-clock for the data phase becomes the slowest source rather than the
+        sum of all three (which matters when the onrender services are cold).
+        """
+        sources = {
+            'mlb': self.get_mlb_data,
+            'umpires': self.get_umpire_data,
+            'betting': self.get_betting_data,
         }
+        self.last_fetch_timings = {}
         
-        def get_team_matches(team_code):
-            """Get all possible team name matches for a team code"""
-            if team_code in team_mapping:
-                return team_mapping[team_code]
-            return [team_code]  # Fallback to original code
+        stage_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+            futures = {
+                source: executor.submit(self._timed_fetch, source, fetch_fn)
+                for source, fetch_fn in sources.items()
+            }
+            results = {source: future.result() for source, future in futures.items()}
+        stage_elapsed = time.perf_counter() - stage_start
         
-        away_matches = get_team_matches(away_team)
-        home_matches = get_team_matches(home_team)
+        timing_summary = ", ".join(f"{source} {elapsed:.2f}s" for source, elapsed in self.last_fetch_timings.items())
+        print(f"⏱️ Fetch stage finished in {stage_elapsed:.2f}s ({timing_summary})")
         
-        # Find matching betting game
-        for game in betting_games:
-            betting_away = game.get('away_team', '')
-            betting_home = game.get('home_team', '')
-            
-            print(f"  🔍 Checking: {betting_away} @ {betting_home}")
-            
-            # Check if any of the away team matches work
-            away_match = any(match in betting_away for match in away_matches)
-            home_match = any(match in betting_home for match in home_matches)
-            
-            if away_match and home_match:
-                print(f"  ✅ Found match: {betting_away} @ {betting_home}")
-                return game
+        return results
+
+    def find_game_umpire(self, umpire_index, matchup):
+        """Find the umpire for a specific game matchup via the registry-keyed index"""
+        key = team_registry.parse_matchup(matchup)
+        if not key:
+            return None
+        return umpire_index.get(key)
+
+    def find_game_betting_data(self, betting_index, matchup):
+        """Find betting data for a specific game matchup via the registry-keyed index"""
+        key = team_registry.parse_matchup(matchup)
+        if not key:
+            return None
         
-        print(f"  ❌ No betting data found for {away_team} @ {home_team}")
-        return None
+        game = betting_index.get(key)
+        if game:
+            print(f"  ✅ Found betting data: {game.get('away_team', '')} @ {game.get('home_team', '')}")
+        else:
+            print(f"  ❌ No betting data found for {matchup}")
+        return game
 
     def format_pitcher_arsenal(self, pitcher_data):
         """Format pitcher arsenal for blog content"""
@@ -152,12 +215,53 @@ class MLBDataFetcher:
         
         return "; ".join(arsenal_text)
 
-    def calculate_lineup_advantage(self, key_matchups, pitcher_name):
-        """Calculate comprehensive lineup stats vs specific pitcher including K% data"""
-        pitcher_matchups = [m for m in key_matchups if m.get('vs_pitcher') == pitcher_name]
-        reliable_matchups = [m for m in pitcher_matchups if m.get('reliability', '').upper() in ['MEDIUM', 'HIGH']]
+    def build_pitcher_matchup_index(self, key_matchups):
+        """Partition a report's key_matchups once into per-pitcher columnar arrays.
+        
+        Only MEDIUM/HIGH reliability rows are kept. Each pitcher maps to NumPy
+        columns so lineup averages and deltas are computed vectorized instead of
+        re-filtering the whole matchup list for every pitcher.
+        """
+        grouped = {}
+        for matchup in key_matchups:
+            if (matchup.get('reliability') or '').upper() not in ('MEDIUM', 'HIGH'):
+                continue
+            grouped.setdefault(matchup.get('vs_pitcher'), []).append(matchup)
+        
+        index = {}
+        for pitcher_name, rows in grouped.items():
+            baselines = [row.get('baseline_stats') or {} for row in rows]
+            # One pass over the rows into a (n, 4) float matrix, then split into columns
+            stats = np.array([
+                (
+                    baseline.get('season_avg', 0.250) if baseline else 0.250,
+                    baseline.get('season_k_pct', 22.5) if baseline else 22.5,
+                    row.get('weighted_est_ba', 0.250),
+                    row.get('weighted_k_rate', 22.5)
+                )
+                for row, baseline in zip(rows, baselines)
+            ], dtype=float)
+            index[pitcher_name] = {
+                'batters': [row.get('batter', 'Unknown') for row in rows],
+                'has_baseline': np.array([bool(baseline) for baseline in baselines], dtype=bool),
+                'season_ba': stats[:, 0],
+                'season_k': stats[:, 1],
+                'arsenal_ba': stats[:, 2],
+                'arsenal_k': stats[:, 3],
+            }
+        return index
+
+    def calculate_lineup_advantage(self, key_matchups, pitcher_name, matchup_index=None):
+        """Calculate comprehensive lineup stats vs specific pitcher including K% data
+        
+        Pass a matchup_index from build_pitcher_matchup_index to reuse one
+        partition of key_matchups across both pitchers in a game.
+        """
+        if matchup_index is None:
+            matchup_index = self.build_pitcher_matchup_index(key_matchups)
+        columns = matchup_index.get(pitcher_name)
         
-        if not reliable_matchups:
+        if columns is None:
             return {
                 'ba_advantage': 0.0,
                 'k_advantage': 0.0,
@@ -168,66 +272,59 @@ class MLBDataFetcher:
                 'top_performers': []
             }
         
-        season_bas = []
-        season_k_pcts = []
-        arsenal_bas = []
-        arsenal_k_pcts = []
-        top_performers = []
+        has_baseline = columns['has_baseline']
+        season_ba = columns['season_ba']
+        season_k = columns['season_k']
+        arsenal_ba = columns['arsenal_ba']
+        arsenal_k = columns['arsenal_k']
         
-        for matchup in reliable_matchups:
-            baseline = matchup.get('baseline_stats', {})
-            if baseline:
-                season_ba = baseline.get('season_avg', 0.250)
-                season_k = baseline.get('season_k_pct', 22.5)
-                season_bas.append(season_ba)
-                season_k_pcts.append(season_k)
-            else:
-                season_ba = 0.250
-                season_k = 22.5
-            
-            arsenal_ba = matchup.get('weighted_est_ba', 0.250)
-            arsenal_k = matchup.get('weighted_k_rate', 22.5)
-            arsenal_bas.append(arsenal_ba)
-            arsenal_k_pcts.append(arsenal_k)
+        # Calculate advantages
+        ba_diff = arsenal_ba - season_ba
+        k_diff = arsenal_k - season_k  # Positive = more strikeouts (bad for batter)
+        
+        # Track significant performers (20+ point BA difference OR 3%+ K difference)
+        significant = (np.abs(ba_diff) > 0.020) | (np.abs(k_diff) > 3.0)
+        
+        # Only the significant rows leave NumPy, converted in bulk rather than per element
+        significant_rows = np.flatnonzero(significant)
+        batters = columns['batters']
+        top_performers = []
+        significant_stats = np.column_stack((season_ba, arsenal_ba, season_k, arsenal_k, ba_diff, k_diff))[significant_rows]
+        for i, (row_season_ba, row_arsenal_ba, row_season_k, row_arsenal_k, row_ba_diff, row_k_diff) in zip(
+            significant_rows.tolist(), significant_stats.tolist()
+        ):
+            batter = batters[i]
+            batter_name = batter.replace(', ', ' ').split()
+            batter_display = f"{batter_name[1]} {batter_name[0]}" if len(batter_name) >= 2 else batter
             
-            # Calculate advantages
-            ba_diff = arsenal_ba - season_ba
-            k_diff = arsenal_k - season_k  # Positive = more strikeouts (bad for batter)
+            # Determine advantage type
+            if row_ba_diff > 0.020:
+                advantage = 'strong_ba'  # Good batting average advantage
+            elif row_ba_diff < -0.020:
+                advantage = 'poor_ba'   # Poor batting average matchup
+            elif row_k_diff < -3.0:
+                advantage = 'low_k'     # Less likely to strike out
+            elif row_k_diff > 3.0:
+                advantage = 'high_k'    # More likely to strike out
+            else:
+                advantage = 'moderate'
             
-            # Track significant performers (20+ point BA difference OR 3%+ K difference)
-            if abs(ba_diff) > 0.020 or abs(k_diff) > 3.0:
-                batter = matchup.get('batter', 'Unknown')
-                batter_name = batter.replace(', ', ' ').split()
-                batter_display = f"{batter_name[1]} {batter_name[0]}" if len(batter_name) >= 2 else batter
-                
-                # Determine advantage type
-                if ba_diff > 0.020:
-                    advantage = 'strong_ba'  # Good batting average advantage
-                elif ba_diff < -0.020:
-                    advantage = 'poor_ba'   # Poor batting average matchup
-                elif k_diff < -3.0:
-                    advantage = 'low_k'     # Less likely to strike out
-                elif k_diff > 3.0:
-                    advantage = 'high_k'    # More likely to strike out
-                else:
-                    advantage = 'moderate'
-                
-                top_performers.append({
-                    'name': batter_display,
-                    'season_ba': season_ba,
-                    'arsenal_ba': arsenal_ba,
-                    'season_k': season_k,
-                    'arsenal_k': arsenal_k,
-                    'ba_diff': ba_diff,
-                    'k_diff': k_diff,
-                    'advantage': advantage
-                })
+            top_performers.append({
+                'name': batter_display,
+                'season_ba': row_season_ba,
+                'arsenal_ba': row_arsenal_ba,
+                'season_k': row_season_k,
+                'arsenal_k': row_arsenal_k,
+                'ba_diff': row_ba_diff,
+                'k_diff': row_k_diff,
+                'advantage': advantage
+            })
         
-        # Calculate team averages
-        avg_season_ba = sum(season_bas) / len(season_bas) if season_bas else 0.250
-        avg_season_k = sum(season_k_pcts) / len(season_k_pcts) if season_k_pcts else 22.5
-        avg_arsenal_ba = sum(arsenal_bas) / len(arsenal_bas)
-        avg_arsenal_k = sum(arsenal_k_pcts) / len(arsenal_k_pcts)
+        # Calculate team averages (season averages only count rows with baseline stats)
+        avg_season_ba = float(season_ba[has_baseline].mean()) if has_baseline.any() else 0.250
+        avg_season_k = float(season_k[has_baseline].mean()) if has_baseline.any() else 22.5
+        avg_arsenal_ba = float(arsenal_ba.mean())
+        avg_arsenal_k = float(arsenal_k.mean())
         
         return {
             'ba_advantage': avg_arsenal_ba - avg_season_ba,
@@ -281,44 +378,25 @@ class MLBDataFetcher:
         
         return f"DraftKings has {fav_team} as a {fav_odds} favorite and {und_team} as a {und_odds} underdog, with {money_pct} of the money backing {money_team}."
 
-    def parse_game_time_for_sorting(self, time_str):
-        """Parse game time for proper chronological sorting"""
-        if not time_str or time_str == 'TBD':
-            return 9999  # Sort TBD games to the end
-        
-        try:
-            # Handle format like "7/8, 06:40PM" or just "06:40PM"
-            if ',' in time_str:
-                time_part = time_str.split(',')[1].strip()
-            else:
-                time_part = time_str.strip()
-            
-            # Convert to 24-hour format for proper sorting
-            if 'PM' in time_part:
-                hour = int(time_part.split(':')[0])
-                if hour != 12:
-                    hour += 12
-                minute = int(time_part.split(':')[1].replace('PM', ''))
-            else:  # AM
-                hour = int(time_part.split(':')[0])
-                if hour == 12:
-                    hour = 0
-                minute = int(time_part.split(':')[1].replace('AM', ''))
-            
-            return hour * 100 + minute  # Returns like 1840 for 6:40PM
-        except Exception as e:
-            print(f"⚠️ Error parsing time '{time_str}': {e}")
-            return 9999  # Sort unparseable times to end
-
     def get_blog_topics_from_games(self):
         """Generate blog topics from current MLB games"""
-        mlb_reports = self.get_mlb_data()
-        umpires = self.get_umpire_data()
-        betting_games = self.get_betting_data()
+        sources = self.fetch_all_sources()
+        mlb_reports = sources['mlb']
+        umpires = sources['umpires']
+        betting_games = sources['betting']
         
         if not mlb_reports:
             return []
         
+        # Normalize umpire and odds records once so each game joins in O(1)
+        umpire_index = team_registry.index_umpires(umpires)
+        betting_index = team_registry.index_betting_games(betting_games)
+        
+        # Stable per-game identity (slate date + matchup + doubleheader number) so
+        # slugs and stored outputs line up across reruns of the same day
+        slate_date = self._slate_date()
+        matchup_occurrences = {}
+        
         blog_topics = []
         
         for game_report in mlb_reports:
@@ -333,68 +411,44 @@ class MLBDataFetcher:
                 away_pitcher_data = game_report['pitchers']['away']
                 home_pitcher_data = game_report['pitchers']['home']
                 
-                # Format pitcher names
-                away_pitcher_name = away_pitcher_data.get('name', 'Unknown').replace(', ', ' ').split()
-                away_pitcher_display = f"{away_pitcher_name[1]} {away_pitcher_name[0]}" if len(away_pitcher_name) >= 2 else away_pitcher_data.get('name', 'Unknown')
-                
-                home_pitcher_name = home_pitcher_data.get('name', 'Unknown').replace(', ', ' ').split()
-                home_pitcher_display = f"{home_pitcher_name[1]} {home_pitcher_name[0]}" if len(home_pitcher_name) >= 2 else home_pitcher_data.get('name', 'Unknown')
-                
                 # Calculate comprehensive lineup advantages (including K% data)
                 key_matchups = game_report['key_matchups']
-                away_lineup_stats = self.calculate_lineup_advantage(key_matchups, home_pitcher_data['name'])
-                home_lineup_stats = self.calculate_lineup_advantage(key_matchups, away_pitcher_data['name'])
+                matchup_index = self.build_pitcher_matchup_index(key_matchups)
+                away_lineup_stats = self.calculate_lineup_advantage(key_matchups, home_pitcher_data['name'], matchup_index)
+                home_lineup_stats = self.calculate_lineup_advantage(key_matchups, away_pitcher_data['name'], matchup_index)
                 
                 # Find umpire
-                umpire = self.find_game_umpire(umpires, matchup)
+                umpire = self.find_game_umpire(umpire_index, matchup)
                 
                 # Find betting data
-                betting_game = self.find_game_betting_data(betting_games, matchup)
+                betting_game = self.find_game_betting_data(betting_index, matchup)
                 
-                # Create comprehensive game data with K% information
-                game_data = {
-                    'matchup': matchup,
-                    'away_team': away_team,
-                    'home_team': home_team,
-                    'game_time': betting_game.get('time', 'TBD') if betting_game else 'TBD',
-                    'betting_info': self.format_betting_info(betting_game),
-                    'away_pitcher': {
-                        'name': away_pitcher_display,
-                        'arsenal': self.format_pitcher_arsenal(away_pitcher_data)
-                    },
-                    'home_pitcher': {
-                        'name': home_pitcher_display,
-                        'arsenal': self.format_pitcher_arsenal(home_pitcher_data)
-                    },
-                    # Away lineup vs home pitcher
-                    'away_lineup_advantage': away_lineup_stats['ba_advantage'],
-                    'away_lineup_k_advantage': away_lineup_stats['k_advantage'],
-                    'away_season_ba': away_lineup_stats['season_ba'],
-                    'away_arsenal_ba': away_lineup_stats['arsenal_ba'],
-                    'away_season_k_pct': away_lineup_stats['season_k_pct'],
-                    'away_arsenal_k_pct': away_lineup_stats['arsenal_k_pct'],
-                    'away_key_performers': away_lineup_stats['top_performers'],
-                    # Home lineup vs away pitcher
-                    'home_lineup_advantage': home_lineup_stats['ba_advantage'],
-                    'home_lineup_k_advantage': home_lineup_stats['k_advantage'],
-                    'home_season_ba': home_lineup_stats['season_ba'],
-                    'home_arsenal_ba': home_lineup_stats['arsenal_ba'],
-                    'home_season_k_pct': home_lineup_stats['season_k_pct'],
-                    'home_arsenal_k_pct': home_lineup_stats['arsenal_k_pct'],
-                    'home_key_performers': home_lineup_stats['top_performers'],
-                    # Umpire data
-                    'umpire': umpire['umpire'] if umpire else 'TBA',
-                    'umpire_k_boost': umpire['k_boost'] if umpire else '1.0x',
-                    'umpire_bb_boost': umpire['bb_boost'] if umpire else '1.0x'
-                }
+                # Decode straight into the typed game record with K% information
+                game = GameRecord(
+                    matchup=matchup,
+                    away_team=away_team,
+                    home_team=home_team,
+                    game_time=betting_game.get('time', 'TBD') if betting_game else 'TBD',
+                    betting_info=self.format_betting_info(betting_game),
+                    away_pitcher=PitcherProfile.from_upstream(away_pitcher_data, self.format_pitcher_arsenal(away_pitcher_data)),
+                    home_pitcher=PitcherProfile.from_upstream(home_pitcher_data, self.format_pitcher_arsenal(home_pitcher_data)),
+                    away_lineup=LineupSplit.from_stats(away_lineup_stats),
+                    home_lineup=LineupSplit.from_stats(home_lineup_stats),
+                    umpire=UmpireInfo.from_upstream(umpire)
+                )
+                game.start_time = parse_game_time(game.game_time, slate_date)
+                game_number = matchup_occurrences[matchup] = matchup_occurrences.get(matchup, 0) + 1
+                game.game_id = hashlib.md5(f"{slate_date}|{matchup}|{game_number}".encode()).hexdigest()[:8]
                 
                 # Generate topic using full team names from betting data if available
                 if betting_game:
                     betting_away = betting_game.get('away_team', away_team)
                     betting_home = betting_game.get('home_team', home_team)
-                    # Extract just the team name (last word) from "TB Rays" → "Rays"
-                    away_display = betting_away.split()[-1] if ' ' in betting_away else away_team
-                    home_display = betting_home.split()[-1] if ' ' in betting_home else home_team
+                    # Registry nickname: "TB Rays" → "Rays", "CHI White Sox" → "White Sox"
+                    away_entry = team_registry.get(betting_away)
+                    home_entry = team_registry.get(betting_home)
+                    away_display = away_entry.nickname if away_entry else away_team
+                    home_display = home_entry.nickname if home_entry else home_team
                     topic = f"{away_display} at {home_display} MLB Betting Preview"
                 else:
                     # Fallback to short codes if no betting data
@@ -404,20 +458,20 @@ class MLBDataFetcher:
                 keywords = [
                     f"{away_team.lower()}", f"{home_team.lower()}", 
                     "mlb betting", "baseball preview", "pitcher analysis",
-                    f"{away_pitcher_display.lower().replace(' ', '-')}", 
-                    f"{home_pitcher_display.lower().replace(' ', '-')}",
+                    f"{game.away_pitcher.name.lower().replace(' ', '-')}", 
+                    f"{game.home_pitcher.name.lower().replace(' ', '-')}",
                     "lineup matchups", "umpire analysis"
                 ]
                 
                 # Add situational keywords based on significant advantages
-                if abs(away_lineup_stats['ba_advantage']) > 0.015 or abs(home_lineup_stats['ba_advantage']) > 0.015:
+                if abs(game.away_lineup.ba_advantage) > 0.015 or abs(game.home_lineup.ba_advantage) > 0.015:
                     keywords.extend(["pitcher advantage", "matchup edge"])
                 
-                if abs(away_lineup_stats['k_advantage']) > 3.0 or abs(home_lineup_stats['k_advantage']) > 3.0:
+                if abs(game.away_lineup.k_advantage) > 3.0 or abs(game.home_lineup.k_advantage) > 3.0:
                     keywords.extend(["strikeout props", "contact advantage"])
                 
-                if umpire and umpire['umpire'] != 'TBA':
-                    k_multiplier = float(umpire['k_boost'].replace('x', ''))
+                if game.umpire.is_assigned:
+                    k_multiplier = game.umpire.k_multiplier
                     if k_multiplier > 1.1:
                         keywords.extend(["strikeout props", "pitcher friendly umpire"])
                     elif k_multiplier < 0.9:
@@ -426,7 +480,7 @@ class MLBDataFetcher:
                 blog_topics.append({
                     'topic': topic,
                     'keywords': keywords,
-                    'game_data': game_data
+                    'game_data': game
                 })
                 
             except Exception as e:
@@ -435,11 +489,10 @@ class MLBDataFetcher:
         
         # ✅ IMPROVED: Sort blog topics by game time (earliest to latest)
         print(f"🔄 Sorting {len(blog_topics)} games by time...")
-        blog_topics.sort(key=lambda x: self.parse_game_time_for_sorting(x['game_data'].get('game_time', 'TBD')))
+        blog_topics.sort(key=lambda x: game_time_sort_key(x['game_data'].start_time))
         
         # Debug: Print sorted order
         for i, topic in enumerate(blog_topics):
-            game_time = topic['game_data'].get('game_time', 'TBD')
-            print(f"  {i+1}. {topic['topic']} - {game_time}")
+            print(f"  {i+1}. {topic['topic']} - {topic['game_data'].display_time}")
         
         return blog_topics
@@ -0,0 +1,201 @@
+# mlb_models.py
+from dataclasses import dataclass, field, replace as dataclass_replace
+from datetime import datetime
+from typing import List, Optional
+
+from game_time import format_game_time
+
+# Defaults used when a lineup has no reliable matchups against a pitcher
+LEAGUE_AVG_BA = 0.250
+LEAGUE_AVG_K_PCT = 22.5
+
+
+def format_display_name(raw_name: str) -> str:
+    """Turn "Last, First" from the matchup API into "First Last" """
+    parts = (raw_name or 'Unknown').replace(', ', ' ').split()
+    return f"{parts[1]} {parts[0]}" if len(parts) >= 2 else (raw_name or 'Unknown')
+
+
+@dataclass(slots=True)
+class PitcherProfile:
+    """Probable starter as shown in the post"""
+    name: str = 'Unknown'
+    arsenal: str = 'Mixed arsenal'
+
+    @classmethod
+    def from_upstream(cls, pitcher_data: dict, arsenal_text: str) -> 'PitcherProfile':
+        return cls(name=format_display_name(pitcher_data.get('name', 'Unknown')), arsenal=arsenal_text)
+
+    def to_dict(self) -> dict:
+        return {'name': self.name, 'arsenal': self.arsenal}
+
+
+@dataclass(slots=True)
+class LineupSplit:
+    """One lineup's season vs arsenal-weighted numbers against the opposing starter"""
+    ba_advantage: float = 0.0
+    k_advantage: float = 0.0
+    season_ba: float = LEAGUE_AVG_BA
+    arsenal_ba: float = LEAGUE_AVG_BA
+    season_k_pct: float = LEAGUE_AVG_K_PCT
+    arsenal_k_pct: float = LEAGUE_AVG_K_PCT
+    key_performers: List[dict] = field(default_factory=list)
+
+    @classmethod
+    def from_stats(cls, stats: dict) -> 'LineupSplit':
+        """Build from the dict returned by MLBDataFetcher.calculate_lineup_advantage"""
+        return cls(
+            ba_advantage=stats['ba_advantage'],
+            k_advantage=stats['k_advantage'],
+            season_ba=stats['season_ba'],
+            arsenal_ba=stats['arsenal_ba'],
+            season_k_pct=stats['season_k_pct'],
+            arsenal_k_pct=stats['arsenal_k_pct'],
+            key_performers=stats['top_performers']
+        )
+
+
+@dataclass(slots=True)
+class UmpireInfo:
+    """Home plate umpire assignment and zone multipliers"""
+    name: str = 'TBA'
+    k_boost: str = '1.0x'
+    bb_boost: str = '1.0x'
+
+    @classmethod
+    def from_upstream(cls, umpire: Optional[dict]) -> 'UmpireInfo':
+        if not umpire:
+            return cls()
+        return cls(
+            name=umpire.get('umpire', 'TBA'),
+            k_boost=umpire.get('k_boost', '1.0x'),
+            bb_boost=umpire.get('bb_boost', '1.0x')
+        )
+
+    @property
+    def is_assigned(self) -> bool:
+        return self.name != 'TBA'
+
+    @property
+    def k_multiplier(self) -> float:
+        try:
+            return float(self.k_boost.replace('x', ''))
+        except (AttributeError, ValueError):
+            return 1.0
+
+
+@dataclass(slots=True)
+class GameRecord:
+    """Validated per-game input shared by prompting, schema building and persistence.
+
+    to_dict()/from_dict() use the flat key layout stored in game_data.json
+    (away_season_ba, home_arsenal_k_pct, ...), so existing files stay readable.
+    """
+    matchup: str
+    away_team: str
+    home_team: str
+    game_time: str = 'TBD'
+    betting_info: str = 'Betting odds not available for this game.'
+    away_pitcher: PitcherProfile = field(default_factory=PitcherProfile)
+    home_pitcher: PitcherProfile = field(default_factory=PitcherProfile)
+    away_lineup: LineupSplit = field(default_factory=LineupSplit)   # Away lineup vs home pitcher
+    home_lineup: LineupSplit = field(default_factory=LineupSplit)   # Home lineup vs away pitcher
+    umpire: UmpireInfo = field(default_factory=UmpireInfo)
+    game_id: Optional[str] = None
+    start_time: Optional[datetime] = None  # Parsed once from game_time at ingestion (US/Eastern)
+    away_logo: Optional[str] = None
+    home_logo: Optional[str] = None
+
+    @property
+    def display_time(self) -> str:
+        """Game time as shown to readers, e.g. "7:05 PM ET" """
+        return format_game_time(self.start_time, self.game_time)
+
+    @classmethod
+    def coerce(cls, value) -> 'GameRecord':
+        """Accept a GameRecord or a legacy flat game_data dict"""
+        if isinstance(value, cls):
+            return value
+        return cls.from_dict(value or {})
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'GameRecord':
+        """Decode the flat game_data layout (game_data.json, ad-hoc test dicts)"""
+        matchup = data.get('matchup', 'Unknown')
+        if ' @ ' in matchup:
+            default_away, default_home = matchup.split(' @ ', 1)
+        else:
+            default_away, default_home = '', ''
+
+        def lineup(prefix: str) -> LineupSplit:
+            return LineupSplit(
+                ba_advantage=float(data.get(f'{prefix}_lineup_advantage', 0.0)),
+                k_advantage=float(data.get(f'{prefix}_lineup_k_advantage', 0.0)),
+                season_ba=float(data.get(f'{prefix}_season_ba', LEAGUE_AVG_BA)),
+                arsenal_ba=float(data.get(f'{prefix}_arsenal_ba', LEAGUE_AVG_BA)),
+                season_k_pct=float(data.get(f'{prefix}_season_k_pct', LEAGUE_AVG_K_PCT)),
+                arsenal_k_pct=float(data.get(f'{prefix}_arsenal_k_pct', LEAGUE_AVG_K_PCT)),
+                key_performers=list(data.get(f'{prefix}_key_performers') or [])
+            )
+
+        away_pitcher = data.get('away_pitcher') or {}
+        home_pitcher = data.get('home_pitcher') or {}
+        start_time = data.get('start_time')
+        return cls(
+            matchup=matchup,
+            away_team=data.get('away_team', default_away),
+            home_team=data.get('home_team', default_home),
+            game_time=data.get('game_time', 'TBD'),
+            betting_info=data.get('moneyline') or data.get('betting_info') or 'Betting odds not available for this game.',
+            away_pitcher=PitcherProfile(away_pitcher.get('name', 'Unknown'), away_pitcher.get('arsenal', 'Mixed arsenal')),
+            home_pitcher=PitcherProfile(home_pitcher.get('name', 'Unknown'), home_pitcher.get('arsenal', 'Mixed arsenal')),
+            away_lineup=lineup('away'),
+            home_lineup=lineup('home'),
+            umpire=UmpireInfo(
+                name=data.get('umpire', 'TBA'),
+                k_boost=data.get('umpire_k_boost', '1.0x'),
+                bb_boost=data.get('umpire_bb_boost', '1.0x')
+            ),
+            game_id=data.get('game_id'),
+            start_time=datetime.fromisoformat(start_time) if start_time else None,
+            away_logo=data.get('away_logo'),
+            home_logo=data.get('home_logo')
+        )
+
+    def to_dict(self) -> dict:
+        """Single serializer for game_data.json and the prompt's field listing"""
+        data = {
+            'matchup': self.matchup,
+            'away_team': self.away_team,
+            'home_team': self.home_team,
+            'game_time': self.game_time,
+            'betting_info': self.betting_info,
+            'away_pitcher': self.away_pitcher.to_dict(),
+            'home_pitcher': self.home_pitcher.to_dict(),
+        }
+        for prefix, lineup in (('away', self.away_lineup), ('home', self.home_lineup)):
+            data.update({
+                f'{prefix}_lineup_advantage': lineup.ba_advantage,
+                f'{prefix}_lineup_k_advantage': lineup.k_advantage,
+                f'{prefix}_season_ba': lineup.season_ba,
+                f'{prefix}_arsenal_ba': lineup.arsenal_ba,
+                f'{prefix}_season_k_pct': lineup.season_k_pct,
+                f'{prefix}_arsenal_k_pct': lineup.arsenal_k_pct,
+                f'{prefix}_key_performers': lineup.key_performers,
+            })
+        data.update({
+            'umpire': self.umpire.name,
+            'umpire_k_boost': self.umpire.k_boost,
+            'umpire_bb_boost': self.umpire.bb_boost,
+        })
+        for optional_field in ('game_id', 'away_logo', 'home_logo'):
+            value = getattr(self, optional_field)
+            if value is not None:
+                data[optional_field] = value
+        if self.start_time is not None:
+            data['start_time'] = self.start_time.isoformat()
+        return data
+
+    def replace(self, **changes) -> 'GameRecord':
+        """Shallow copy with some fields swapped, leaving this record untouched"""
+        return dataclass_replace(self, **changes)
@@ -1,32 +1,51 @@
 # mlb_prompts.py 
 import random
 import json
+import logging
+from typing import Dict, List, Optional
 
-def get_unique_angles():
+from mlb_models import GameRecord
+from prompt_budget import PromptBudgeter, PromptSection
+
+logger = logging.getLogger(__name__)
+
+def prompt_rng(game_data: GameRecord) -> random.Random:
+    """Isolated RNG seeded from the game's identity and date.
+    
+    Reruns for the same game build the same prompt (so cached completions and
+    prompt diffs stay meaningful) while different games still get different
+    headers, angles and FAQs.
+    """
+    identity = game_data.game_id or game_data.matchup
+    slate_date = game_data.start_time.date().isoformat() if game_data.start_time else game_data.game_time
+    return random.Random(f"{identity}|{slate_date}")
+
+def get_unique_angles(rng: Optional[random.Random] = None):
     """Generate unique per-post angles to avoid scaled content detection"""
+    rng = rng or random
     return {
-        "team_form": random.choice([
+        "team_form": rng.choice([
             "Recent Form Analysis (Last 10 Games)",
             "Team Momentum & Current Streak", 
             "Hot/Cold Streak Impact",
             "Recent Performance Trends",
             "10-Game Form Guide"
         ]),
-        "bullpen_status": random.choice([
+        "bullpen_status": rng.choice([
             "Bullpen Fatigue Assessment",
             "Relief Pitching Workload", 
             "Bullpen Usage Patterns",
             "Relief Corps Analysis",
             "Pen Fatigue Factor"
         ]),
-        "situational": random.choice([
+        "situational": rng.choice([
             "Weather & Ballpark Factors",
             "Travel & Rest Advantages",
             "Home Field & Environmental Edge",
             "Situational Factors",
             "Game Context Analysis"
         ]),
-        "splits": random.choice([
+        "splits": rng.choice([
             "L/R Platoon Advantages", 
             "Splits-Based Matchups",
             "Handedness Edge Analysis",
@@ -35,10 +54,11 @@ def get_unique_angles():
         ])
     }
 
-def get_blog_headers():
+def get_blog_headers(rng: Optional[random.Random] = None):
     """Generate randomized headers with enhanced variety"""
+    rng = rng or random
     return {
-        "intro": random.choice([
+        "intro": rng.choice([
             "Game Preview & Setup", 
             "Matchup Overview", 
             "Today's Key Angles",
@@ -47,7 +67,7 @@ def get_blog_headers():
             "Betting Setup",
             "Game Analysis Preview"
         ]),
-        "pitchers": random.choice([
+        "pitchers": rng.choice([
             "Starting Pitcher Breakdown", 
             "Mound Matchup Analysis", 
             "Starting Rotation Report",
@@ -56,7 +76,7 @@ def get_blog_headers():
             "Primary Pitching Matchup",
             "Starting Pitchers Deep Dive"
         ]),
-        "lineups": random.choice([
+        "lineups": rng.choice([
             "Offensive Matchup Analysis", 
             "Batting Order vs Arsenal Breakdown", 
             "Lineup Edges & Weaknesses",
@@ -65,7 +85,7 @@ def get_blog_headers():
             "Offensive Production Analysis",
             "Lineup Arsenal Matchups"
         ]),
-        "strikeouts": random.choice([
+        "strikeouts": rng.choice([
             "Strikeout Rate Projections", 
             "Contact vs Whiff Analysis", 
             "K-Rate Trends & Opportunities",
@@ -74,7 +94,7 @@ def get_blog_headers():
             "Whiff Rate Projections",
             "K-Risk Evaluation"
         ]),
-        "umpire": random.choice([
+        "umpire": rng.choice([
             "Home Plate Umpire Impact", 
             "Behind the Plate Analysis", 
             "Umpire Tendencies & Effect",
@@ -85,10 +105,11 @@ def get_blog_headers():
         ])
     }
 
-def get_faq_questions(game_data):
+def get_faq_questions(game_data: GameRecord, rng: Optional[random.Random] = None):
     """Generate relevant FAQ questions based on game data"""
-    away_team = game_data.get('away_team', 'Away Team')
-    home_team = game_data.get('home_team', 'Home Team')
+    rng = rng or random
+    away_team = game_data.away_team or 'Away Team'
+    home_team = game_data.home_team or 'Home Team'
     
     base_questions = [
         f"What time does the {away_team} vs {home_team} game start?",
@@ -107,11 +128,12 @@ def get_faq_questions(game_data):
     ]
     
     # Randomly select 4-6 questions
-    num_questions = random.randint(4, 6)
-    return random.sample(base_questions, num_questions)
+    num_questions = rng.randint(4, 6)
+    return rng.sample(base_questions, num_questions)
 
-def get_authority_sources():
+def get_authority_sources(rng: Optional[random.Random] = None):
     """Get randomized authority sources for inline citations"""
+    rng = rng or random
     sources = [
         {"name": "Baseball Savant", "url": "https://baseballsavant.mlb.com", "context": "advanced metrics"},
         {"name": "MLB.com", "url": "https://mlb.com", "context": "official statistics"},
@@ -121,8 +143,8 @@ def get_authority_sources():
     ]
     
     # Return 2-3 random sources
-    num_sources = random.randint(2, 3)
-    return random.sample(sources, num_sources)
+    num_sources = rng.randint(2, 3)
+    return rng.sample(sources, num_sources)
 
 def build_unique_angle_prompts(game_data, unique_angles):
     """Always include 2-3 angle sections with fallbacks when data is missing"""
@@ -154,20 +176,54 @@ def build_unique_angle_prompts(game_data, unique_angles):
     
     return angle_prompts
 
-def get_mlb_blog_post_prompt(topic, keywords, game_data):
-    """Generate enhanced MLB blog prompt with unique angles and proper structure"""
-    
-    # Get randomized elements
-    headers = get_blog_headers()
-    unique_angles = get_unique_angles()
-    faq_questions = get_faq_questions(game_data)
-    authority_sources = get_authority_sources()
+def compact_arsenal(arsenal: str, max_pitches: Optional[int]) -> str:
+    """Keep the most-used pitches of a "Pitch (x% usage, y mph); ..." arsenal string"""
+    if arsenal == 'data not available':
+        return 'Arsenal data not available'
+    pitches = arsenal.split('; ')
+    if max_pitches is None or len(pitches) <= max_pitches:
+        return arsenal
+    return '; '.join(pitches[:max_pitches])
+
+def game_data_block(game_data: GameRecord, max_performers: Optional[int]) -> str:
+    """Compact JSON of the numbers the analysis rules refer to (replaces the bare field-name list)"""
+    data = {}
+    for prefix, lineup in (('away', game_data.away_lineup), ('home', game_data.home_lineup)):
+        data.update({
+            f'{prefix}_season_ba': round(lineup.season_ba, 3),
+            f'{prefix}_arsenal_ba': round(lineup.arsenal_ba, 3),
+            f'{prefix}_season_k_pct': round(lineup.season_k_pct, 1),
+            f'{prefix}_arsenal_k_pct': round(lineup.arsenal_k_pct, 1),
+        })
+        if max_performers:
+            data[f'{prefix}_key_performers'] = [
+                {
+                    'name': performer.get('name'),
+                    'season_ba': round(performer.get('season_ba', 0), 3),
+                    'arsenal_ba': round(performer.get('arsenal_ba', 0), 3),
+                    'season_k': round(performer.get('season_k', 0), 1),
+                    'arsenal_k': round(performer.get('arsenal_k', 0), 1),
+                }
+                for performer in lineup.key_performers[:max_performers]
+            ]
+    data['umpire_k_boost'] = game_data.umpire.k_boost
+    data['umpire_bb_boost'] = game_data.umpire.bb_boost
+    return f"\nGame Data: {json.dumps(data, separators=(',', ':'))}"
+
+def build_prompt_sections(topic, keywords, game_data: GameRecord) -> List[PromptSection]:
+    """Prompt split into sections; priority decides what PromptBudgeter compacts first"""
+    # Get varied elements, reproducible per game and date
+    rng = prompt_rng(game_data)
+    headers = get_blog_headers(rng)
+    unique_angles = get_unique_angles(rng)
+    faq_questions = get_faq_questions(game_data, rng)
+    authority_sources = get_authority_sources(rng)
     
     # Build unique angle sections
     unique_angle_prompts = build_unique_angle_prompts(game_data, unique_angles)
     
     # Shuffle and cap at 3 for variety
-    random.shuffle(unique_angle_prompts)
+    rng.shuffle(unique_angle_prompts)
     unique_angle_prompts = unique_angle_prompts[:3]
     
     # Create citations requirement with improved instruction
@@ -180,34 +236,34 @@ def get_mlb_blog_post_prompt(topic, keywords, game_data):
         ])
     )
     
-    # Extract actual data values with fallbacks
-    game_time = game_data.get('game_time', 'data not available')
-    moneyline = game_data.get('moneyline') or game_data.get('betting_info', 'data not available')
+    # Extract actual data values from the validated game record
+    game_time = game_data.display_time
+    moneyline = game_data.betting_info
     
-    # Get pitcher info with fallbacks
-    away_pitcher = game_data.get('away_pitcher', {})
-    home_pitcher = game_data.get('home_pitcher', {})
-    away_pitcher_name = away_pitcher.get('name', 'Away Pitcher')
-    home_pitcher_name = home_pitcher.get('name', 'Home Pitcher')
-    away_arsenal = away_pitcher.get('arsenal', 'data not available')
-    home_arsenal = home_pitcher.get('arsenal', 'data not available')
+    # Get pitcher info
+    away_pitcher_name = game_data.away_pitcher.name
+    home_pitcher_name = game_data.home_pitcher.name
     
     # Get umpire info
-    umpire_name = game_data.get('umpire', 'TBA')
+    umpire_name = game_data.umpire.name
     
-    # Build the enhanced prompt
-    prompt = f"""You are an expert MLB betting analyst. Write a comprehensive, unique preview that avoids template-like content.
+    envelope = """You are an expert MLB betting analyst. Write a comprehensive, unique preview that avoids template-like content.
 
 CRITICAL: Return ONLY a JSON object with this exact structure:
-{{
+{
     "html": "your complete HTML blog post",
     "meta_title": "SEO title 50-60 chars", 
     "meta_desc": "SEO description 140-160 chars",
-    "faq": [{{"question": "Q text", "answer": "A text"}}],
-    "citations": [{{"source": "Source Name", "url": "https://url"}}],
+    "faq": [{"question": "Q text", "answer": "A text"}],
+    "citations": [{"source": "Source Name", "url": "https://url"}],
     "keywords": ["keyword1", "keyword2"]
-}}
-
+}
+"""
+    
+    def structure(max_pitches: Optional[int]) -> str:
+        away_arsenal = compact_arsenal(game_data.away_pitcher.arsenal, max_pitches)
+        home_arsenal = compact_arsenal(game_data.home_pitcher.arsenal, max_pitches)
+        return f"""
 HTML STRUCTURE REQUIREMENTS:
 <h1>{topic}</h1>
 <p><strong>Game Time:</strong> {game_time} | <strong>Lines:</strong> {moneyline}</p>
@@ -218,8 +274,8 @@ HTML STRUCTURE REQUIREMENTS:
 
 <h2>{headers['pitchers']}</h2>
 <h3>{away_pitcher_name} vs {home_pitcher_name}</h3>
-<p><strong>{away_pitcher_name}:</strong> {away_arsenal if away_arsenal != 'data not available' else 'Arsenal data not available'}</p>
-<p><strong>{home_pitcher_name}:</strong> {home_arsenal if home_arsenal != 'data not available' else 'Arsenal data not available'}</p>
+<p><strong>{away_pitcher_name}:</strong> {away_arsenal}</p>
+<p><strong>{home_pitcher_name}:</strong> {home_arsenal}</p>
 
 <h2>{headers['lineups']}</h2>  
 <h3>Projected xBA vs Arsenal</h3>
@@ -232,46 +288,59 @@ HTML STRUCTURE REQUIREMENTS:
 <h2>{headers['umpire']}</h2>
 <h3>Plate Umpire: {umpire_name}</h3>
 <p>{"Convert multipliers to % (1.11x = +11%) if umpire impact data exists. If TBA or data not available, mention uncertainty in umpire assignment." if umpire_name != 'TBA' else "Umpire assignment TBA - impact on game dynamics uncertain."}</p>"""
-
-    # Add unique angle sections (only once)
-    for angle_prompt in unique_angle_prompts:
-        prompt += angle_prompt
-
-    prompt += f"""
+    
+    def takeaways_and_faq(questions) -> str:
+        # Add FAQ structure (only once)
+        faq = ''.join(
+            f'<h3>{question}</h3>\n<p>Provide specific answer based on game data and analysis. If specific data not available, give general guidance.</p>\n'
+            for question in questions
+        )
+        return f"""
 <h2>Key Takeaways</h2>
 <p>Write EXACTLY 3 sentences summarizing the most important betting insights. No more, no less. Focus on actionable information for bettors.</p>
 
-<h2>Frequently Asked Questions</h2>"""
-
-    # Add FAQ structure (only once)
-    for question in faq_questions:
-        prompt += f'<h3>{question}</h3>\n<p>Provide specific answer based on game data and analysis. If specific data not available, give general guidance.</p>\n'
-
-    prompt += f"""
+<h2>Frequently Asked Questions</h2>{faq}"""
+    
+    rules = f"""
 BETTING ANALYSIS REQUIREMENTS:
-- Use EXACT criteria for recommendations:
+- Only recommend when data meets these exact thresholds:
   * Batter props: arsenal_ba > 0.300 AND boost > +20 points
-  * Strikeout props: K% > 25% AND increase > 4%
-- Only recommend when data strongly supports the lean
+  * Strikeout props: K% > 25% AND increase > +4%
 - If no strong edges exist, state: "No significant statistical edges meet our betting threshold"
 
 CONTENT QUALITY RULES:
 1. Each post must feel unique - vary analysis depth, focus areas, and insights
-2. Use specific data points and exact numbers from the JSON when available
+2. Use specific data points and exact numbers from Game Data when available
 3. Avoid generic phrases like "this should be a great game"
 4. Include methodology note: "Analysis based on xBA models and historical data. Do not bet based solely on this article."
-5. Must include at least 2 of these authority citations as inline links: {citation_requirement}
-6. CRITICAL: Every article must include exactly 2 inline citations from the authority sources listed above. Use <a href="URL" rel="nofollow" target="_blank">Source Name</a> format within your content paragraphs.
-7. Use only fields present in game_data; if a field is missing, write "data not available" for that item. No guessing.
+5. CRITICAL: Include at least 2 inline citations inside your content paragraphs, formatted <a href="URL" rel="nofollow" target="_blank">Source Name</a>. {citation_requirement}
+6. Use only fields present in Game Data; if a field is missing, write "data not available" for that item. No guessing.
 7. If a unique-angle section lacks data, include one sentence: "Data not available for this section."
-8. BETTING CRITERIA - Only recommend when data meets exact thresholds:
-   - Batter props: arsenal_ba > 0.300 AND boost > +20 points  
-   - Strikeout props: K% > 25% AND increase > +4%
-   - If no strong edges exist: "No significant statistical edges meet our betting threshold"
 
-Target Keywords: {keywords}
-Available Game Data Fields: {list(game_data.keys())}"""
+Target Keywords: {keywords}"""
+    
+    return [
+        PromptSection('envelope', [envelope], priority=100),
+        PromptSection('structure', [structure(None), structure(3), structure(2)], priority=60),
+        # Unique angles are the first thing to go: 3 -> 2 -> 1 -> none
+        PromptSection('angles', [''.join(unique_angle_prompts[:n]) for n in range(len(unique_angle_prompts), -1, -1)], priority=10),
+        # FAQ prompts can shrink to the validator's minimum of 4
+        PromptSection('takeaways_faq', [takeaways_and_faq(faq_questions[:n]) for n in range(len(faq_questions), 3, -1)], priority=40),
+        PromptSection('rules', [rules], priority=100),
+        PromptSection('game_data', [game_data_block(game_data, n) for n in (5, 3, 1, 0)], priority=20),
+    ]
 
+def get_mlb_blog_post_prompt(topic, keywords, game_data: GameRecord, reserved: Optional[Dict[str, int]] = None,
+                             budgeter: Optional[PromptBudgeter] = None):
+    """Generate enhanced MLB blog prompt with unique angles and proper structure.
+    
+    The sections are fitted to the input token budget; reserved holds the token
+    counts of whatever is sent with the prompt (e.g. the system prompt).
+    """
+    game_data = GameRecord.coerce(game_data)
+    prompt, _, compacted = (budgeter or PromptBudgeter()).fit(build_prompt_sections(topic, keywords, game_data), reserved)
+    if compacted:
+        logger.info(f"Compacted prompt sections to fit the token budget: {', '.join(compacted)}")
     return prompt
 
 def get_random_mlb_blog_post_prompt():
@@ -0,0 +1,178 @@
+# mock_openai_server.py
+"""Local stand-in for the OpenAI Chat Completions, Files and Batch APIs.
+
+    python mock_openai_server.py
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 python main.py              # interactive completions
+    OPENAI_BATCH_BASE_URL=http://127.0.0.1:8765/v1 python main.py        # batch mode via /generate?batch=1
+
+Completions answer with llm_backend.fake_completion_content (a post that passes
+validate_blog_post). MOCK_LATENCY_SECONDS, MOCK_ERROR_RATE and
+MOCK_RATE_LIMIT_RATE shape /v1/chat/completions for load tests.
+"""
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+
+from flask import Flask, Response, request
+
+from llm_backend import fake_completion_content
+
+logger = logging.getLogger(__name__)
+
+app = Flask(__name__)
+
+MOCK_BATCH_DELAY_SECONDS = float(os.environ.get('MOCK_BATCH_DELAY_SECONDS', '2'))
+MOCK_LATENCY_SECONDS = float(os.environ.get('MOCK_LATENCY_SECONDS', '0.5'))
+MOCK_ERROR_RATE = float(os.environ.get('MOCK_ERROR_RATE', '0'))
+MOCK_RATE_LIMIT_RATE = float(os.environ.get('MOCK_RATE_LIMIT_RATE', '0'))
+
+files = {}    # file id -> {"meta": {...}, "content": bytes}
+batches = {}  # batch id -> batch object
+_lock = threading.Lock()
+
+
+def _completion(body: dict) -> dict:
+    user_prompt = next((m["content"] for m in body.get("messages", []) if m.get("role") == "user"), "")
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "gpt-4o"),
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": fake_completion_content(body)}}],
+        "usage": {"prompt_tokens": len(user_prompt) // 4, "completion_tokens": 300,
+                  "total_tokens": len(user_prompt) // 4 + 300},
+    }
+
+
+def _store_file(content: bytes, filename: str, purpose: str) -> dict:
+    file_id = f"file-{uuid.uuid4().hex[:12]}"
+    meta = {"id": file_id, "object": "file", "bytes": len(content), "created_at": int(time.time()),
+            "filename": filename, "purpose": purpose, "status": "processed"}
+    with _lock:
+        files[file_id] = {"meta": meta, "content": content}
+    return meta
+
+
+def _run_batch(batch_id: str):
+    time.sleep(MOCK_BATCH_DELAY_SECONDS)
+    with _lock:
+        batch = batches[batch_id]
+        if batch["status"] == "cancelling":
+            batch.update(status="cancelled", cancelled_at=int(time.time()))
+            return
+        lines = files[batch["input_file_id"]]["content"].decode("utf-8").splitlines()
+    
+    output = []
+    for line in lines:
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        output.append(json.dumps({
+            "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+            "custom_id": item["custom_id"],
+            "response": {"status_code": 200, "request_id": uuid.uuid4().hex, "body": _completion(item["body"])},
+            "error": None,
+        }))
+    output_file = _store_file(("\n".join(output) + "\n").encode("utf-8"), f"{batch_id}_output.jsonl", "batch_output")
+    
+    with _lock:
+        batch.update(status="completed", output_file_id=output_file["id"], completed_at=int(time.time()),
+                     request_counts={"total": len(output), "completed": len(output), "failed": 0})
+
+
+@app.route('/v1/chat/completions', methods=['POST'])
+def chat_completions():
+    body = request.get_json(force=True)
+    roll = random.random()
+    if roll < MOCK_RATE_LIMIT_RATE:
+        return ({"error": {"message": "Rate limit reached (mock)", "type": "requests", "code": "rate_limit_exceeded"}},
+                429, {"retry-after": "1", "x-ratelimit-remaining-requests": "0"})
+    time.sleep(MOCK_LATENCY_SECONDS * random.uniform(0.75, 1.25))
+    if roll < MOCK_RATE_LIMIT_RATE + MOCK_ERROR_RATE:
+        return {"error": {"message": "Internal server error (mock)", "type": "server_error"}}, 500
+    
+    completion = _completion(body)
+    headers = {"x-ratelimit-limit-requests": "500", "x-ratelimit-remaining-requests": "499",
+               "x-ratelimit-limit-tokens": "30000", "x-ratelimit-remaining-tokens": "25000"}
+    if not body.get("stream"):
+        return completion, 200, headers
+    
+    content = completion["choices"][0]["message"]["content"]
+    
+    def events():
+        for i in range(0, len(content), 64):
+            chunk = {"id": completion["id"], "object": "chat.completion.chunk", "created": completion["created"],
+                     "model": completion["model"],
+                     "choices": [{"index": 0, "delta": {"content": content[i:i + 64]}, "finish_reason": None}]}
+            yield f"data: {json.dumps(chunk)}\n\n"
+        if (body.get("stream_options") or {}).get("include_usage"):
+            usage_chunk = {"id": completion["id"], "object": "chat.completion.chunk", "created": completion["created"],
+                           "model": completion["model"], "choices": [], "usage": completion["usage"]}
+            yield f"data: {json.dumps(usage_chunk)}\n\n"
+        yield "data: [DONE]\n\n"
+    
+    return Response(events(), mimetype="text/event-stream", headers=headers)
+
+
+@app.route('/v1/files', methods=['POST'])
+def create_file():
+    upload = request.files['file']
+    return _store_file(upload.read(), upload.filename or "batch.jsonl", request.form.get('purpose', 'batch'))
+
+
+@app.route('/v1/files/<file_id>/content')
+def file_content(file_id):
+    with _lock:
+        stored = files.get(file_id)
+    if not stored:
+        return {"error": {"message": f"No such file: {file_id}"}}, 404
+    return Response(stored["content"], mimetype="application/jsonl")
+
+
+@app.route('/v1/batches', methods=['POST'])
+def create_batch():
+    params = request.get_json(force=True)
+    with _lock:
+        if params.get("input_file_id") not in files:
+            return {"error": {"message": "input_file_id not found"}}, 400
+        total = sum(1 for line in files[params["input_file_id"]]["content"].splitlines() if line.strip())
+        batch_id = f"batch_{uuid.uuid4().hex[:12]}"
+        batches[batch_id] = {
+            "id": batch_id, "object": "batch", "endpoint": params.get("endpoint"),
+            "input_file_id": params["input_file_id"], "completion_window": params.get("completion_window", "24h"),
+            "status": "in_progress", "created_at": int(time.time()), "output_file_id": None, "error_file_id": None,
+            "metadata": params.get("metadata"), "request_counts": {"total": total, "completed": 0, "failed": 0},
+        }
+        batch = dict(batches[batch_id])
+    threading.Thread(target=_run_batch, args=(batch_id,), daemon=True).start()
+    return batch
+
+
+@app.route('/v1/batches/<batch_id>')
+def retrieve_batch(batch_id):
+    with _lock:
+        batch = batches.get(batch_id)
+        return (dict(batch), 200) if batch else ({"error": {"message": f"No such batch: {batch_id}"}}, 404)
+
+
+@app.route('/v1/batches/<batch_id>/cancel', methods=['POST'])
+def cancel_batch(batch_id):
+    with _lock:
+        batch = batches.get(batch_id)
+        if not batch:
+            return {"error": {"message": f"No such batch: {batch_id}"}}, 404
+        if batch["status"] == "in_progress":
+            batch["status"] = "cancelling"
+        return dict(batch)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    port = int(os.environ.get('MOCK_OPENAI_PORT', 8765))
+    logger.info(f"Mock OpenAI server on http://127.0.0.1:{port}/v1")
+    app.run(host='127.0.0.1', port=port, debug=False)
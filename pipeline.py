@@ -0,0 +1,179 @@
+# pipeline.py
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, List, Optional
+
+from config import PIPELINE_QUEUE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Tells a worker its stage has no more input
+_DONE = object()
+
+
+@dataclass(slots=True)
+class Stage:
+    name: str
+    fn: Callable[[Any], Any]  # Returns the item for the next stage, or None to drop it
+    workers: int = 1
+    fan_out: bool = False     # fn returns an iterable of items instead of one
+
+
+class StageStats:
+    """Counters for one stage; queue depth is read live from its input queue"""
+    
+    def __init__(self, stage: Stage, inbox: queue.Queue):
+        self.stage = stage
+        self.inbox = inbox
+        self._lock = threading.Lock()
+        self.processed = 0
+        self.emitted = 0
+        self.errors = 0
+        self.in_progress = 0
+        self.max_queue_depth = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0  # Waiting on a full downstream queue
+    
+    def queued(self):
+        with self._lock:
+            self.max_queue_depth = max(self.max_queue_depth, self.inbox.qsize())
+    
+    def begin(self):
+        with self._lock:
+            self.in_progress += 1
+    
+    def finish(self, seconds: float, blocked: float, emitted: int, failed: bool):
+        with self._lock:
+            self.in_progress -= 1
+            self.processed += 1
+            self.emitted += emitted
+            self.errors += failed
+            self.busy_seconds += seconds - blocked
+            self.blocked_seconds += blocked
+    
+    def stats(self, elapsed: float) -> dict:
+        with self._lock:
+            return {
+                'workers': self.stage.workers,
+                'queue_depth': sum(1 for item in list(self.inbox.queue) if item is not _DONE),
+                'max_queue_depth': self.max_queue_depth,
+                'in_progress': self.in_progress,
+                'processed': self.processed,
+                'emitted': self.emitted,
+                'errors': self.errors,
+                'busy_seconds': round(self.busy_seconds, 2),
+                'blocked_seconds': round(self.blocked_seconds, 2),
+                'avg_seconds': round(self.busy_seconds / self.processed, 3) if self.processed else None,
+                'items_per_minute': round(self.processed / elapsed * 60, 1) if elapsed > 0 else None,
+                'utilization': round(self.busy_seconds / (elapsed * self.stage.workers), 3) if elapsed > 0 else None,
+            }
+
+
+class StagePipeline:
+    """Stages connected by bounded queues, each drained by its own worker threads.
+    
+    An item moves on as soon as its worker finishes it, so early items reach
+    the last stage while later ones are still queued upstream. A full queue
+    blocks the stage feeding it instead of letting work pile up. Items whose
+    stage raises are logged and dropped; whatever the last stage returns is
+    collected in results.
+    """
+    
+    def __init__(self, stages: Iterable[Stage], queue_size: int = PIPELINE_QUEUE_SIZE,
+                 label: Callable[[Any], str] = repr):
+        self.stages = list(stages)
+        self.label = label
+        self.queues = [queue.Queue(maxsize=max(1, queue_size)) for _ in self.stages]
+        self._stats = [StageStats(stage, inbox) for stage, inbox in zip(self.stages, self.queues)]
+        self._lock = threading.Lock()
+        self._remaining = [max(1, stage.workers) for stage in self.stages]
+        self._threads: List[threading.Thread] = []
+        self.results: List[Any] = []
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+    
+    def start(self):
+        self.started_at = time.perf_counter()
+        for index, stage in enumerate(self.stages):
+            for n in range(max(1, stage.workers)):
+                thread = threading.Thread(target=self._work, args=(index,), daemon=True, name=f"{stage.name}-{n}")
+                thread.start()
+                self._threads.append(thread)
+    
+    def submit(self, item):
+        """Feed the first stage (blocks while its queue is full)"""
+        self.queues[0].put(item)
+        self._stats[0].queued()
+    
+    def close(self):
+        """No more input; stages shut down in order once drained"""
+        for _ in range(self._remaining[0]):
+            self.queues[0].put(_DONE)
+    
+    def join(self) -> List[Any]:
+        for thread in self._threads:
+            thread.join()
+        self.finished_at = time.perf_counter()
+        return self.results
+    
+    def run(self, items: Iterable[Any]) -> List[Any]:
+        self.start()
+        for item in items:
+            self.submit(item)
+        self.close()
+        return self.join()
+    
+    @property
+    def running(self) -> bool:
+        return self.started_at is not None and self.finished_at is None
+    
+    def _emit(self, index: int, item) -> float:
+        """Hand item to the next stage; returns seconds spent blocked on its queue"""
+        if index + 1 == len(self.stages):
+            with self._lock:
+                self.results.append(item)
+            return 0.0
+        start = time.perf_counter()
+        self.queues[index + 1].put(item)
+        self._stats[index + 1].queued()
+        return time.perf_counter() - start
+    
+    def _work(self, index: int):
+        stage, stats = self.stages[index], self._stats[index]
+        while True:
+            item = self.queues[index].get()
+            if item is _DONE:
+                break
+            stats.begin()
+            start = time.perf_counter()
+            blocked, emitted, failed = 0.0, 0, False
+            try:
+                output = stage.fn(item)
+                for out in (output or ()) if stage.fan_out else (() if output is None else (output,)):
+                    blocked += self._emit(index, out)
+                    emitted += 1
+            except Exception as e:
+                failed = True
+                logger.error(f"Pipeline stage {stage.name} failed for {self.label(item)}: {e}", exc_info=True)
+            stats.finish(time.perf_counter() - start, blocked, emitted, failed)
+        
+        # The last worker out passes shutdown on to the next stage
+        with self._lock:
+            self._remaining[index] -= 1
+            last = self._remaining[index] == 0
+        if last and index + 1 < len(self.stages):
+            for _ in range(self._remaining[index + 1]):
+                self.queues[index + 1].put(_DONE)
+    
+    def stats(self) -> dict:
+        if self.started_at is None:
+            return {'running': False, 'elapsed_seconds': 0.0, 'stages': {}}
+        elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+        return {
+            'running': self.running,
+            'elapsed_seconds': round(elapsed, 2),
+            'stages': {stage.name: stats.stats(elapsed) for stage, stats in zip(self.stages, self._stats)},
+        }
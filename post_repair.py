@@ -0,0 +1,217 @@
+# post_repair.py
+import html as html_lib
+import json
+import logging
+import re
+from typing import Callable, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from html_document import split_sentences
+from mlb_models import GameRecord
+
+logger = logging.getLogger(__name__)
+
+# (prompt, max_tokens) -> completion text; supplied by generate_blog_post
+SectionWriter = Callable[[str, int], str]
+
+ANCHOR_TAG = re.compile(r'<a\s+[^>]*href="([^"]+)"[^>]*>', re.IGNORECASE)
+REL_ATTR = re.compile(r'\brel\s*=\s*"([^"]*)"', re.IGNORECASE)
+KEY_TAKEAWAYS = re.compile(r'(<h2>\s*Key Takeaways\s*</h2>\s*)(?:<p>(.*?)</p>)?', re.IGNORECASE | re.DOTALL)
+H1_CLOSE = re.compile(r'</h1\s*>', re.IGNORECASE)
+FAQ_HEADING = re.compile(r'<h2>[^<]*(?:FAQ|Frequently Asked)[^<]*</h2>', re.IGNORECASE)
+TAG = re.compile(r'<[^>]+>')
+
+# Label -> (pattern, neutral wording used when a repeat sits inside a longer paragraph)
+METADATA_LABELS = {
+    'Game Time': (re.compile(r'Game Time:', re.IGNORECASE), 'First pitch:'),
+    'Lines': (re.compile(r'Lines:', re.IGNORECASE), 'Odds:'),
+}
+SHORT_PARAGRAPH_CHARS = 160
+
+FALLBACK_SOURCES = [
+    ("https://baseballsavant.mlb.com", "Baseball Savant"),
+    ("https://fangraphs.com", "FanGraphs"),
+    ("https://mlb.com", "MLB.com"),
+]
+
+
+class PostRepairer:
+    """Fixes validation failures in place instead of regenerating the whole post.
+    
+    Deterministic fixes (nofollow, repeated or missing metadata labels, missing
+    citations, too many takeaway sentences or FAQs) are applied locally; only a
+    Key Takeaways paragraph or missing FAQ entries are re-requested from the
+    model, each as a small standalone prompt spliced back into the post.
+    """
+    
+    def __init__(self, allowed_domains: Iterable[str], writer: Optional[SectionWriter] = None):
+        self.allowed_domains = set(allowed_domains)
+        self.writer = writer
+    
+    def repair(self, result: dict, game_data: GameRecord) -> Tuple[dict, List[str]]:
+        """Return (repaired copy of result, names of the fixes applied)"""
+        result = dict(result)
+        html = result.get('html', '')
+        fixes = []
+        
+        for name, fix in (
+            ('nofollow', self.fix_nofollow),
+            ('metadata_labels', lambda h: self.fix_metadata_labels(h, game_data)),
+            ('citations', self.fix_citations),
+            ('key_takeaways', lambda h: self.fix_key_takeaways(h, game_data)),
+        ):
+            try:
+                fixed = fix(html)
+            except Exception as e:
+                logger.warning(f"Repair step {name} failed: {e}")
+                continue
+            if fixed != html:
+                html = fixed
+                fixes.append(name)
+        
+        faq = list(result.get('faq') or [])
+        try:
+            fixed_faq, html = self.fix_faq(faq, html, game_data)
+            if fixed_faq != faq:
+                result['faq'] = fixed_faq
+                fixes.append('faq')
+        except Exception as e:
+            logger.warning(f"Repair step faq failed: {e}")
+        
+        result['html'] = html
+        return result, fixes
+    
+    def _allowed(self, href: str) -> bool:
+        netloc = urlparse(href).netloc.lower()
+        return any(netloc == d or netloc.endswith("." + d) for d in self.allowed_domains)
+    
+    def fix_nofollow(self, html: str) -> str:
+        def add_nofollow(match):
+            tag = match.group(0)
+            if not self._allowed(match.group(1)):
+                return tag
+            rel = REL_ATTR.search(tag)
+            if rel is None:
+                return tag[:2] + ' rel="nofollow"' + tag[2:]
+            if 'nofollow' in rel.group(1).lower().split():
+                return tag
+            return tag[:rel.start(1)] + (rel.group(1) + ' nofollow').strip() + tag[rel.end(1):]
+        return ANCHOR_TAG.sub(add_nofollow, html)
+    
+    def fix_metadata_labels(self, html: str, game_data: GameRecord) -> str:
+        for pattern, replacement in METADATA_LABELS.values():
+            # Drop repeats from the end so earlier offsets stay valid
+            for match in reversed(list(pattern.finditer(html))[1:]):
+                start = html.rfind('<p', 0, match.start())
+                end = html.find('</p>', match.end())
+                if start != -1 and end != -1 and html.find('</p>', start) == end and \
+                        len(TAG.sub('', html[start:end])) < SHORT_PARAGRAPH_CHARS:
+                    html = html[:start] + html[end + len('</p>'):]
+                else:
+                    html = html[:match.start()] + replacement + html[match.end():]
+        
+        values = {'Game Time': game_data.display_time, 'Lines': game_data.betting_info}
+        missing = [label for label, (pattern, _) in METADATA_LABELS.items() if not pattern.search(html)]
+        if missing:
+            line = '<p>' + ' | '.join(
+                f"<strong>{label}:</strong> {html_lib.escape(values[label])}" for label in missing
+            ) + '</p>'
+            h1_close = H1_CLOSE.search(html)
+            at = h1_close.end() if h1_close else 0
+            html = html[:at] + line + html[at:]
+        return html
+    
+    def fix_citations(self, html: str) -> str:
+        cited = set()
+        for match in ANCHOR_TAG.finditer(html):
+            rel = REL_ATTR.search(match.group(0))
+            if self._allowed(match.group(1)) and rel and 'nofollow' in rel.group(1).lower().split():
+                cited.add(urlparse(match.group(1)).netloc.lower())
+        if len(cited) >= 2:
+            return html
+        
+        extra = [(url, name) for url, name in FALLBACK_SOURCES if urlparse(url).netloc not in cited][:2 - len(cited)]
+        links = ' and '.join(f'<a href="{url}" rel="nofollow">{name}</a>' for url, name in extra)
+        sources = f"<p>Statcast and splits data via {links}.</p>"
+        takeaways = KEY_TAKEAWAYS.search(html)
+        at = takeaways.start() if takeaways else len(html)
+        return html[:at] + sources + html[at:]
+    
+    def fix_key_takeaways(self, html: str, game_data: GameRecord) -> str:
+        match = KEY_TAKEAWAYS.search(html)
+        if match and match.group(2) is not None:
+            sentences = split_sentences(match.group(2))
+            if len(sentences) == 3:
+                return html
+            if len(sentences) > 3:
+                paragraph = '. '.join(s.rstrip('.') for s in sentences[:3]) + '.'
+                return html[:match.start(2)] + paragraph + html[match.end(2):]
+        
+        paragraph = self._write_takeaways(html, game_data)
+        if paragraph is None:
+            return html
+        section = f"<h2>Key Takeaways</h2><p>{paragraph}</p>"
+        if match:
+            return html[:match.start()] + section + html[match.end():]
+        faq = FAQ_HEADING.search(html)
+        at = faq.start() if faq else len(html)
+        return html[:at] + section + html[at:]
+    
+    def _write_takeaways(self, html: str, game_data: GameRecord) -> Optional[str]:
+        if self.writer is None:
+            return None
+        article = TAG.sub(' ', html)
+        article = re.sub(r'\s+', ' ', article)[:3000]
+        text = self.writer(
+            f"Write the Key Takeaways paragraph for this {game_data.matchup} MLB preview.\n"
+            "Exactly 3 sentences, each ending with a period. No list, no HTML, no heading, no abbreviations with periods.\n"
+            "Do not mention the game time or the betting lines.\n\n"
+            f"Article:\n{article}",
+            200
+        )
+        paragraph = re.sub(r'\s+', ' ', TAG.sub('', text or '')).strip().strip('"')
+        if len(split_sentences(paragraph)) != 3:
+            logger.warning("Rewritten Key Takeaways still doesn't have 3 sentences")
+            return None
+        return html_lib.escape(paragraph, quote=False)
+    
+    def fix_faq(self, faq: List[dict], html: str, game_data: GameRecord) -> Tuple[List[dict], str]:
+        if len(faq) > 6:
+            return faq[:6], html
+        if len(faq) >= 4 or self.writer is None:
+            return faq, html
+        
+        needed = 4 - len(faq)
+        asked = '\n'.join(f"- {item.get('question', '')}" for item in faq) or '- (none)'
+        text = self.writer(
+            f"Write {needed} more FAQ entries for a {game_data.matchup} MLB betting preview "
+            f"({game_data.away_pitcher.name} vs {game_data.home_pitcher.name}).\n"
+            f"Questions already covered:\n{asked}\n\n"
+            'Return only JSON: {"faq": [{"question": "...", "answer": "..."}]}',
+            120 * needed + 50
+        )
+        clean = (text or '').strip()
+        clean = re.sub(r'^```(?:json)?|```$', '', clean).strip()
+        try:
+            new_items = json.loads(clean).get('faq', [])
+        except (ValueError, AttributeError):
+            logger.warning("FAQ repair returned invalid JSON")
+            return faq, html
+        new_items = [
+            {'question': str(item['question']), 'answer': str(item['answer'])}
+            for item in new_items if isinstance(item, dict) and item.get('question') and item.get('answer')
+        ][:needed]
+        if len(new_items) < needed:
+            return faq, html
+        
+        # Mirror the new entries into the FAQ section of the article, if it has one
+        heading = FAQ_HEADING.search(html)
+        if heading:
+            next_heading = re.search(r'<h[12]\b', html[heading.end():], re.IGNORECASE)
+            at = heading.end() + next_heading.start() if next_heading else len(html)
+            entries = ''.join(
+                f"<h3>{html_lib.escape(item['question'])}</h3><p>{html_lib.escape(item['answer'])}</p>"
+                for item in new_items
+            )
+            html = html[:at] + entries + html[at:]
+        return faq + new_items, html
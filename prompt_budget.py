@@ -0,0 +1,142 @@
+# prompt_budget.py
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from config import LLM_INPUT_TOKEN_BUDGET, LLM_MODEL
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except ImportError:  # Optional: fall back to a character estimate
+    tiktoken = None
+
+
+class TokenCounter:
+    """Counts tokens with the model's tiktoken encoding, or ~4 chars/token when it isn't available"""
+    
+    def __init__(self, model: str = LLM_MODEL):
+        self.model = model
+        self._encoding = None
+        self._loaded = False
+        self._lock = threading.Lock()
+    
+    def _load(self):
+        with self._lock:
+            if self._loaded:
+                return
+            if tiktoken is not None:
+                try:
+                    self._encoding = tiktoken.encoding_for_model(self.model)
+                except Exception as e:
+                    # Unknown model or the encoding file can't be downloaded
+                    logger.warning(f"tiktoken unavailable for {self.model}, estimating tokens from length: {e}")
+            self._loaded = True
+    
+    @property
+    def method(self) -> str:
+        self._load()
+        return 'tiktoken' if self._encoding is not None else 'estimate'
+    
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        self._load()
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return (len(text) + 3) // 4
+
+
+token_counter = TokenCounter()
+
+
+@dataclass(slots=True)
+class PromptSection:
+    """One block of the prompt, with progressively shorter variants.
+    
+    variants[0] is the full text; the budgeter moves to later variants
+    (lowest priority first) until the prompt fits. A section whose last
+    variant is '' can be dropped entirely.
+    """
+    name: str
+    variants: List[str]
+    priority: int = 50
+    level: int = field(default=0)
+    
+    @property
+    def text(self) -> str:
+        return self.variants[self.level]
+    
+    @property
+    def can_shrink(self) -> bool:
+        return self.level < len(self.variants) - 1
+
+
+class PromptBudgeter:
+    """Fits prompt sections into an input token budget, compacting low-priority sections first"""
+    
+    def __init__(self, max_input_tokens: int = LLM_INPUT_TOKEN_BUDGET, counter: TokenCounter = token_counter):
+        self.max_input_tokens = max_input_tokens
+        self.counter = counter
+    
+    def fit(self, sections: List[PromptSection], reserved: Optional[Dict[str, int]] = None) -> Tuple[str, Dict[str, int], List[str]]:
+        """Return (prompt text, tokens per section, names of compacted sections).
+        
+        reserved holds token counts for text sent alongside the prompt (system
+        prompt, suffix); it counts against the budget and is reported with the sections.
+        """
+        counts = dict(reserved or {})
+        counts.update({section.name: self.counter.count(section.text) for section in sections})
+        compacted = []
+        by_priority = sorted(sections, key=lambda section: section.priority)
+        while sum(counts.values()) > self.max_input_tokens:
+            section = next((s for s in by_priority if s.can_shrink), None)
+            if section is None:
+                logger.warning(f"Prompt is {sum(counts.values())} tokens after compaction, "
+                               f"over the {self.max_input_tokens} token budget")
+                break
+            section.level += 1
+            counts[section.name] = self.counter.count(section.text)
+            if section.name not in compacted:
+                compacted.append(section.name)
+        
+        prompt = ''.join(section.text for section in sections)
+        prompt_token_stats.record(counts, compacted)
+        return prompt, counts, compacted
+
+
+class PromptTokenStats:
+    """Per-run input token totals by prompt section"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        with self._lock:
+            self.prompts = 0
+            self.sections: Dict[str, int] = {}
+            self.compacted: Dict[str, int] = {}
+    
+    def record(self, counts: Dict[str, int], compacted: Optional[List[str]] = None):
+        with self._lock:
+            self.prompts += 1
+            for name, tokens in counts.items():
+                self.sections[name] = self.sections.get(name, 0) + tokens
+            for name in compacted or ():
+                self.compacted[name] = self.compacted.get(name, 0) + 1
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'tokenizer': token_counter.method,
+                'prompts': self.prompts,
+                'total_tokens': sum(self.sections.values()),
+                'sections': dict(self.sections),
+                'compacted': dict(self.compacted),
+            }
+
+
+prompt_token_stats = PromptTokenStats()
@@ -0,0 +1,117 @@
+# rate_limiter.py
+import logging
+import re
+import threading
+import time
+from typing import Mapping, Optional
+
+from config import OPENAI_RPM_LIMIT, OPENAI_TPM_LIMIT
+
+logger = logging.getLogger(__name__)
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|s|m|h)')
+_DURATION_SECONDS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Parse OpenAI reset headers like "6m0s", "1.5s" or "20ms" into seconds"""
+    if not value:
+        return None
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(amount) * _DURATION_SECONDS[unit] for amount, unit in parts)
+
+
+def retry_after_seconds(headers: Optional[Mapping[str, str]], default_seconds: float) -> float:
+    """How long a 429 asks us to wait: Retry-After, else the x-ratelimit-reset-* headers"""
+    headers = headers or {}
+    return (
+        parse_reset_duration(headers.get('retry-after'))
+        or max(
+            parse_reset_duration(headers.get('x-ratelimit-reset-requests')) or 0,
+            parse_reset_duration(headers.get('x-ratelimit-reset-tokens')) or 0
+        )
+        or default_seconds
+    )
+
+
+class TokenBucket:
+    """Per-minute quota that refills continuously"""
+    
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+    
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60.0)
+        self.updated = now
+    
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        amount = min(amount, self.capacity)  # A request bigger than the quota waits for a full bucket
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) * 60.0 / self.capacity
+    
+    def consume(self, amount: float):
+        self.level -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute token buckets shared by every completion call"""
+    
+    def __init__(self, rpm: int = OPENAI_RPM_LIMIT, tpm: int = OPENAI_TPM_LIMIT):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+    
+    def acquire(self, estimated_tokens: int):
+        """Block until one request and estimated_tokens fit in the current quota"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = max(
+                    self.paused_until - now,
+                    self.requests.wait_time(1, now),
+                    self.tokens.wait_time(estimated_tokens, now)
+                )
+                if wait <= 0:
+                    self.requests.consume(1)
+                    self.tokens.consume(estimated_tokens)
+                    return
+            time.sleep(min(wait, 5.0))
+    
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """Adapt the buckets to the server's view of our quota (x-ratelimit-* headers)"""
+        if not headers:
+            return
+        with self._lock:
+            now = time.monotonic()
+            for bucket, kind in ((self.requests, 'requests'), (self.tokens, 'tokens')):
+                limit = headers.get(f'x-ratelimit-limit-{kind}')
+                remaining = headers.get(f'x-ratelimit-remaining-{kind}')
+                try:
+                    if limit:
+                        bucket.capacity = float(limit)
+                    if remaining is not None:
+                        bucket._refill(now)
+                        bucket.level = min(bucket.level, float(remaining))
+                except ValueError:
+                    continue
+    
+    def pause(self, seconds: float):
+        """Hold every caller for the given time (e.g. a 429's Retry-After)"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        logger.warning(f"Rate limited by OpenAI, pausing completions for {seconds:.1f}s")
+
+
+# Shared by every completion in the process so parallel workers see one quota
+rate_limiter = RateLimiter()
+
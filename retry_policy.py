@@ -0,0 +1,127 @@
+# retry_policy.py
+import logging
+import random
+import threading
+from typing import NamedTuple, Optional
+
+from config import (
+    LLM_RETRY_BASE_SECONDS, LLM_RETRY_BUDGET_PER_GAME, LLM_RETRY_BUDGET_PER_RUN,
+    LLM_RETRY_MAX_ATTEMPTS, LLM_RETRY_MAX_SECONDS
+)
+from llm_backend import BackendError, BackendRateLimitError
+from rate_limiter import retry_after_seconds
+from stream_guard import StructureViolation
+
+logger = logging.getLogger(__name__)
+
+# Error classes
+RATE_LIMITED = 'rate_limited'   # 429: wait for Retry-After, pausing every worker
+TRANSIENT = 'transient'         # Timeouts, connection errors, 5xx: jittered exponential backoff
+MALFORMED = 'malformed'         # Output broke the post's structure: retry at once
+FATAL = 'fatal'                 # Auth, bad request, context length, refusals, bugs: never retry
+
+FATAL_STATUS_CODES = {400, 401, 403, 404, 422}
+CONTEXT_LENGTH_MARKERS = ('context_length_exceeded', 'maximum context length')
+
+
+def classify_error(error: Exception) -> str:
+    if isinstance(error, BackendRateLimitError):
+        return RATE_LIMITED
+    if isinstance(error, StructureViolation):
+        return MALFORMED
+    if isinstance(error, BackendError):
+        message = str(error).lower()
+        if any(marker in message for marker in CONTEXT_LENGTH_MARKERS):
+            return FATAL
+        if error.status_code in FATAL_STATUS_CODES:
+            return FATAL
+        return TRANSIENT  # Network errors, timeouts, 408/409/5xx
+    return FATAL
+
+
+class RetryBudget:
+    """Caps how many retries may be spent (per game, or across a whole run)"""
+    
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self._lock = threading.Lock()
+    
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.used >= self.limit:
+                return False
+            self.used += 1
+            return True
+    
+    def reset(self):
+        with self._lock:
+            self.used = 0
+    
+    @property
+    def remaining(self) -> int:
+        return max(0, self.limit - self.used)
+
+
+class RetryDecision(NamedTuple):
+    error_class: str
+    delay: float
+
+
+class RetryPolicy:
+    """Decides whether and when a failed completion is retried.
+    
+    Every retry (including regenerating a post that failed validation) is
+    charged to the game's budget and to the shared run budget, so a bad
+    period for the API can't multiply calls across the whole slate.
+    """
+    
+    def __init__(self, max_attempts: int = LLM_RETRY_MAX_ATTEMPTS, base_delay: float = LLM_RETRY_BASE_SECONDS,
+                 max_delay: float = LLM_RETRY_MAX_SECONDS, run_budget: Optional[RetryBudget] = None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.run_budget = run_budget or RetryBudget(LLM_RETRY_BUDGET_PER_RUN)
+        self._rng = random.Random()
+    
+    def game_budget(self) -> RetryBudget:
+        return RetryBudget(LLM_RETRY_BUDGET_PER_GAME)
+    
+    def spend(self, game_budget: RetryBudget) -> bool:
+        """Charge one retry to the game and the run; False once either is exhausted"""
+        if not game_budget.try_spend():
+            logger.warning("Per-game retry budget exhausted")
+            return False
+        if not self.run_budget.try_spend():
+            logger.warning(f"Run retry budget of {self.run_budget.limit} exhausted")
+            return False
+        return True
+    
+    def backoff(self, attempt: int) -> float:
+        """Full jitter: uniform over [0, min(max_delay, base * 2^attempt)]"""
+        return self._rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+    
+    def decide(self, error: Exception, attempt: int, game_budget: RetryBudget,
+               max_attempts: Optional[int] = None) -> Optional[RetryDecision]:
+        """RetryDecision for a failed attempt (0-based), or None to give up"""
+        error_class = classify_error(error)
+        if error_class == FATAL:
+            return None
+        if attempt + 1 >= (max_attempts or self.max_attempts):
+            return None
+        if not self.spend(game_budget):
+            return None
+        
+        if error_class == RATE_LIMITED:
+            # Honour the server's wait, plus a little jitter so workers don't return in lockstep
+            retry_after = retry_after_seconds(getattr(error, 'headers', None), self.base_delay)
+            delay = min(retry_after, self.max_delay * 4) + self._rng.uniform(0, self.base_delay)
+        elif error_class == MALFORMED:
+            delay = 0.0
+        else:
+            delay = self.backoff(attempt)
+        return RetryDecision(error_class, delay)
+
+
+# Shared by every generation in the process; main resets the run budget per run
+retry_policy = RetryPolicy()
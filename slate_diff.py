@@ -0,0 +1,86 @@
+# slate_diff.py
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, List, NamedTuple, Optional, Set
+
+from mlb_models import GameRecord
+
+logger = logging.getLogger(__name__)
+
+# Output-only / derived fields that don't change what the LLM would be asked to write
+NON_INPUT_FIELDS = ('game_id', 'start_time', 'away_logo', 'home_logo')
+
+
+def fingerprint_game(game: GameRecord) -> str:
+    """Hash everything the prompt is built from: pitchers, lineup splits, umpire, odds/handle, time"""
+    inputs = {key: value for key, value in game.to_dict().items() if key not in NON_INPUT_FIELDS}
+    canonical = json.dumps(inputs, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+class PreviousPost(NamedTuple):
+    game_id: str
+    slug: str
+    fingerprint: Optional[str]
+    directory: str
+
+
+class SlateDiff(NamedTuple):
+    changed: List[dict]       # Blog topics that need a new completion (new or modified inputs)
+    unchanged: List[tuple]    # (blog topic, PreviousPost) pairs whose stored post is still current
+    removed: List[PreviousPost]  # Previously generated games no longer on the slate
+
+
+def load_previous_posts(daily_directory: str) -> Dict[str, PreviousPost]:
+    """Read fingerprints from each post's stored game_data.json for a day"""
+    previous = {}
+    if not os.path.isdir(daily_directory):
+        return previous
+    
+    for slug in os.listdir(daily_directory):
+        game_data_path = os.path.join(daily_directory, slug, "game_data.json")
+        if not os.path.exists(game_data_path):
+            continue
+        try:
+            with open(game_data_path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read {game_data_path}: {e}")
+            continue
+        
+        # A post stored without a fingerprint (failed or invalid) still counts, but never as current
+        game_id = stored.get('game_id')
+        if game_id:
+            previous[game_id] = PreviousPost(game_id, slug, stored.get('input_fingerprint'), os.path.join(daily_directory, slug))
+    
+    return previous
+
+
+def diff_slate(blog_topics: List[dict], previous: Dict[str, PreviousPost],
+               regenerate_only: Optional[Set[str]] = None) -> SlateDiff:
+    """Split today's topics into games to regenerate and games whose post is still current
+    
+    regenerate_only restricts regeneration to those game_ids: any other game
+    that already has a post keeps it even if minor inputs drifted.
+    """
+    changed, unchanged = [], []
+    seen = set()
+    
+    for blog_topic in blog_topics:
+        game = blog_topic['game_data']
+        prior = previous.get(game.game_id)
+        seen.add(game.game_id)
+        
+        # A post only counts as current if its inputs match and its page is still on disk; one stored
+        # without a fingerprint is regenerated even when pinned
+        has_post = prior and os.path.exists(os.path.join(prior.directory, "meta.json"))
+        pinned = regenerate_only is not None and game.game_id not in regenerate_only
+        if has_post and prior.fingerprint and (pinned or prior.fingerprint == fingerprint_game(game)):
+            unchanged.append((blog_topic, prior))
+        else:
+            changed.append(blog_topic)
+    
+    removed = [prior for game_id, prior in previous.items() if game_id not in seen]
+    return SlateDiff(changed, unchanged, removed)
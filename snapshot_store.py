@@ -0,0 +1,114 @@
+# snapshot_store.py
+import hashlib
+import json
+import os
+import time
+import uuid
+from typing import Optional
+
+from config import SNAPSHOT_DIR, SNAPSHOT_TTL_SECONDS
+
+
+class SnapshotStore:
+    """Content-addressed on-disk store for raw upstream responses.
+    
+    Response bodies live once under objects/<sha256>.json; refs/<date>/<source>.json
+    points a (source, date) pair at a body and keeps the HTTP validators
+    (ETag / Last-Modified) needed to revalidate it cheaply.
+    """
+    
+    def __init__(self, base_directory: str = SNAPSHOT_DIR, ttl_seconds: int = SNAPSHOT_TTL_SECONDS):
+        self.base_directory = base_directory
+        self.ttl_seconds = ttl_seconds
+        self.objects_directory = os.path.join(base_directory, "objects")
+        self.refs_directory = os.path.join(base_directory, "refs")
+    
+    def _ref_path(self, source: str, date_str: str) -> str:
+        return os.path.join(self.refs_directory, date_str, f"{source}.json")
+    
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_directory, f"{digest}.json")
+    
+    def _write_atomic(self, path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Unique per writer: pipeline workers and hedged fetches save from several threads at once
+        tmp_path = f"{path}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    
+    def get_ref(self, source: str, date_str: str) -> Optional[dict]:
+        """Return the stored ref for a source/date, or None if never fetched"""
+        path = self._ref_path(source, date_str)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def is_fresh(self, ref: Optional[dict]) -> bool:
+        """True when the ref was fetched or revalidated within the TTL"""
+        if not ref:
+            return False
+        return time.time() - ref.get('validated_at', 0) < self.ttl_seconds
+    
+    def conditional_headers(self, ref: Optional[dict]) -> dict:
+        """Build If-None-Match / If-Modified-Since headers for revalidation"""
+        headers = {}
+        if ref:
+            if ref.get('etag'):
+                headers['If-None-Match'] = ref['etag']
+            if ref.get('last_modified'):
+                headers['If-Modified-Since'] = ref['last_modified']
+        return headers
+    
+    def load(self, source: str, date_str: str):
+        """Load the parsed payload for a source/date, or None if not stored"""
+        ref = self.get_ref(source, date_str)
+        if not ref:
+            return None
+        object_path = self._object_path(ref['sha256'])
+        if not os.path.exists(object_path):
+            return None
+        with open(object_path, 'rb') as f:
+            return json.loads(f.read())
+    
+    def save(self, source: str, date_str: str, body: bytes, url: str = '',
+             etag: Optional[str] = None, last_modified: Optional[str] = None) -> dict:
+        """Store a raw response body and point the source/date ref at it"""
+        digest = hashlib.sha256(body).hexdigest()
+        object_path = self._object_path(digest)
+        if not os.path.exists(object_path):
+            self._write_atomic(object_path, body)
+        
+        now = time.time()
+        ref = {
+            'source': source,
+            'date': date_str,
+            'url': url,
+            'sha256': digest,
+            'size': len(body),
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': now,
+            'validated_at': now
+        }
+        self._write_atomic(self._ref_path(source, date_str), json.dumps(ref, indent=2).encode('utf-8'))
+        return ref
+    
+    def touch(self, source: str, date_str: str) -> Optional[dict]:
+        """Mark a ref as revalidated (upstream answered 304 Not Modified)"""
+        ref = self.get_ref(source, date_str)
+        if not ref:
+            return None
+        ref['validated_at'] = time.time()
+        self._write_atomic(self._ref_path(source, date_str), json.dumps(ref, indent=2).encode('utf-8'))
+        return ref
+    
+    def available_dates(self) -> list:
+        """List snapshot dates that can be replayed, newest first"""
+        if not os.path.exists(self.refs_directory):
+            return []
+        return sorted(os.listdir(self.refs_directory), reverse=True)
@@ -0,0 +1,182 @@
+# stream_guard.py
+import re
+from typing import List, Optional
+
+from html_document import split_sentences
+
+HEADING_TAG = re.compile(r'<h([1-6])\b[^>]*>(.*?)</h\1\s*>', re.IGNORECASE | re.DOTALL)
+GAME_TIME_LABEL = re.compile(r'Game Time:', re.IGNORECASE)
+LINES_LABEL = re.compile(r'Lines:', re.IGNORECASE)
+KEY_TAKEAWAYS = re.compile(r'<h2>\s*Key Takeaways\s*</h2>\s*<p>(.*?)</p>', re.IGNORECASE | re.DOTALL)
+LABEL_TAIL = 16  # Re-scan this many trailing chars so a label split across deltas is still found
+
+
+class StructureViolation(Exception):
+    """A streamed post broke a rule validate_blog_post would reject it for"""
+
+
+class JsonFieldStream:
+    """Incrementally decodes one top-level string field ("html") out of a streamed JSON object.
+    
+    feed() takes raw completion deltas and returns whatever part of the field's
+    decoded value became available, so the value can be checked long before
+    the closing brace arrives.
+    """
+    
+    _ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+    
+    def __init__(self, field: str = 'html'):
+        self.field = field
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.expect_key = False
+        self.key_chars: Optional[List[str]] = None
+        self.last_key = None
+        self.awaiting_value = False   # Saw "<field>" and maybe ':' — next string is the value
+        self.capturing = False
+        self.done = False
+        self.unicode_digits: Optional[str] = None
+        self.high_surrogate: Optional[int] = None
+    
+    def feed(self, text: str) -> str:
+        out = []
+        for ch in text:
+            if self.capturing:
+                self._capture(ch, out)
+                continue
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == '\\':
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    if self.key_chars is not None:
+                        self.last_key = ''.join(self.key_chars)
+                        self.key_chars = None
+                        self.awaiting_value = self.last_key == self.field and not self.done
+                elif self.key_chars is not None:
+                    self.key_chars.append(ch)
+                continue
+            if ch == '"':
+                if self.awaiting_value and self.depth == 1 and not self.expect_key:
+                    self.awaiting_value = False
+                    self.capturing = True
+                    continue
+                self.in_string = True
+                if self.depth == 1 and self.expect_key:
+                    self.key_chars = []
+                    self.expect_key = False
+            elif ch in '{[':
+                self.depth += 1
+                self.expect_key = ch == '{' and self.depth == 1
+                self.awaiting_value = False
+            elif ch in '}]':
+                self.depth -= 1
+            elif ch == ',' and self.depth == 1:
+                self.expect_key = True
+                self.awaiting_value = False
+        return ''.join(out)
+    
+    def _capture(self, ch: str, out: List[str]):
+        if self.unicode_digits is not None:
+            self.unicode_digits += ch
+            if len(self.unicode_digits) == 4:
+                self._emit_codepoint(int(self.unicode_digits, 16), out)
+                self.unicode_digits = None
+        elif self.escape:
+            self.escape = False
+            if ch == 'u':
+                self.unicode_digits = ''
+            else:
+                out.append(self._ESCAPES.get(ch, ch))
+        elif ch == '\\':
+            self.escape = True
+        elif ch == '"':
+            self.capturing = False
+            self.done = True
+        else:
+            out.append(ch)
+    
+    def _emit_codepoint(self, codepoint: int, out: List[str]):
+        if 0xD800 <= codepoint <= 0xDBFF:
+            self.high_surrogate = codepoint
+            return
+        if 0xDC00 <= codepoint <= 0xDFFF and self.high_surrogate is not None:
+            codepoint = 0x10000 + ((self.high_surrogate - 0xD800) << 10) + (codepoint - 0xDC00)
+        self.high_surrogate = None
+        out.append(chr(codepoint))
+
+
+class StreamingStructureGuard:
+    """Checks the post's HTML as it streams and raises StructureViolation on the first hard failure.
+    
+    Hard rules (the ones a retry would be needed for anyway):
+      - only <h1>-<h3>, exactly one <h1> and it comes first, no <h3> before an <h2>
+      - "Game Time:" and "Lines:" at most once each
+      - the Key Takeaways paragraph has exactly 3 sentences
+    """
+    
+    def __init__(self):
+        self.html = ''
+        self.extractor = JsonFieldStream('html')
+        self._heading_pos = 0
+        self._label_pos = {GAME_TIME_LABEL: 0, LINES_LABEL: 0}
+        self._label_counts = {GAME_TIME_LABEL: 0, LINES_LABEL: 0}
+        self.h1_count = 0
+        self.seen_h2 = False
+        self._takeaways_pos = None
+        self.takeaways_checked = False
+    
+    def feed(self, delta: str):
+        """Feed a raw completion delta (JSON text)"""
+        html = self.extractor.feed(delta)
+        if html:
+            self.feed_html(html)
+    
+    def feed_html(self, html: str):
+        self.html += html
+        self._check_headings()
+        self._check_labels()
+        self._check_takeaways()
+    
+    def _check_headings(self):
+        for match in HEADING_TAG.finditer(self.html, self._heading_pos):
+            self._heading_pos = match.end()
+            level = int(match.group(1))
+            if level > 3:
+                raise StructureViolation(f"<h{level}> used; only <h1>-<h3> are allowed")
+            if level == 1:
+                self.h1_count += 1
+                if self.h1_count > 1:
+                    raise StructureViolation("more than one <h1>")
+            elif self.h1_count == 0:
+                raise StructureViolation(f"<h{level}> before the <h1> title")
+            elif level == 2:
+                self.seen_h2 = True
+                if self._takeaways_pos is None and match.group(2).strip().lower() == 'key takeaways':
+                    self._takeaways_pos = match.start()
+            elif not self.seen_h2:
+                raise StructureViolation("<h3> before any <h2> section")
+    
+    def _check_labels(self):
+        for pattern, label in ((GAME_TIME_LABEL, 'Game Time'), (LINES_LABEL, 'Lines')):
+            pos = self._label_pos[pattern]
+            for match in pattern.finditer(self.html, pos):
+                self._label_counts[pattern] += 1
+                pos = match.end()
+            self._label_pos[pattern] = max(pos, len(self.html) - LABEL_TAIL)
+            if self._label_counts[pattern] > 1:
+                raise StructureViolation(f'"{label}" repeated; it must appear once in the metadata line')
+    
+    def _check_takeaways(self):
+        if self.takeaways_checked or self._takeaways_pos is None:
+            return
+        match = KEY_TAKEAWAYS.match(self.html, self._takeaways_pos)
+        if not match:
+            return
+        self.takeaways_checked = True
+        sentences = split_sentences(match.group(1))
+        if len(sentences) != 3:
+            raise StructureViolation(f"Key Takeaways has {len(sentences)} sentences, need exactly 3")
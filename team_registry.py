@@ -0,0 +1,151 @@
+# team_registry.py
+import re
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+ESPN_LOGO_URL = "https://a.espncdn.com/i/teamlogos/mlb/500/{code}.png"
+DEFAULT_LOGO_URL = ESPN_LOGO_URL.format(code="mlb")
+
+
+class Team(NamedTuple):
+    code: str           # Canonical code used across the pipeline
+    nickname: str       # "Red Sox" - what DraftKings and topics display
+    full_name: str      # "Boston Red Sox"
+    espn_code: str      # ESPN logo CDN code
+    aliases: Tuple[str, ...] = ()  # Alternate codes / names seen upstream
+
+
+MLB_TEAMS = (
+    Team('ARI', 'Diamondbacks', 'Arizona Diamondbacks', 'ari', ('AZ', 'D-backs', 'Arizona')),
+    Team('ATH', 'Athletics', 'Oakland Athletics', 'oak', ('OAK', 'A\'s', 'Sacramento Athletics', 'Las Vegas Athletics')),
+    Team('ATL', 'Braves', 'Atlanta Braves', 'atl', ('Atlanta',)),
+    Team('BAL', 'Orioles', 'Baltimore Orioles', 'bal', ('Baltimore',)),
+    Team('BOS', 'Red Sox', 'Boston Red Sox', 'bos', ('Boston',)),
+    Team('CHC', 'Cubs', 'Chicago Cubs', 'chc', ()),
+    Team('CWS', 'White Sox', 'Chicago White Sox', 'chw', ('CHW',)),
+    Team('CIN', 'Reds', 'Cincinnati Reds', 'cin', ('Cincinnati',)),
+    Team('CLE', 'Guardians', 'Cleveland Guardians', 'cle', ('Cleveland',)),
+    Team('COL', 'Rockies', 'Colorado Rockies', 'col', ('Colorado',)),
+    Team('DET', 'Tigers', 'Detroit Tigers', 'det', ('Detroit',)),
+    Team('HOU', 'Astros', 'Houston Astros', 'hou', ('Houston',)),
+    Team('KC', 'Royals', 'Kansas City Royals', 'kc', ('KCR', 'Kansas City')),
+    Team('LAA', 'Angels', 'Los Angeles Angels', 'laa', ('ANA',)),
+    Team('LAD', 'Dodgers', 'Los Angeles Dodgers', 'lad', ()),
+    Team('MIA', 'Marlins', 'Miami Marlins', 'mia', ('Miami',)),
+    Team('MIL', 'Brewers', 'Milwaukee Brewers', 'mil', ('Milwaukee',)),
+    Team('MIN', 'Twins', 'Minnesota Twins', 'min', ('Minnesota',)),
+    Team('NYM', 'Mets', 'New York Mets', 'nym', ()),
+    Team('NYY', 'Yankees', 'New York Yankees', 'nyy', ()),
+    Team('PHI', 'Phillies', 'Philadelphia Phillies', 'phi', ('Philadelphia',)),
+    Team('PIT', 'Pirates', 'Pittsburgh Pirates', 'pit', ('Pittsburgh',)),
+    Team('SD', 'Padres', 'San Diego Padres', 'sd', ('SDP', 'San Diego')),
+    Team('SEA', 'Mariners', 'Seattle Mariners', 'sea', ('Seattle',)),
+    Team('SF', 'Giants', 'San Francisco Giants', 'sf', ('SFG', 'San Francisco')),
+    Team('STL', 'Cardinals', 'St. Louis Cardinals', 'stl', ('St Louis',)),
+    Team('TB', 'Rays', 'Tampa Bay Rays', 'tb', ('TBR', 'Tampa Bay')),
+    Team('TEX', 'Rangers', 'Texas Rangers', 'tex', ('Texas',)),
+    Team('TOR', 'Blue Jays', 'Toronto Blue Jays', 'tor', ('Toronto',)),
+    Team('WSH', 'Nationals', 'Washington Nationals', 'wsh', ('WSN', 'WAS', 'Washington')),
+)
+
+
+_RESOLVED_CACHE_SIZE = 512
+
+
+def _normalize(name: str) -> str:
+    """Upper-case, drop punctuation and collapse whitespace"""
+    return re.sub(r'\s+', ' ', re.sub(r'[^\w\s\'-]', '', name)).strip().upper()
+
+
+class TeamRegistry:
+    """Precomputed team lookup shared by the fetcher, umpire/odds joins and logos.
+    
+    Every upstream spelling (API code, DraftKings "TB Rays", nickname, full name)
+    resolves to one canonical code through a single hash lookup, so games,
+    umpires and odds can be joined with dict indexes instead of substring scans.
+    """
+    
+    def __init__(self, teams: Iterable[Team] = MLB_TEAMS):
+        self.teams: Dict[str, Team] = {}
+        self._alias_index: Dict[str, str] = {}
+        for team in teams:
+            self.teams[team.code] = team
+            for name in (team.code, team.nickname, team.full_name, *team.aliases):
+                self._alias_index[_normalize(name)] = team.code
+        # Upstream spellings seen so far -> code (or None); a slate only has a few dozen
+        self._resolved: Dict[str, Optional[str]] = {}
+    
+    def resolve(self, name: Optional[str]) -> Optional[str]:
+        """Resolve any upstream team spelling to its canonical code"""
+        if not name:
+            return None
+        normalized = _normalize(name)
+        try:
+            return self._resolved[normalized]
+        except KeyError:
+            pass
+        code = self._resolve_normalized(normalized)
+        if len(self._resolved) >= _RESOLVED_CACHE_SIZE:
+            self._resolved.clear()
+        self._resolved[normalized] = code
+        return code
+    
+    def _resolve_normalized(self, normalized: str) -> Optional[str]:
+        code = self._alias_index.get(normalized)
+        if code:
+            return code
+        
+        # DraftKings style "CHI White Sox" / "TB Rays": try the trailing words
+        # (nickname) first since city prefixes like CHI, LA and NY are ambiguous
+        tokens = normalized.split(' ')
+        for start in range(1, len(tokens)):
+            code = self._alias_index.get(' '.join(tokens[start:]))
+            if code:
+                return code
+        return None
+    
+    def get(self, name: Optional[str]) -> Optional[Team]:
+        """Return the Team record for any spelling, or None"""
+        code = self.resolve(name)
+        return self.teams.get(code) if code else None
+    
+    def matchup_key(self, away: str, home: str) -> Tuple[str, str]:
+        """Canonical (away, home) join key; unknown teams fall back to their raw text"""
+        return (
+            self.resolve(away) or _normalize(away or ''),
+            self.resolve(home) or _normalize(home or '')
+        )
+    
+    def parse_matchup(self, matchup: str) -> Optional[Tuple[str, str]]:
+        """Join key for an "AWAY @ HOME" matchup string"""
+        if not matchup or ' @ ' not in matchup:
+            return None
+        away, home = matchup.split(' @ ', 1)
+        return self.matchup_key(away, home)
+    
+    def index_umpires(self, umpires: Iterable[dict]) -> Dict[Tuple[str, str], dict]:
+        """Index umpire assignments by canonical matchup key (first entry wins)"""
+        index = {}
+        for ump in umpires or []:
+            key = self.parse_matchup(ump.get('matchup', ''))
+            if key:
+                index.setdefault(key, ump)
+        return index
+    
+    def index_betting_games(self, betting_games: Iterable[dict]) -> Dict[Tuple[str, str], dict]:
+        """Index DraftKings games by canonical matchup key (first entry wins)"""
+        index = {}
+        for game in betting_games or []:
+            key = self.matchup_key(game.get('away_team', ''), game.get('home_team', ''))
+            index.setdefault(key, game)
+        return index
+    
+    def logo_url(self, name: Optional[str]) -> str:
+        """ESPN logo URL for any team spelling, MLB logo when unknown"""
+        team = self.get(name)
+        if team:
+            return ESPN_LOGO_URL.format(code=team.espn_code)
+        return DEFAULT_LOGO_URL
+
+
+# Shared module-level registry, built once at import
+team_registry = TeamRegistry()
@@ -0,0 +1,73 @@
+# tests/test_batch_generation.py
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import llm_backend
+from batch_generation import BatchGenerator
+from generate_blog_post import review_post
+from llm_backend import FakeBackend, fake_blog_post
+from llm_cache import llm_cache
+from llm_telemetry import REPAIRED, VALID
+from mlb_models import GameRecord
+
+
+class FakeBatchClient:
+    """Just enough of the OpenAI client for one batch that completes at once"""
+    
+    def __init__(self, contents):
+        self.contents = contents  # custom_id -> completion content
+        self.output = ''
+        self.files = SimpleNamespace(create=self._create_file, content=lambda file_id: SimpleNamespace(text=self.output))
+        self.batches = SimpleNamespace(
+            create=lambda **kwargs: SimpleNamespace(id='batch-1'),
+            retrieve=lambda batch_id: SimpleNamespace(id=batch_id, status='completed', output_file_id='file-out'),
+            cancel=lambda batch_id: None,
+        )
+    
+    def _create_file(self, file, purpose):
+        lines = []
+        for line in file.read().decode('utf-8').splitlines():
+            custom_id = json.loads(line)['custom_id']
+            lines.append(json.dumps({'custom_id': custom_id, 'response': {'status_code': 200, 'body': {
+                'id': f'resp-{custom_id}', 'choices': [{'message': {'content': self.contents[custom_id]}}]}}}))
+        self.output = '\n'.join(lines)
+        return SimpleNamespace(id='file-in')
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    monkeypatch.setattr(llm_cache, 'enabled', False)
+    fake = FakeBackend(latency_seconds=0, error_rate=0, rate_limit_rate=0, seed=1)
+    llm_backend.set_backend(fake)
+    yield fake
+    llm_backend.set_backend(None)
+
+
+def job(key: str):
+    game = GameRecord(f'{key} @ Home', key, 'Home', game_id=key)
+    return key, f'{key} at Home MLB Betting Preview', ['mlb'], game
+
+
+def test_invalid_batch_result_is_repaired_instead_of_regenerated(backend, tmp_path):
+    valid = fake_blog_post('<h1>Valid</h1>')
+    unfollowed = json.loads(fake_blog_post('<h1>Missing nofollow</h1>'))
+    unfollowed['html'] = unfollowed['html'].replace(' rel="nofollow"', '')
+    client = FakeBatchClient({'good': valid, 'bad': json.dumps(unfollowed)})
+    
+    drafts = BatchGenerator(client, str(tmp_path), poll_seconds=0).generate_all([job('good'), job('bad')])
+    assert set(drafts) == {'good', 'bad'}
+    assert not any(draft.done for draft in drafts.values())
+    
+    reviewed = {key: review_post(draft) for key, draft in drafts.items()}
+    assert reviewed['good'].trace.validation == VALID
+    assert reviewed['bad'].trace.validation == REPAIRED
+    assert 'rel="nofollow"' in reviewed['bad'].result['html']
+    assert backend.calls == 0  # Nothing was paid for twice
+
+
+def test_unparseable_batch_result_is_left_to_the_interactive_path(backend, tmp_path):
+    client = FakeBatchClient({'good': fake_blog_post('<h1>Valid</h1>'), 'prose': 'Sorry, here is a preview...'})
+    drafts = BatchGenerator(client, str(tmp_path), poll_seconds=0).generate_all([job('good'), job('prose')])
+    assert set(drafts) == {'good'}
@@ -0,0 +1,93 @@
+# tests/test_blog_schema.py
+import json
+
+import pytest
+
+from generate_blog_post import BLOG_POST_RESPONSE_FORMAT, REQUIRED_FIELDS, parse_completion_content, validate_blog_post
+from llm_backend import fake_blog_post
+from main import app, citation_link
+
+SCHEMA = BLOG_POST_RESPONSE_FORMAT["json_schema"]["schema"]
+TYPES = {"object": dict, "array": list, "string": str}
+
+
+def conforms(value, schema) -> bool:
+    """The subset of JSON Schema the strict response format uses"""
+    if not isinstance(value, TYPES[schema["type"]]):
+        return False
+    if schema["type"] == "array":
+        return all(conforms(item, schema["items"]) for item in value)
+    if schema["type"] == "object":
+        if set(schema["required"]) - value.keys():
+            return False
+        if not schema.get("additionalProperties", True) and value.keys() - schema["properties"].keys():
+            return False
+        return all(conforms(value[name], schema["properties"][name]) for name in value)
+    return True
+
+
+def strict_objects(schema):
+    if schema["type"] == "object":
+        yield schema
+        for child in schema["properties"].values():
+            yield from strict_objects(child)
+    elif schema["type"] == "array":
+        yield from strict_objects(schema["items"])
+
+
+def test_strict_schema_requires_every_property():
+    # Strict structured output rejects optional properties and open objects
+    for schema in strict_objects(SCHEMA):
+        assert set(schema["required"]) == set(schema["properties"])
+        assert schema["additionalProperties"] is False
+
+
+def test_citations_are_source_url_objects():
+    assert SCHEMA["properties"]["citations"]["items"] == {
+        "type": "object",
+        "properties": {"source": {"type": "string"}, "url": {"type": "string"}},
+        "required": ["source", "url"],
+        "additionalProperties": False,
+    }
+    assert SCHEMA["required"] == REQUIRED_FIELDS
+
+
+def test_fake_post_matches_schema_and_passes_validation():
+    content = fake_blog_post("<h1>Yankees at Red Sox MLB Betting Preview</h1>")
+    post = json.loads(content)
+    assert conforms(post, SCHEMA)
+    assert validate_blog_post(post["html"], post)["valid"]
+    result, complete = parse_completion_content(content, "Yankees at Red Sox")
+    assert complete and result["citations"] == post["citations"]
+
+
+def test_plain_string_citation_is_rejected_by_schema():
+    post = json.loads(fake_blog_post(""))
+    post["citations"] = ["https://fangraphs.com"]
+    assert not conforms(post, SCHEMA)
+
+
+@pytest.mark.parametrize("citation, expected", [
+    ({"source": "FanGraphs", "url": "https://fangraphs.com"}, ("https://fangraphs.com", "FanGraphs")),
+    ("https://baseballsavant.mlb.com/leaderboard", ("https://baseballsavant.mlb.com/leaderboard", "baseballsavant.mlb.com")),
+    ("Baseball Reference", ("Baseball Reference", "Baseball Reference")),
+])
+def test_citation_link(citation, expected):
+    assert citation_link(citation) == expected
+
+
+@pytest.mark.parametrize("citations, label", [
+    ([{"source": "FanGraphs", "url": "https://fangraphs.com"}], "FanGraphs"),
+    (["https://fangraphs.com"], "fangraphs.com"),  # Posts stored before citations became objects
+])
+def test_show_blog_renders_citations(tmp_path, monkeypatch, citations, label):
+    folder = tmp_path / "mlb_blog_posts" / "2026-10-17" / "yankees-vs-red-sox"
+    folder.mkdir(parents=True)
+    (folder / "optimized_post.html").write_text("<h1>Yankees at Red Sox</h1>", encoding="utf-8")
+    (folder / "blog_result.json").write_text(json.dumps({"citations": citations}), encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    
+    response = app.test_client().get("/mlb-blogs/2026-10-17/yankees-vs-red-sox")
+    assert response.status_code == 200
+    page = response.get_data(as_text=True)
+    assert '<a href="https://fangraphs.com" target="_blank" rel="nofollow">' + label + '</a>' in page
@@ -0,0 +1,117 @@
+# tests/test_link_engine.py
+import json
+import os
+import re
+
+import pytest
+
+from link_engine import DEFAULT_INTERLINK_MAP, LinkEngine, PhraseAutomaton
+
+
+def scan_phrases(phrases, text):
+    automaton = PhraseAutomaton(phrases)
+    return [(text[start:end], phrases[index]) for start, end, index in automaton.scan(text)]
+
+
+@pytest.mark.parametrize("phrase, text", [
+    ("pitch mix", "His pitch mix is deep."),
+    ("pitch mix", "His pitch mixes are deep."),
+    ("pitch mix", "A repitch mix."),
+    ("pitch mix", "Pitch Mix matters"),
+    ("pitch mix", "pitch mix"),
+    ("K-rate", "a 31% K-rate tonight"),
+    ("K-rate", "a SK-rate tonight"),
+    ("K-rate", "K-rated"),
+    ("xBA vs arsenal", "(xBA vs arsenal)"),
+    ("xBA vs arsenal", "xBA vs arsenal_2"),
+    ("swing and miss %", "a swing and miss %."),
+    ("swing and miss %", "a swing and miss %a"),
+    ("strikeout rate", "strikeout rate"),
+    ("strikeout rate", "strikeout rates"),
+])
+def test_word_boundaries_match_regex(phrase, text):
+    # The automaton keeps the \b semantics of the per-phrase regexes it replaced
+    expected = [m.group(0) for m in re.finditer(rf'\b{re.escape(phrase)}\b', text, flags=re.IGNORECASE)]
+    assert [matched for matched, _ in scan_phrases([phrase], text)] == expected
+
+
+def test_overlapping_and_nested_phrases_are_all_reported():
+    found = scan_phrases(["strikeout", "strikeout rate", "rate"], "The strikeout rate is up")
+    assert sorted(found) == [("rate", "rate"), ("strikeout", "strikeout"), ("strikeout rate", "strikeout rate")]
+
+
+def test_scan_respects_the_span_but_checks_boundaries_against_the_whole_text():
+    automaton = PhraseAutomaton(["pitch mix"])
+    text = "xpitch mix and pitch mix"
+    assert [start for start, _, _ in automaton.scan(text, 1)] == [15]
+    assert list(automaton.scan(text, 0, 10)) == []
+
+
+def test_non_ascii_text_keeps_offsets_aligned():
+    # 'İ' lowercases to two characters; offsets must still index the original text
+    text = "İ pitch mix"
+    assert [text[start:end] for start, end, _ in PhraseAutomaton(["pitch mix"]).scan(text)] == ["pitch mix"]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return LinkEngine(str(tmp_path / "interlinks.json"), {
+        "strikeout": "https://example.com/k",
+        "strikeout rate": "https://example.com/k-rate",
+        "pitch mix": "https://www.thebettinginsider.com/daily-mlb-game-stats",
+    })
+
+
+def test_longest_phrase_wins_and_each_phrase_links_once(engine):
+    html = "<p>The strikeout rate climbs. Another strikeout here, and another strikeout.</p>"
+    links = engine.find_links(html, max_links=5)
+    assert [(html[start:end], url) for start, end, url in links] == [
+        ("strikeout rate", "https://example.com/k-rate"),
+        ("strikeout", "https://example.com/k"),
+    ]
+    assert links[1][0] == html.index("Another strikeout") + len("Another ")
+
+
+def test_max_links(engine):
+    html = "<p>pitch mix, strikeout rate and a strikeout</p>"
+    assert len(engine.find_links(html, max_links=2)) == 2
+    assert engine.find_links(html, max_links=0) == []
+
+
+def test_existing_links_headings_and_scripts_are_left_alone(engine):
+    html = ('<h2>Pitch mix</h2><p><a href="/x">pitch mix</a></p>'
+            '<script>var s = "pitch mix";</script><p>Final pitch mix note.</p>')
+    linked = engine.insert_links(html)
+    assert linked == html.replace(
+        "Final pitch mix", 'Final <a href="https://www.thebettinginsider.com/daily-mlb-game-stats" rel="nofollow">pitch mix</a>')
+
+
+def test_insert_links_keeps_source_casing_and_only_nofollows_promotional_links(engine):
+    linked = engine.insert_links("<p>Strikeout Rate and Pitch Mix</p>")
+    assert '<a href="https://example.com/k-rate">Strikeout Rate</a>' in linked
+    assert 'rel="nofollow">Pitch Mix</a>' in linked
+
+
+def test_map_file_hot_reload(engine, tmp_path):
+    path = tmp_path / "interlinks.json"
+    assert engine.status()['source'] == 'default'
+    
+    path.write_text(json.dumps({"whiff rate": "https://example.com/whiff"}), encoding="utf-8")
+    assert engine.status() == {**engine.status(), 'phrases': 1, 'source': str(path)}
+    assert engine.insert_links("<p>whiff rate</p>") == '<p><a href="https://example.com/whiff">whiff rate</a></p>'
+    
+    # A bad edit keeps the last good map
+    path.write_text("{not json", encoding="utf-8")
+    os.utime(path, (1, 1))
+    assert engine.status()['source'] == str(path)
+    assert engine.find_links("<p>whiff rate</p>", 5)
+    
+    path.unlink()
+    assert engine.status()['source'] == 'default'
+    assert engine.find_links("<p>whiff rate</p>", 5) == []
+
+
+def test_default_map_compiles():
+    engine = LinkEngine(None)
+    assert engine.status()['phrases'] == len(DEFAULT_INTERLINK_MAP)
+    assert engine.find_links("<p>Check the betting splits.</p>", 5)
@@ -0,0 +1,98 @@
+# tests/test_pipeline.py
+import threading
+import time
+
+from pipeline import Stage, StagePipeline
+
+
+def test_items_flow_through_every_stage_in_order():
+    pipeline = StagePipeline([
+        Stage('double', lambda n: n * 2),
+        Stage('label', lambda n: f"#{n}"),
+    ], queue_size=2)
+    assert pipeline.run(range(10)) == [f"#{n * 2}" for n in range(10)]
+    assert not pipeline.running
+
+
+def test_none_drops_an_item_and_fan_out_splits_one():
+    pipeline = StagePipeline([
+        Stage('odd', lambda n: n if n % 2 else None),
+        Stage('split', lambda n: [n, -n], fan_out=True),
+    ])
+    assert pipeline.run(range(6)) == [1, -1, 3, -3, 5, -5]
+    stages = pipeline.stats()['stages']
+    assert (stages['odd']['processed'], stages['odd']['emitted']) == (6, 3)
+    assert (stages['split']['processed'], stages['split']['emitted']) == (3, 6)
+
+
+def test_a_failing_item_is_dropped_without_stopping_the_run():
+    def check(n):
+        if n == 3:
+            raise ValueError("bad game")
+        return n
+    
+    pipeline = StagePipeline([Stage('check', check, workers=2), Stage('keep', lambda n: n)])
+    assert sorted(pipeline.run(range(6))) == [0, 1, 2, 4, 5]
+    assert pipeline.stats()['stages']['check']['errors'] == 1
+
+
+def test_results_stream_before_the_input_is_exhausted():
+    # The first item must reach the end while later ones are still being submitted
+    first_done = threading.Event()
+    
+    def finish(n):
+        first_done.set()
+        return n
+    
+    pipeline = StagePipeline([Stage('work', lambda n: n, workers=2), Stage('finish', finish)])
+    pipeline.start()
+    pipeline.submit(0)
+    assert first_done.wait(5)
+    assert pipeline.running and pipeline.results == [0]
+    pipeline.submit(1)
+    pipeline.close()
+    assert pipeline.join() == [0, 1]
+
+
+def test_bounded_queues_apply_backpressure():
+    release = threading.Event()
+    
+    def slow(n):
+        release.wait(5)
+        return n
+    
+    pipeline = StagePipeline([Stage('fast', lambda n: n), Stage('slow', slow)], queue_size=1)
+    pipeline.start()
+    feeder = threading.Thread(target=lambda: [pipeline.submit(n) for n in range(6)])
+    feeder.start()
+    time.sleep(0.2)
+    # slow holds one item, its queue one, fast is blocked handing over one more and its queue
+    # holds another; the feeder can't get the rest in
+    assert feeder.is_alive()
+    stages = pipeline.stats()['stages']
+    assert stages['slow']['in_progress'] == 1
+    assert stages['fast']['queue_depth'] <= 1 and stages['slow']['queue_depth'] <= 1
+    
+    release.set()
+    feeder.join(5)
+    pipeline.close()
+    assert pipeline.join() == list(range(6))
+    stages = pipeline.stats()['stages']
+    assert stages['fast']['blocked_seconds'] > 0
+    assert stages['slow']['max_queue_depth'] == 1
+
+
+def test_stage_workers_run_in_parallel():
+    barrier = threading.Barrier(3, timeout=5)
+    
+    def meet(n):
+        barrier.wait()  # Only passes once three items are in flight at the same time
+        return n
+    
+    pipeline = StagePipeline([Stage('meet', meet, workers=3)])
+    assert sorted(pipeline.run(range(3))) == [0, 1, 2]
+    assert pipeline.stats()['stages']['meet']['errors'] == 0
+
+
+def test_stats_before_start():
+    assert StagePipeline([Stage('noop', lambda n: n)]).stats() == {'running': False, 'elapsed_seconds': 0.0, 'stages': {}}
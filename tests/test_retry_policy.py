@@ -0,0 +1,84 @@
+# tests/test_retry_policy.py
+import pytest
+
+from llm_backend import BackendError, BackendRateLimitError
+from retry_policy import FATAL, MALFORMED, RATE_LIMITED, TRANSIENT, RetryBudget, RetryPolicy, classify_error
+from stream_guard import StructureViolation
+
+
+@pytest.mark.parametrize("error, expected", [
+    (BackendRateLimitError("slow down", 429, {"retry-after": "2"}), RATE_LIMITED),
+    (StructureViolation("Key Takeaways has 2 sentences"), MALFORMED),
+    (BackendError("connection reset"), TRANSIENT),
+    (BackendError("bad gateway", 502), TRANSIENT),
+    (BackendError("request timeout", 408), TRANSIENT),
+    (BackendError("invalid api key", 401), FATAL),
+    (BackendError("bad request", 400), FATAL),
+    (BackendError("This model's maximum context length is 128000 tokens", 500), FATAL),
+    (ValueError("bug in our code"), FATAL),
+])
+def test_classify_error(error, expected):
+    assert classify_error(error) == expected
+
+
+def policy(**kwargs) -> RetryPolicy:
+    kwargs.setdefault("max_attempts", 3)
+    kwargs.setdefault("base_delay", 1.0)
+    kwargs.setdefault("max_delay", 30.0)
+    kwargs.setdefault("run_budget", RetryBudget(100))
+    return RetryPolicy(**kwargs)
+
+
+def test_fatal_errors_are_not_retried_or_charged():
+    retry, budget = policy(), RetryBudget(3)
+    assert retry.decide(BackendError("forbidden", 403), 0, budget) is None
+    assert budget.used == 0
+
+
+def test_rate_limit_waits_for_retry_after_plus_jitter():
+    decision = policy().decide(BackendRateLimitError("429", 429, {"retry-after": "7"}), 0, RetryBudget(3))
+    assert decision.error_class == RATE_LIMITED
+    assert 7.0 <= decision.delay <= 8.0
+
+
+def test_rate_limit_falls_back_to_reset_headers():
+    error = BackendRateLimitError("429", 429, {"x-ratelimit-reset-requests": "1.5s", "x-ratelimit-reset-tokens": "6m0s"})
+    assert 360.0 <= policy(max_delay=100.0).decide(error, 0, RetryBudget(3)).delay <= 361.0
+
+
+def test_rate_limit_wait_is_capped():
+    error = BackendRateLimitError("429", 429, {"retry-after": "3600"})
+    assert 120.0 <= policy(max_delay=30.0).decide(error, 0, RetryBudget(3)).delay <= 121.0
+
+
+def test_malformed_output_retries_immediately():
+    assert policy().decide(StructureViolation("repeated label"), 0, RetryBudget(3)).delay == 0.0
+
+
+def test_transient_backoff_is_full_jitter_capped_at_max_delay():
+    retry = policy(max_attempts=10, base_delay=1.0, max_delay=4.0)
+    for attempt in range(8):
+        delay = retry.decide(BackendError("502", 502), attempt, RetryBudget(100)).delay
+        assert 0.0 <= delay <= min(4.0, 2 ** attempt)
+
+
+def test_gives_up_after_max_attempts():
+    retry = policy(max_attempts=3)
+    assert retry.decide(BackendError("502", 502), 1, RetryBudget(3)) is not None
+    assert retry.decide(BackendError("502", 502), 2, RetryBudget(3)) is None
+    assert retry.decide(BackendError("502", 502), 0, RetryBudget(3), max_attempts=1) is None
+
+
+def test_game_budget_caps_retries():
+    retry, budget = policy(max_attempts=10), RetryBudget(2)
+    decisions = [retry.decide(BackendError("502", 502), attempt, budget) for attempt in range(4)]
+    assert [decision is not None for decision in decisions] == [True, True, False, False]
+    assert budget.remaining == 0
+
+
+def test_run_budget_is_shared_across_games():
+    retry = policy(max_attempts=10, run_budget=RetryBudget(3))
+    games = [RetryBudget(2) for _ in range(3)]
+    allowed = [retry.decide(BackendError("timeout"), 0, budget) is not None for budget in games for _ in range(2)]
+    assert allowed.count(True) == 3
+    assert retry.run_budget.remaining == 0
@@ -0,0 +1,91 @@
+# tests/test_slate_diff.py
+import glob
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import llm_backend
+import main
+from game_time import GAME_TIMEZONE
+from llm_backend import BackendError, FakeBackend, LLMBackend
+from llm_cache import llm_cache
+from mlb_models import GameRecord
+from slate_diff import diff_slate, fingerprint_game, load_previous_posts
+
+
+class DownBackend(LLMBackend):
+    """Every completion is rejected outright (a fatal error, so nothing is retried)"""
+    name = 'down'
+    
+    def complete(self, body: dict, timeout: float = 60):
+        raise BackendError("invalid api key", 401)
+    
+    def stream(self, body: dict, timeout: float = 60):
+        raise BackendError("invalid api key", 401)
+
+
+def blog_topic() -> dict:
+    game = GameRecord('NY Yankees @ BOS Red Sox', 'NY Yankees', 'BOS Red Sox', game_id='nyy-bos-1',
+                      start_time=datetime.now(GAME_TIMEZONE) + timedelta(hours=5))
+    return {'topic': 'NY Yankees vs BOS Red Sox MLB Betting Preview', 'keywords': ['mlb'], 'game_data': game}
+
+
+class StubFetcher:
+    topics = [blog_topic()]
+    
+    def __init__(self, slate_date=None):
+        self.slate_date = slate_date
+    
+    def get_blog_topics_from_games(self):
+        return self.topics
+
+
+@pytest.fixture
+def daily_run(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main, 'MLBDataFetcher', StubFetcher)
+    monkeypatch.setattr(llm_cache, 'enabled', False)
+    yield lambda: main.generate_daily_blogs()
+    llm_backend.set_backend(None)
+
+
+def stored_post() -> str:
+    [path] = glob.glob('mlb_blog_posts/*/*/optimized_post.html')
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def test_failed_post_is_regenerated_on_the_next_run(daily_run):
+    llm_backend.set_backend(DownBackend())
+    daily_run()
+    assert 'Error Generating Content' in stored_post()
+    [game_data_path] = glob.glob('mlb_blog_posts/*/*/game_data.json')
+    with open(game_data_path, encoding='utf-8') as f:
+        assert 'input_fingerprint' not in json.load(f)
+    
+    llm_backend.set_backend(FakeBackend(latency_seconds=0, error_rate=0, rate_limit_rate=0, seed=1))
+    daily_run()
+    assert 'Error Generating Content' not in stored_post()
+    
+    # Now current: a third run reuses it
+    [daily_directory] = glob.glob('mlb_blog_posts/*')
+    slate_diff = diff_slate(StubFetcher.topics, load_previous_posts(daily_directory))
+    assert (slate_diff.changed, len(slate_diff.unchanged)) == ([], 1)
+
+
+def test_post_without_fingerprint_is_never_current(tmp_path):
+    topic = blog_topic()
+    directory = tmp_path / 'nyy-vs-bos'
+    directory.mkdir()
+    (directory / 'meta.json').write_text('{}', encoding='utf-8')
+    (directory / 'game_data.json').write_text(json.dumps(topic['game_data'].to_dict()), encoding='utf-8')
+    previous = load_previous_posts(str(tmp_path))
+    assert previous['nyy-bos-1'].fingerprint is None
+    
+    # Not even when the run is pinned to other games (a line-move run)
+    assert diff_slate([topic], previous, regenerate_only=set()).changed == [topic]
+    
+    (directory / 'game_data.json').write_text(json.dumps(
+        {**topic['game_data'].to_dict(), 'input_fingerprint': fingerprint_game(topic['game_data'])}), encoding='utf-8')
+    assert diff_slate([topic], load_previous_posts(str(tmp_path))).changed == []
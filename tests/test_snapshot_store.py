@@ -0,0 +1,140 @@
+# tests/test_snapshot_store.py
+import json
+import threading
+
+import pytest
+import requests
+
+from game_time import current_slate_date
+from mlb_data_fetcher import MLBDataFetcher, SourceUnavailableError
+from snapshot_store import SnapshotStore
+
+TODAY = current_slate_date()
+BODY = json.dumps({"reports": [{"matchup": "NYY @ BOS"}]}).encode("utf-8")
+
+
+def response(status_code: int, body: bytes = b'', headers=None) -> requests.Response:
+    result = requests.Response()
+    result.status_code = status_code
+    result._content = body
+    result.headers.update(headers or {})
+    result.url = "https://upstream.test/latest"
+    return result
+
+
+class FakeUpstream:
+    """Stands in for UpstreamClient: replays queued responses (or raises queued errors) and records requests"""
+    
+    def __init__(self, *replies):
+        self.session = requests.Session()
+        self.replies = list(replies)
+        self.requests = []
+    
+    def get(self, source, url, headers=None, timeout=30):
+        self.requests.append(dict(headers or {}))
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SnapshotStore(str(tmp_path / "snapshots"), ttl_seconds=300)
+
+
+def fetcher(store, *replies) -> MLBDataFetcher:
+    return MLBDataFetcher(replay_date=None, snapshot_store=store, upstream=FakeUpstream(*replies))
+
+
+def test_identical_bodies_share_one_object(store, tmp_path):
+    first = store.save('mlb', '2026-10-16', BODY)
+    second = store.save('mlb', '2026-10-17', BODY)
+    assert first['sha256'] == second['sha256']
+    assert len(list((tmp_path / "snapshots" / "objects").iterdir())) == 1
+    assert store.load('mlb', '2026-10-17') == json.loads(BODY)
+    assert store.available_dates() == ['2026-10-17', '2026-10-16']
+
+
+def test_conditional_headers(store):
+    assert store.conditional_headers(None) == {}
+    ref = store.save('mlb', TODAY, BODY, etag='"v1"', last_modified='Sat, 17 Oct 2026 12:00:00 GMT')
+    assert store.conditional_headers(ref) == {
+        'If-None-Match': '"v1"', 'If-Modified-Since': 'Sat, 17 Oct 2026 12:00:00 GMT'}
+
+
+def test_fresh_snapshot_skips_the_network(store):
+    store.save('mlb', TODAY, BODY, etag='"v1"')
+    data_fetcher = fetcher(store)
+    assert data_fetcher.get_mlb_data() == [{"matchup": "NYY @ BOS"}]
+    assert data_fetcher.upstream.requests == []
+
+
+def test_stale_snapshot_revalidates_and_304_reuses_the_body(store):
+    ref = store.save('mlb', TODAY, BODY, etag='"v1"')
+    ref['validated_at'] -= 3600
+    store._write_atomic(store._ref_path('mlb', TODAY), json.dumps(ref).encode('utf-8'))
+    
+    data_fetcher = fetcher(store, response(304))
+    assert data_fetcher.get_mlb_data() == [{"matchup": "NYY @ BOS"}]
+    assert data_fetcher.upstream.requests == [{'If-None-Match': '"v1"'}]
+    assert store.is_fresh(store.get_ref('mlb', TODAY))
+
+
+def test_modified_upstream_replaces_the_snapshot(store):
+    store.save('mlb', TODAY, BODY, etag='"v1"')
+    updated = json.dumps({"reports": []}).encode("utf-8")
+    data_fetcher = fetcher(store, response(200, updated, {'ETag': '"v2"'}))
+    assert data_fetcher._get_source_payload('mlb', 'https://upstream.test/latest', allow_cached=False) == {"reports": []}
+    assert store.get_ref('mlb', TODAY)['etag'] == '"v2"'
+    assert store.load('mlb', TODAY) == {"reports": []}
+
+
+def test_304_without_a_stored_body_refetches_in_full(store, tmp_path):
+    ref = store.save('mlb', TODAY, BODY, etag='"v1"')
+    (tmp_path / "snapshots" / "objects" / f"{ref['sha256']}.json").unlink()
+    data_fetcher = fetcher(store, response(304), response(200, BODY, {'ETag': '"v1"'}))
+    assert data_fetcher._get_source_payload('mlb', 'https://upstream.test/latest', allow_cached=False) == json.loads(BODY)
+    assert data_fetcher.upstream.requests == [{'If-None-Match': '"v1"'}, {}]
+
+
+def test_failed_source_falls_back_to_todays_snapshot(store):
+    store.save('mlb', TODAY, BODY)
+    data_fetcher = fetcher(store, requests.ConnectionError("down"))
+    assert data_fetcher._get_source_payload('mlb', 'https://upstream.test/latest', allow_cached=False) == json.loads(BODY)
+
+
+def test_run_slate_date_keys_the_snapshot(store):
+    # A refresh after midnight UTC still belongs to the run's (US Eastern) slate
+    store.save('mlb', '2026-10-17', BODY)
+    data_fetcher = MLBDataFetcher(replay_date=None, snapshot_store=store, upstream=FakeUpstream(), slate_date='2026-10-17')
+    assert data_fetcher.get_mlb_data() == [{"matchup": "NYY @ BOS"}]
+    assert data_fetcher.upstream.requests == []
+
+
+def test_failed_source_without_todays_snapshot_skips_the_run(store):
+    # An older day's snapshot would publish stale matchups and odds
+    store.save('mlb', '2020-07-23', BODY)
+    with pytest.raises(SourceUnavailableError):
+        fetcher(store, response(503)).get_mlb_data()
+
+
+def test_concurrent_saves_do_not_clobber_each_other(store, tmp_path):
+    bodies = [json.dumps({"reports": [], "n": n}).encode("utf-8") for n in range(8)]
+    errors = []
+    
+    def save(body):
+        try:
+            for _ in range(25):
+                store.save('mlb', '2026-10-17', body)
+        except OSError as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=save, args=(body,)) for body in bodies]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert store.load('mlb', '2026-10-17') in [json.loads(body) for body in bodies]
+    assert not list((tmp_path / "snapshots").rglob("*.tmp"))
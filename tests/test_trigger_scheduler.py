@@ -0,0 +1,120 @@
+# tests/test_trigger_scheduler.py
+from datetime import datetime, timedelta
+
+import pytz
+
+from game_time import GAME_TIMEZONE, current_slate_date
+from mlb_models import GameRecord, UmpireInfo
+from trigger_scheduler import Trigger, TriggerScheduler
+
+FIRST_PITCH = GAME_TIMEZONE.localize(datetime(2026, 10, 17, 19, 10))
+TRIGGERS = (
+    Trigger('draft', timedelta(minutes=180)),
+    Trigger('refresh', timedelta(minutes=75), requires_umpire=True),
+)
+
+
+def game(game_id: str, start_time, umpire: str = 'TBA') -> dict:
+    record = GameRecord(game_id, 'Away', 'Home', game_id=game_id, start_time=start_time, umpire=UmpireInfo(umpire))
+    return {'game_data': record}
+
+
+class Harness:
+    """A TriggerScheduler on a fake clock, recording the windows it runs"""
+    
+    def __init__(self, slate, now):
+        self.slate = slate
+        self.now = now
+        self.windows = []
+        self.scheduler = TriggerScheduler(
+            load_slate=lambda: self.slate,
+            run_games=lambda keys, label: self.windows.append((self.now, label, keys)),
+            key=lambda record: record.game_id,
+            triggers=TRIGGERS,
+            clock=lambda: self.now,
+        )
+        self.scheduler.coalesce = timedelta(minutes=5)
+        self.scheduler.slate_refresh = timedelta(minutes=60)
+        self.scheduler.umpire_recheck = timedelta(minutes=15)
+        self.scheduler.min_lead = timedelta(minutes=30)
+    
+    def run_until(self, end):
+        """Step the scheduler, jumping the clock to each wake time, until end"""
+        while self.now < end:
+            wake = self.scheduler.step()
+            self.now = max(self.now, min(wake, end))
+
+
+def test_plan_orders_triggers_and_skips_started_games():
+    harness = Harness([], FIRST_PITCH - timedelta(hours=5))
+    slate = [game('late', FIRST_PITCH), game('early', FIRST_PITCH - timedelta(hours=1)),
+             game('started', FIRST_PITCH - timedelta(hours=6))]
+    planned = harness.scheduler.plan(slate, harness.now)
+    assert [(item.key, item.trigger.name) for item in planned] == [
+        ('early', 'draft'), ('late', 'draft'), ('early', 'refresh'), ('late', 'refresh')]
+    assert planned[0].at == FIRST_PITCH - timedelta(hours=1, minutes=180)
+
+
+def test_first_step_drafts_games_already_past_their_draft_time():
+    # Starting up two hours before first pitch: the draft trigger is overdue and fires at once
+    harness = Harness([game('g1', FIRST_PITCH, umpire='Angel Hernandez')], FIRST_PITCH - timedelta(hours=2))
+    harness.scheduler.step()
+    assert harness.windows == [(FIRST_PITCH - timedelta(hours=2), 'draft', {'g1'})]
+
+
+def test_triggers_within_the_coalescing_window_run_together():
+    slate = [game('g1', FIRST_PITCH), game('g2', FIRST_PITCH + timedelta(minutes=4)),
+             game('g3', FIRST_PITCH + timedelta(minutes=30))]
+    harness = Harness(slate, FIRST_PITCH - timedelta(hours=4))
+    harness.run_until(FIRST_PITCH - timedelta(minutes=100))
+    assert [(label, keys) for _, label, keys in harness.windows] == [('draft', {'g1', 'g2'}), ('draft', {'g3'})]
+    assert harness.windows[0][0] == FIRST_PITCH - timedelta(minutes=180)
+
+
+def test_refresh_waits_for_the_umpire():
+    slate = [game('g1', FIRST_PITCH)]
+    harness = Harness(slate, FIRST_PITCH - timedelta(minutes=76))
+    harness.scheduler.fired.add(('g1', 'draft', FIRST_PITCH))
+    harness.run_until(FIRST_PITCH - timedelta(minutes=50))
+    assert harness.windows == []
+    
+    # Assigned before the next re-check: the refresh runs at that re-check
+    harness.slate = [game('g1', FIRST_PITCH, umpire='Pat Hoberg')]
+    harness.run_until(FIRST_PITCH - timedelta(minutes=30))
+    assert [(label, keys) for _, label, keys in harness.windows] == [('refresh', {'g1'})]
+    assert FIRST_PITCH - timedelta(minutes=50) <= harness.windows[0][0] <= FIRST_PITCH - timedelta(minutes=44)
+
+
+def test_refresh_runs_without_umpire_at_the_minimum_lead():
+    harness = Harness([game('g1', FIRST_PITCH)], FIRST_PITCH - timedelta(minutes=76))
+    harness.scheduler.fired.add(('g1', 'draft', FIRST_PITCH))
+    harness.run_until(FIRST_PITCH)
+    assert len(harness.windows) == 1
+    at, label, keys = harness.windows[0]
+    assert (label, keys) == ('refresh', {'g1'})
+    assert FIRST_PITCH - timedelta(minutes=30) <= at < FIRST_PITCH - timedelta(minutes=15)
+
+
+def test_fired_triggers_rearm_when_first_pitch_moves():
+    harness = Harness([game('g1', FIRST_PITCH, umpire='Pat Hoberg')], FIRST_PITCH - timedelta(minutes=180))
+    harness.scheduler.step()
+    harness.scheduler.step()
+    assert [label for _, label, _ in harness.windows] == ['draft']
+    
+    # Rain delay pushes first pitch back two hours: the game is drafted again on its new schedule
+    harness.slate = [game('g1', FIRST_PITCH + timedelta(hours=2), umpire='Pat Hoberg')]
+    harness.now = FIRST_PITCH - timedelta(minutes=60)
+    harness.scheduler.step()
+    assert [label for _, label, _ in harness.windows] == ['draft', 'draft']
+
+
+def test_tbd_game_is_drafted_once_and_never_refreshed():
+    harness = Harness([game('tbd', None)], FIRST_PITCH - timedelta(hours=8))
+    harness.run_until(FIRST_PITCH)
+    assert [(label, keys) for _, label, keys in harness.windows] == [('draft', {'tbd'})]
+
+
+def test_slate_date_is_eastern():
+    # 00:30 UTC is still the previous evening's slate in New York
+    late_refresh = pytz.utc.localize(datetime(2026, 10, 18, 0, 30))
+    assert current_slate_date(late_refresh) == '2026-10-17'
@@ -0,0 +1,187 @@
+# trigger_scheduler.py
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from config import (
+    DRAFT_LEAD_MINUTES, REFRESH_LEAD_MINUTES, SLATE_REFRESH_MINUTES, TRIGGER_COALESCE_MINUTES,
+    TRIGGER_MIN_LEAD_MINUTES, UMPIRE_RECHECK_MINUTES, UPSTREAM_PREWARM_LEAD_MINUTES
+)
+from deadline_scheduler import has_started
+from game_time import GAME_TIMEZONE
+from mlb_models import GameRecord
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class Trigger:
+    name: str
+    lead: timedelta                # Fires this long before first pitch
+    requires_umpire: bool = False  # Wait (re-checking) for the umpire assignment
+
+
+DEFAULT_TRIGGERS = (
+    Trigger('draft', timedelta(minutes=DRAFT_LEAD_MINUTES)),
+    Trigger('refresh', timedelta(minutes=REFRESH_LEAD_MINUTES), requires_umpire=True),
+)
+
+
+@dataclass(order=True, slots=True)
+class PlannedTrigger:
+    at: datetime
+    key: str = field(compare=False)
+    trigger: Trigger = field(compare=False)
+    game: GameRecord = field(compare=False)
+    
+    @property
+    def ident(self) -> Tuple[str, str, Optional[datetime]]:
+        # A changed first pitch re-arms the game's triggers
+        return self.key, self.trigger.name, self.game.start_time
+
+
+class TriggerScheduler:
+    """Runs generation per game at fixed offsets before first pitch.
+    
+    load_slate() returns the day's blog topics; run_games(keys, label) generates
+    the given games. Between triggers the thread sleeps until the next one is
+    due (or the slate is due a re-read), and triggers that fall within
+    TRIGGER_COALESCE_MINUTES of each other run as one window. Games with a TBD
+    first pitch are drafted as soon as they appear.
+    """
+    
+    def __init__(self, load_slate: Callable[[], List[dict]], run_games: Callable[[Set[str], str], None],
+                 key: Callable[[GameRecord], str], triggers: Tuple[Trigger, ...] = DEFAULT_TRIGGERS,
+                 prewarm: Optional[Callable[[], None]] = None,
+                 prewarm_lead: timedelta = timedelta(minutes=UPSTREAM_PREWARM_LEAD_MINUTES),
+                 clock: Callable[[], datetime] = lambda: datetime.now(GAME_TIMEZONE)):
+        self.load_slate = load_slate
+        self.run_games = run_games
+        self.key = key
+        self.triggers = triggers
+        self.prewarm = prewarm
+        self.prewarm_lead = prewarm_lead
+        self.clock = clock
+        self.coalesce = timedelta(minutes=TRIGGER_COALESCE_MINUTES)
+        self.slate_refresh = timedelta(minutes=SLATE_REFRESH_MINUTES)
+        self.umpire_recheck = timedelta(minutes=UMPIRE_RECHECK_MINUTES)
+        self.min_lead = timedelta(minutes=TRIGGER_MIN_LEAD_MINUTES)
+        self.fired: Set[Tuple[str, str, Optional[datetime]]] = set()
+        self.postponed: Dict[Tuple[str, str, Optional[datetime]], datetime] = {}
+        self._prewarmed_for: Optional[datetime] = None
+        self._last_contact: Optional[datetime] = None  # Last slate read or trigger run (either wakes the upstream hosts)
+        self._slate: List[dict] = []
+        self._loaded_at: Optional[datetime] = None
+        self._stop = threading.Event()
+    
+    def plan(self, slate: List[dict], now: datetime) -> List[PlannedTrigger]:
+        """Triggers still to fire for games that haven't started, soonest first"""
+        planned = []
+        for blog_topic in slate:
+            game = blog_topic['game_data']
+            if has_started(game.start_time, now):
+                continue
+            for trigger in self.triggers:
+                if game.start_time is None and trigger.requires_umpire:
+                    continue
+                at = game.start_time - trigger.lead if game.start_time else now
+                item = PlannedTrigger(at, self.key(game), trigger, game)
+                if item.ident in self.fired:
+                    continue
+                item.at = max(at, self.postponed.get(item.ident, at))
+                planned.append(item)
+        return sorted(planned)
+    
+    def run_due(self, planned: List[PlannedTrigger], now: datetime) -> bool:
+        """Fire every trigger due within the coalescing window; returns whether any games ran"""
+        keys, names = set(), set()
+        for item in planned:
+            if item.at > now + self.coalesce:
+                break
+            if item.trigger.requires_umpire and not item.game.umpire.is_assigned \
+                    and now < item.game.start_time - self.min_lead:
+                self.postponed[item.ident] = now + self.umpire_recheck
+                logger.info(f"No umpire yet for {item.game.matchup}; re-checking its {item.trigger.name} at "
+                            f"{self.postponed[item.ident]:%H:%M} ET")
+                continue
+            self.fired.add(item.ident)
+            self.postponed.pop(item.ident, None)
+            keys.add(item.key)
+            names.add(item.trigger.name)
+        if not keys:
+            return False
+        label = '+'.join(sorted(names))
+        logger.info(f"Trigger window ({label}): generating {len(keys)} game(s)")
+        try:
+            self.run_games(keys, label)
+        except Exception as e:
+            logger.error(f"Trigger window ({label}) failed: {e}", exc_info=True)
+        self._last_contact = self.clock()
+        return True
+    
+    def _reload(self, now: datetime):
+        try:
+            self._slate = self.load_slate() or []
+        except Exception as e:
+            logger.error(f"Could not load the slate, keeping the previous one: {e}")
+        self._loaded_at = self._last_contact = now
+        # Forget triggers of games that finished before today
+        self.fired = {ident for ident in self.fired if ident[2] is None or ident[2] > now - timedelta(days=1)}
+    
+    def _needs_prewarm(self, target: datetime) -> bool:
+        """Whether the hosts will have gone idle by target (nothing contacted them within prewarm_lead of it)"""
+        if not self.prewarm or self._prewarmed_for == target:
+            return False
+        return self._last_contact is None or target - self._last_contact > self.prewarm_lead
+    
+    def _maybe_prewarm(self, planned: List[PlannedTrigger], now: datetime):
+        if planned and self._needs_prewarm(planned[0].at) and planned[0].at - self.prewarm_lead <= now < planned[0].at:
+            self._prewarmed_for = planned[0].at
+            self.prewarm()
+    
+    def next_wake(self, planned: List[PlannedTrigger], now: datetime) -> datetime:
+        wake = (self._loaded_at or now) + self.slate_refresh
+        if planned:
+            target = planned[0].at
+            wake = min(wake, target)
+            prewarm_at = target - self.prewarm_lead
+            if self._needs_prewarm(target) and prewarm_at > now:
+                wake = min(wake, prewarm_at)
+        return wake
+    
+    def step(self) -> datetime:
+        """One pass: re-read the slate if needed, fire due triggers; returns when to wake next"""
+        now = self.clock()
+        planned = self.plan(self._slate, now)
+        due = planned and planned[0].at <= now + self.coalesce
+        if due or self._loaded_at is None or now - self._loaded_at >= self.slate_refresh:
+            # Due triggers are judged on a fresh slate (time changes, umpire assignments)
+            self._reload(now)
+            planned = self.plan(self._slate, now)
+        if self.run_due(planned, now):
+            return self.clock()  # Windows can take minutes; look again straight away
+        planned = self.plan(self._slate, now)  # Postponed triggers moved
+        self._maybe_prewarm(planned, now)
+        return self.next_wake(planned, now)
+    
+    def start(self) -> threading.Thread:
+        def loop():
+            while not self._stop.is_set():
+                try:
+                    wake = self.step()
+                except Exception as e:
+                    logger.error(f"Trigger scheduler step failed: {e}", exc_info=True)
+                    wake = self.clock() + self.umpire_recheck
+                delay = (wake - self.clock()).total_seconds()
+                if delay > 0:
+                    logger.info(f"Next trigger check at {wake:%H:%M:%S} ET")
+                    self._stop.wait(delay)
+        
+        thread = threading.Thread(target=loop, daemon=True, name="trigger-scheduler")
+        thread.start()
+        return thread
+    
+    def stop(self):
+        self._stop.set()
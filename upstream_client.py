@@ -0,0 +1,210 @@
+# upstream_client.py
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Optional
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import (
+    UPSTREAM_BREAKER_FAILURES, UPSTREAM_BREAKER_RESET_SECONDS,
+    UPSTREAM_HEDGE_DEFAULT_DELAY, UPSTREAM_HEDGE_PERCENTILE
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a source whose breaker is open"""
+
+
+class CircuitBreaker:
+    """Per-source breaker: opens after N consecutive failures, probes again after a cool-down"""
+    
+    def __init__(self, failure_threshold: int = UPSTREAM_BREAKER_FAILURES,
+                 reset_seconds: float = UPSTREAM_BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False  # A half-open probe is in flight
+        self._lock = threading.Lock()
+    
+    def _state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return 'half_open'
+        return 'open'
+    
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+    
+    def allow_request(self) -> bool:
+        # Half-open lets exactly one probe through; its outcome closes or re-opens the breaker
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self.probing:
+                self.probing = True
+                return True
+            return False
+    
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.probing = False
+    
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+            self.probing = False
+    
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {'breaker': self._state(), 'consecutive_failures': self.consecutive_failures}
+
+
+class LatencyTracker:
+    """Rolling window of successful request latencies for one source"""
+    
+    def __init__(self, window: int = 50, min_samples: int = 5):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+    
+    def record(self, seconds: float):
+        with self._lock:
+            self.samples.append(seconds)
+    
+    def hedge_delay(self, percentile: float = UPSTREAM_HEDGE_PERCENTILE,
+                    default: float = UPSTREAM_HEDGE_DEFAULT_DELAY) -> float:
+        """How long to wait on the first request before sending a hedged duplicate"""
+        with self._lock:
+            samples = list(self.samples)
+        if len(samples) < self.min_samples:
+            return default
+        return max(0.5, float(np.percentile(np.array(samples, dtype=float), percentile)))
+    
+    def sample_count(self) -> int:
+        with self._lock:
+            return len(self.samples)
+
+
+class ResilientUpstreamClient:
+    """HTTP client for the onrender data services.
+    
+    Adds three things on top of a pooled keep-alive session: a pre-warm ping to
+    wake free-tier hosts before the scheduled run, a hedged second request when
+    the first is slower than the source's latency percentile, and a circuit
+    breaker so a dead source fails fast (callers fall back to the last good
+    snapshot) instead of stalling the data phase.
+    """
+    
+    def __init__(self, max_workers: int = 6, prewarm_workers: int = 3):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=3, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.latencies: Dict[str, LatencyTracker] = {}
+        self._registry_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="upstream")
+        # Pings to a cold host can hang for the full timeout; they get their own threads so hedges never queue behind them
+        self._prewarm_executor = ThreadPoolExecutor(max_workers=prewarm_workers, thread_name_prefix="upstream-prewarm")
+    
+    def _state_for(self, source: str):
+        with self._registry_lock:
+            if source not in self.breakers:
+                self.breakers[source] = CircuitBreaker()
+                self.latencies[source] = LatencyTracker()
+            return self.breakers[source], self.latencies[source]
+    
+    def _send(self, url: str, headers: Optional[dict], timeout: float) -> requests.Response:
+        response = self.session.get(url, headers=headers or {}, timeout=timeout)
+        # A cold onrender host answers 502/503 while booting; treat as a failed attempt
+        if response.status_code >= 500:
+            response.raise_for_status()
+        return response
+    
+    def get(self, source: str, url: str, headers: Optional[dict] = None, timeout: float = 30) -> requests.Response:
+        """GET with hedging and circuit breaking; raises CircuitOpenError when the source is tripped"""
+        breaker, latency = self._state_for(source)
+        if not breaker.allow_request():
+            raise CircuitOpenError(f"Circuit open for {source} after {breaker.consecutive_failures} failures")
+        
+        hedge_delay = latency.hedge_delay()
+        start = time.perf_counter()
+        pending = {self._executor.submit(self._send, url, headers, timeout)}
+        hedged = False
+        last_error: Optional[Exception] = None
+        
+        while pending:
+            wait_timeout = None if hedged else max(0.0, hedge_delay - (time.perf_counter() - start))
+            done, pending = wait(pending, timeout=wait_timeout, return_when=FIRST_COMPLETED)
+            
+            for future in done:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    last_error = e
+                    continue
+                latency.record(time.perf_counter() - start)
+                breaker.record_success()
+                return response
+            
+            # First attempt is slow (or already failed): race one duplicate against it
+            if not hedged:
+                hedged = True
+                reason = "failed" if last_error else f"slower than {hedge_delay:.1f}s"
+                print(f"🪃 {source} request {reason}, sending hedged request")
+                pending.add(self._executor.submit(self._send, url, headers, timeout))
+        
+        breaker.record_failure()
+        if breaker.state == 'open':
+            print(f"🚫 Circuit opened for {source}")
+        raise last_error or RuntimeError(f"No response from {source}")
+    
+    def prewarm(self, urls: Dict[str, str], timeout: float = 90, block: bool = False):
+        """Ping each service so free-tier hosts are awake before the real fetch.
+        
+        Only the response headers are read (stream=True) so the ping doesn't
+        download the full payload.
+        """
+        def ping(source: str, url: str):
+            start = time.perf_counter()
+            try:
+                with self.session.get(url, timeout=timeout, stream=True) as response:
+                    print(f"🔥 Pre-warmed {source}: HTTP {response.status_code} in {time.perf_counter() - start:.1f}s")
+            except Exception as e:
+                print(f"⚠️ Pre-warm ping for {source} failed after {time.perf_counter() - start:.1f}s: {e}")
+        
+        futures = [self._prewarm_executor.submit(ping, source, url) for source, url in urls.items()]
+        if block:
+            wait(futures)
+        return futures
+    
+    def status(self) -> Dict[str, dict]:
+        """Breaker state and hedge threshold per source, for health checks"""
+        with self._registry_lock:
+            sources = [(source, self.breakers[source], self.latencies[source]) for source in self.breakers]
+        return {
+            source: {
+                **breaker.snapshot(),
+                'hedge_delay': round(latency.hedge_delay(), 2),
+                'samples': latency.sample_count()
+            }
+            for source, breaker, latency in sources
+        }
+
+
+# Shared across fetcher instances so breaker state and latency history survive between runs
+upstream_client = ResilientUpstreamClient()